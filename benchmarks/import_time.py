@@ -0,0 +1,99 @@
+"""
+Import-time benchmark guarding the cold start of ezpyai's modules.
+
+Every module is imported in fresh interpreters and the median wall time is
+reported. The benchmark fails if a module takes longer than --max-seconds
+to import or if importing it loads any of the heavy dependencies that are
+only supposed to be loaded on first use.
+
+Usage:
+    python benchmarks/import_time.py [--runs N] [--max-seconds S]
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from typing import Dict, List, Tuple
+
+_MODULES: List[str] = [
+    "ezpyai.llm.knowledge.chroma_db",
+    "ezpyai.llm.knowledge.numpy_db",
+    "ezpyai.llm.knowledge._knowledge_gatherer",
+    "ezpyai.llm.knowledge.chunkers",
+]
+
+_LAZY_DEPENDENCIES: List[str] = [
+    "chromadb",
+    "onnxruntime",
+    "numpy",
+    "pandas",
+    "PyPDF2",
+    "docx",
+    "bs4",
+    "magic",
+]
+
+_PROBE = """
+import sys, json, time
+started_at = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started_at
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _measure(module: str) -> Tuple[float, List[str]]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    result = json.loads(output.strip().splitlines()[-1])
+
+    return result["seconds"], result["modules"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    failed = False
+    medians: Dict[str, float] = {}
+
+    for module in _MODULES:
+        timings: List[float] = []
+        loaded: List[str] = []
+
+        for _ in range(args.runs):
+            seconds, modules = _measure(module)
+            timings.append(seconds)
+            loaded = modules
+
+        medians[module] = statistics.median(timings)
+
+        eager = [
+            dependency for dependency in _LAZY_DEPENDENCIES if dependency in loaded
+        ]
+
+        status = "ok"
+        if eager:
+            status = f"FAIL: eagerly imports {', '.join(eager)}"
+            failed = True
+        elif medians[module] > args.max_seconds:
+            status = f"FAIL: slower than {args.max_seconds}s"
+            failed = True
+
+        print(f"{module}: {medians[module] * 1000:.1f}ms ({status})")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import time
+import threading
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+from ezpyai.constants import DICT_KEY_HITS, DICT_KEY_MISSES, DICT_KEY_NUM_ENTRIES
+
+
+class LRUCache:
+    """
+    A thread-safe in-memory cache evicting the least recently used entries.
+
+    Once the cache holds max_size entries, setting a new one evicts the least
+    recently used entry. Entries older than the TTL are treated as missing.
+
+    Attributes:
+        _max_size (int): The maximum number of entries.
+        _ttl_seconds (float | None): The time to live of an entry, forever if None.
+        _entries (OrderedDict): The values and creation times by key, least recently used first.
+        hits (int): The number of lookups that found an entry.
+        misses (int): The number of lookups that did not find an entry.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float | None = None) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be a positive number")
+
+        self._max_size = max_size
+        self._ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_size={self._max_size}, "
+            f"ttl_seconds={self._ttl_seconds})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get the value cached under the given key.
+
+        Args:
+            key (Hashable): The key.
+
+        Returns:
+            Any: The cached value or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and (
+                self._ttl_seconds is not None
+                and time.monotonic() - entry[1] > self._ttl_seconds
+            ):
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Cache the given value under the given key, evicting the least recently used entry if full.
+
+        Args:
+            key (Hashable): The key.
+            value (Any): The value.
+        """
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the hit and miss counters and the current size of the cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses and number of entries.
+        """
+        with self._lock:
+            return {
+                DICT_KEY_HITS: self.hits,
+                DICT_KEY_MISSES: self.misses,
+                DICT_KEY_NUM_ENTRIES: len(self._entries),
+            }
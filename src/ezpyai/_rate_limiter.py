@@ -0,0 +1,33 @@
+import time
+import threading
+
+
+class RateLimiter:
+    """
+    A thread-safe limiter spacing calls evenly to at most rate calls per second.
+
+    Attributes:
+        _interval (float): The minimum number of seconds between two calls.
+        _next_at (float): The monotonic time at which the next call is allowed.
+    """
+
+    def __init__(self, rate: float) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be a positive number")
+
+        self._interval = 1.0 / rate
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(rate={1.0 / self._interval})"
+
+    def acquire(self) -> None:
+        """Block until the next call is allowed."""
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
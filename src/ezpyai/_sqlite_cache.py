@@ -0,0 +1,236 @@
+import os
+import time
+import sqlite3
+import threading
+
+from typing import Dict
+
+from ezpyai._logger import logger
+from ezpyai.constants import (
+    DICT_KEY_HITS,
+    DICT_KEY_MISSES,
+    DICT_KEY_NUM_ENTRIES,
+    DICT_KEY_SIZE_BYTES,
+)
+
+_SQLITE_BUSY_TIMEOUT_MS: int = 30000
+_EVICTION_TARGET_RATIO: float = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    total_size INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stats (id, total_size) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE stats SET total_size = total_size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE stats SET total_size = total_size - OLD.size + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE stats SET total_size = total_size - OLD.size WHERE id = 0;
+END;
+"""
+
+
+class SQLiteCache:
+    """
+    A persistent string key-value cache stored in a SQLite database.
+
+    The database runs in WAL mode with a busy timeout so that it can be used
+    concurrently by several threads, each with its own connection, and by
+    several processes. Entries older than the TTL are treated as missing and
+    once the total size of the values exceeds the maximum size, the least
+    recently used entries are evicted.
+
+    Attributes:
+        _path (str): The path to the SQLite database file.
+        _max_size_bytes (int | None): The maximum total size of the values, unbounded if None.
+        _ttl_seconds (float | None): The time to live of an entry, forever if None.
+        hits (int): The number of lookups that found an entry in this process.
+        misses (int): The number of lookups that did not find an entry in this process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_size_bytes: int | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        if max_size_bytes is not None and max_size_bytes <= 0:
+            raise ValueError("max_size_bytes must be a positive integer")
+
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be a positive number")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._path = path
+        self._max_size_bytes = max_size_bytes
+        self._ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        self._get_connection().executescript(_SCHEMA)
+
+        logger.debug(f"Initialized {self}")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(path={self._path}, "
+            f"max_size_bytes={self._max_size_bytes}, ttl_seconds={self._ttl_seconds})"
+        )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self._path,
+                timeout=_SQLITE_BUSY_TIMEOUT_MS / 1000,
+                isolation_level=None,
+            )
+
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA busy_timeout={_SQLITE_BUSY_TIMEOUT_MS}")
+
+            self._local.connection = connection
+
+        return connection
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> str | None:
+        """
+        Get the value cached under the given key.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            str | None: The cached value or None if missing or expired.
+        """
+        connection = self._get_connection()
+        now = time.time()
+
+        row = connection.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None:
+            self._count(hit=False)
+
+            return None
+
+        value, created_at = row
+
+        if self._ttl_seconds is not None and now - created_at > self._ttl_seconds:
+            connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._count(hit=False)
+
+            return None
+
+        connection.execute(
+            "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._count(hit=True)
+
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Cache the given value under the given key, evicting old entries if needed.
+
+        Args:
+            key (str): The key.
+            value (str): The value.
+        """
+        connection = self._get_connection()
+        now = time.time()
+
+        connection.execute(
+            "INSERT INTO entries (key, value, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+            "value = excluded.value, size = excluded.size, "
+            "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+            (key, value, len(value.encode("utf-8")), now, now),
+        )
+
+        self._evict(connection)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        if self._max_size_bytes is None:
+            return
+
+        (total_size,) = connection.execute(
+            "SELECT total_size FROM stats WHERE id = 0"
+        ).fetchone()
+
+        if total_size <= self._max_size_bytes:
+            return
+
+        # evict below the limit so that evictions do not run on every set
+        excess_size = total_size - int(self._max_size_bytes * _EVICTION_TARGET_RATIO)
+
+        connection.execute(
+            "DELETE FROM entries WHERE key IN ("
+            "SELECT key FROM (SELECT key, size, SUM(size) OVER "
+            "(ORDER BY accessed_at, key) AS running_size FROM entries) "
+            "WHERE running_size - size < ?)",
+            (excess_size,),
+        )
+
+        logger.debug(f"Evicted least recently used entries from {self}")
+
+    def delete(self, key: str) -> None:
+        """
+        Delete the entry with the given key.
+
+        Args:
+            key (str): The key.
+        """
+        self._get_connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Delete all entries."""
+        self._get_connection().execute("DELETE FROM entries")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the hit and miss counters and the current size of the cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses, number of entries and total size in bytes.
+        """
+        num_entries, size = (
+            self._get_connection()
+            .execute(
+                "SELECT (SELECT COUNT(*) FROM entries), total_size FROM stats WHERE id = 0"
+            )
+            .fetchone()
+        )
+
+        return {
+            DICT_KEY_HITS: self.hits,
+            DICT_KEY_MISSES: self.misses,
+            DICT_KEY_NUM_ENTRIES: num_entries,
+            DICT_KEY_SIZE_BYTES: size,
+        }
@@ -2,6 +2,8 @@ DICT_KEY_ID: str = "id"
 DICT_KEY_METADATA: str = "metadata"
 DICT_KEY_CONTENT: str = "content"
 DICT_KEY_SUMMARY: str = "summary"
+DICT_KEY_SUMMARIES: str = "summaries"
+DICT_KEY_DISTANCE: str = "distance"
 DICT_KEY_FROM: str = "from"
 DICT_KEY_FROM_ID: str = "from_id"
 DICT_KEY_VALUE: str = "value"
@@ -17,3 +19,13 @@ DICT_KEY_TEXT: str = "text"
 DICT_KEY_TEXT_ENTITIES: str = "text_entities"
 DICT_KEY_ACTION: str = "action"
 DICT_KEY_ROLE: str = "role"
+DICT_KEY_HITS: str = "hits"
+DICT_KEY_MISSES: str = "misses"
+DICT_KEY_NUM_ENTRIES: str = "num_entries"
+DICT_KEY_SIZE_BYTES: str = "size_bytes"
+DICT_KEY_QUERY_EMBEDDINGS: str = "query_embeddings"
+DICT_KEY_RESULTS: str = "results"
+DICT_KEY_NUM_TOKENS: str = "num_tokens"
+DICT_KEY_DURATION_SECONDS: str = "duration_seconds"
+DICT_KEY_TIME_TO_FIRST_TOKEN_SECONDS: str = "time_to_first_token_seconds"
+DICT_KEY_TOKENS_PER_SECOND: str = "tokens_per_second"
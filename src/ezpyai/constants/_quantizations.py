@@ -0,0 +1,2 @@
+QUANTIZATION_INT8: str = "int8"
+QUANTIZATION_BINARY: str = "binary"
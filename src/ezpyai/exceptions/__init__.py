@@ -1,3 +1,4 @@
 from ezpyai.exceptions._llm_provider import *
 from ezpyai.exceptions._llm import *
 from ezpyai.exceptions._general import *
+from ezpyai.exceptions._knowledge import *
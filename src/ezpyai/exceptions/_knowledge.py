@@ -0,0 +1,5 @@
+class CollectionNotFoundError(Exception):
+    """Exception raised when a knowledge collection does not exist."""
+
+    def __init__(self, message="Collection not found", *args):
+        super().__init__(message, *args)
@@ -0,0 +1,253 @@
+import os
+import re
+import json
+import math
+import heapq
+import threading
+
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+from ezpyai._logger import logger
+
+_BM25_K1: float = 1.5
+_BM25_B: float = 0.75
+_INDEX_KEY_POSTINGS: str = "postings"
+_INDEX_KEY_DOCUMENT_LENGTHS: str = "document_lengths"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def get_terms(text: str) -> List[str]:
+    """
+    Split the given text into lowercase word terms.
+
+    Identifiers such as error codes and snake_case names stay whole terms.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[str]: The terms of the text, in order.
+    """
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    An in-process BM25 inverted index of the documents of a collection.
+
+    The index maps every term to the term frequency in each document that
+    contains it, so that documents can be added and deleted incrementally
+    and a query only visits the postings of its own terms.
+
+    Attributes:
+        _path (str): The path to the index file.
+        _postings (Dict[str, Dict[str, int]]): The frequency of every term by document ID.
+        _document_lengths (Dict[str, int]): The number of terms of every document.
+        _total_length (int): The total number of terms of all the documents.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        postings: Dict[str, Dict[str, int]] = None,
+        document_lengths: Dict[str, int] = None,
+    ) -> None:
+        self._path = path
+        self._postings = postings or {}
+        self._document_lengths = document_lengths or {}
+        self._total_length = sum(self._document_lengths.values())
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(path={self._path}, "
+            f"num_documents={len(self._document_lengths)})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._document_lengths)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """
+        Load the index from the given path or create an empty one if it does not exist.
+
+        Args:
+            path (str): The path to the index file.
+
+        Returns:
+            BM25Index: The loaded index.
+        """
+        if not os.path.isfile(path):
+            logger.debug(f"No BM25 index found at {path}")
+
+            return cls(path)
+
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        index = cls(
+            path,
+            postings=data[_INDEX_KEY_POSTINGS],
+            document_lengths=data[_INDEX_KEY_DOCUMENT_LENGTHS],
+        )
+
+        logger.debug(f"Loaded {index}")
+
+        return index
+
+    def exists(self) -> bool:
+        """
+        Check whether the index was saved to its path.
+
+        Returns:
+            bool: Whether the index file exists.
+        """
+        return os.path.isfile(self._path)
+
+    def save(self) -> None:
+        """Atomically write the index to its path."""
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        with self._lock:
+            temp_path = f"{self._path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        _INDEX_KEY_POSTINGS: self._postings,
+                        _INDEX_KEY_DOCUMENT_LENGTHS: self._document_lengths,
+                    },
+                    file,
+                )
+
+            os.replace(temp_path, self._path)
+
+        logger.debug(f"Saved {self}")
+
+    def add(self, ids: List[str], documents: List[str]) -> None:
+        """
+        Index the given documents, skipping the IDs already in the index.
+
+        The IDs of knowledge items are hashes of their content, so a
+        document with an indexed ID is already indexed as it is.
+
+        Args:
+            ids (List[str]): The IDs of the documents.
+            documents (List[str]): The documents.
+        """
+        with self._lock:
+            for id, document in zip(ids, documents):
+                if id in self._document_lengths:
+                    continue
+
+                terms = get_terms(document)
+
+                for term, frequency in Counter(terms).items():
+                    self._postings.setdefault(term, {})[id] = frequency
+
+                self._document_lengths[id] = len(terms)
+                self._total_length += len(terms)
+
+    def delete(self, ids: List[str]) -> None:
+        """
+        Remove the documents with the given IDs, ignoring the IDs not in the index.
+
+        Args:
+            ids (List[str]): The IDs of the documents.
+        """
+        with self._lock:
+            self._delete(ids)
+
+    def _delete(self, ids: List[str]) -> None:
+        ids = [id for id in ids if id in self._document_lengths]
+        if not ids:
+            return
+
+        deleted_ids = set(ids)
+
+        # the terms of a document are not kept, so every posting list is
+        # visited, which is cheap next to embedding the documents again
+        for term in list(self._postings):
+            postings = self._postings[term]
+            for id in deleted_ids.intersection(postings):
+                del postings[id]
+
+            if not postings:
+                del self._postings[term]
+
+        for id in deleted_ids:
+            self._total_length -= self._document_lengths.pop(id)
+
+    def search(self, query: str, num_results: int) -> List[Tuple[str, float]]:
+        """
+        Get the documents with the highest BM25 scores for the given query.
+
+        Args:
+            query (str): The query.
+            num_results (int): The maximum number of documents to return.
+
+        Returns:
+            List[Tuple[str, float]]: The ID and score of the documents, highest score first.
+        """
+        with self._lock:
+            num_documents = len(self._document_lengths)
+            if not num_documents or num_results <= 0:
+                return []
+
+            average_length = self._total_length / num_documents
+            scores: Dict[str, float] = {}
+
+            for term in set(get_terms(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+
+                idf = math.log(
+                    1 + (num_documents - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+
+                for id, frequency in postings.items():
+                    length_norm = (
+                        1
+                        - _BM25_B
+                        + _BM25_B * (self._document_lengths[id] / average_length)
+                    )
+
+                    scores[id] = scores.get(id, 0.0) + idf * (
+                        frequency
+                        * (_BM25_K1 + 1)
+                        / (frequency + _BM25_K1 * length_norm)
+                    )
+
+        return heapq.nlargest(num_results, scores.items(), key=lambda item: item[1])
+
+
+class BM25IndexedCollection:
+    """
+    A collection whose writes are also applied to a BM25 index, so that the
+    index is kept in sync with the collection by the store pipeline.
+    """
+
+    def __init__(self, collection: Any, index: BM25Index) -> None:
+        self._collection = collection
+        self._index = index
+
+    def __str__(self) -> str:
+        return str(self._collection)
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def add(self, ids: List[str], documents: List[str], **kwargs: Any) -> None:
+        self._collection.add(ids=ids, documents=documents, **kwargs)
+        self._index.add(ids, documents)
+
+    def upsert(self, ids: List[str], documents: List[str], **kwargs: Any) -> None:
+        self._collection.upsert(ids=ids, documents=documents, **kwargs)
+        self._index.add(ids, documents)
+
+    def delete(self, ids: List[str]) -> None:
+        self._collection.delete(ids=ids)
+        self._index.delete(ids)
@@ -0,0 +1,154 @@
+import time
+
+from typing import Any, Dict, List, Set
+
+from ezpyai._logger import logger
+from ezpyai.constants import DICT_KEY_SUMMARY
+from ezpyai.llm.knowledge._ingestion_manifest import IngestionManifest
+from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+
+_DEFAULT_BATCH_SIZE: int = 1000
+_DEFAULT_MAX_RETRIES: int = 3
+_RETRY_BACKOFF_SECONDS: float = 1.0
+
+
+class StoreBatch:
+    """
+    The knowledge items of a file on their way through the store pipeline,
+    with the IDs of the items its dropped near-duplicates are stored under.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        knowledge_items: List[KnowledgeItem],
+        duplicate_ids: List[str] | None = None,
+    ) -> None:
+        if duplicate_ids is None:
+            duplicate_ids = []
+
+        self.file_path = file_path
+        self.knowledge_items = knowledge_items
+        self.duplicate_ids = duplicate_ids
+        self.embeddings: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.knowledge_items)
+
+
+class CollectionWriter:
+    """
+    Buffers the embedded knowledge items of the store pipeline and writes them
+    to a collection in batches of at most batch_size items, retrying failed
+    batches with an exponential backoff, and records the stored files in the
+    manifest.
+
+    The collection can be of any backend that provides Chroma's add and upsert
+    methods taking ids, embeddings, documents and metadatas.
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        manifest: IngestionManifest | None = None,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        upsert: bool = True,
+        max_retries: int = _DEFAULT_MAX_RETRIES,
+    ) -> None:
+        self._collection = collection
+        self._manifest = manifest
+        self._batch_size = batch_size
+        self._upsert = upsert
+        self._max_retries = max_retries
+
+        self._document_ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, str]] = []
+        self._embeddings: List[Any] = []
+        self._batch_ids: Set[str] = set()
+
+        self.num_stored = 0
+        self.released_ids: Set[str] = set()
+
+    def write(self, batch: StoreBatch) -> None:
+        if self._manifest is not None:
+            # the file also references the items of its near-duplicates, so
+            # that it is processed again if they are released by their files
+            self.released_ids.update(
+                self._manifest.update_file(
+                    batch.file_path,
+                    [knowledge_item.id for knowledge_item in batch.knowledge_items]
+                    + batch.duplicate_ids,
+                )
+            )
+
+        for knowledge_item, embedding in zip(batch.knowledge_items, batch.embeddings):
+            logger.debug(f"Pre-processing item: {knowledge_item}")
+
+            # the same content can be found in more than one file but
+            # the collections reject duplicate ids within the same write
+            if knowledge_item.id in self._batch_ids:
+                continue
+
+            self._batch_ids.add(knowledge_item.id)
+
+            metadata = knowledge_item.metadata
+            metadata[DICT_KEY_SUMMARY] = knowledge_item.summary
+
+            self._document_ids.append(knowledge_item.id)
+            self._documents.append(knowledge_item.content)
+            self._metadatas.append(metadata)
+            self._embeddings.append(embedding)
+
+            if len(self._document_ids) >= self._batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered knowledge items to the collection.
+
+        Raises:
+            Exception: The last error if the write still fails after all retries.
+        """
+        if not self._document_ids:
+            return
+
+        logger.debug(
+            f"Writing {len(self._document_ids)} items to collection: "
+            f"{self._collection} with document IDs: {self._document_ids}"
+        )
+
+        write = self._collection.add
+        if self._upsert:
+            write = self._collection.upsert
+
+        for attempt in range(self._max_retries + 1):
+            try:
+                write(
+                    ids=self._document_ids,
+                    embeddings=self._embeddings,
+                    documents=self._documents,
+                    metadatas=self._metadatas,
+                )
+
+                break
+            except Exception as e:
+                if attempt == self._max_retries:
+                    raise
+
+                backoff_seconds = _RETRY_BACKOFF_SECONDS * 2**attempt
+
+                logger.warning(
+                    f"Failed to write {len(self._document_ids)} items to collection: "
+                    f"{self._collection}, retrying in {backoff_seconds}s: {str(e)}"
+                )
+
+                time.sleep(backoff_seconds)
+
+        self.num_stored += len(self._document_ids)
+
+        self._document_ids = []
+        self._documents = []
+        self._metadatas = []
+        self._embeddings = []
+        self._batch_ids.clear()
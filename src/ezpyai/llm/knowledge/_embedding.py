@@ -0,0 +1,31 @@
+import threading
+
+from typing import Any
+
+from ezpyai._logger import logger
+
+_default_embedding_function: Any = None
+_default_embedding_function_lock = threading.Lock()
+
+
+def get_default_embedding_function() -> Any:
+    """
+    Get the default embedding function, Chroma's ONNX all-MiniLM-L6-v2.
+
+    The function, and with it chromadb and onnxruntime, is only loaded on
+    first use and then shared by every caller.
+
+    Returns:
+        chromadb.EmbeddingFunction: The default embedding function.
+    """
+    global _default_embedding_function
+
+    with _default_embedding_function_lock:
+        if _default_embedding_function is None:
+            logger.debug("Loading the default ONNX MiniLM L6 V2 embedding function")
+
+            import chromadb.utils.embedding_functions as ef
+
+            _default_embedding_function = ef.ONNXMiniLM_L6_V2()
+
+    return _default_embedding_function
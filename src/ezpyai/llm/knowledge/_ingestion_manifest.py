@@ -0,0 +1,358 @@
+import os
+import json
+import hashlib
+
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+
+from ezpyai._logger import logger
+
+_MANIFEST_KEY_SIZE = "size"
+_MANIFEST_KEY_MTIME = "mtime"
+_MANIFEST_KEY_SHA256 = "sha256"
+_MANIFEST_KEY_IDS = "ids"
+_MANIFEST_KEY_FINGERPRINT = "fingerprint"
+_MANIFEST_KEY_FILES = "files"
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _get_file_sha256(file_path: str) -> str:
+    """
+    Get the SHA256 hash of the given file's content.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str: The hex digest of the file's content.
+    """
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+class IngestionManifest:
+    """
+    A record of the files ingested into a knowledge collection.
+
+    For every file it keeps the size, the modification time, the SHA256 hash
+    of the content, the fingerprint of the settings it was processed with
+    and the IDs of the knowledge items stored from it, so that only new or
+    modified files, or the files processed with other settings, have to be
+    processed again and the items of removed files can be deleted.
+    Knowledge item IDs are content hashes that can be shared between files,
+    so the IDs released by a file are only stale if no file references them
+    once all files are updated.
+    The released IDs still referenced by other files were last written from
+    the releasing file, so those files have to be processed again, see
+    get_files_to_refresh.
+
+    Attributes:
+        _path (str): The path to the manifest file.
+        _files (Dict[str, Dict[str, Any]]): The manifest entries indexed by absolute file path.
+        _fingerprint (str | None): The fingerprint of the current ingestion settings.
+        _id_refs (Counter): The number of files referencing each knowledge item ID.
+        _pending (Dict[str, Tuple[int, float, str]]): The new size, mtime and hash of the changed files.
+        _updated (Set[str]): The files updated since the manifest was loaded.
+    """
+
+    def __init__(self, path: str, files: Dict[str, Dict[str, Any]] = None) -> None:
+        if files is None:
+            files = {}
+
+        self._path = path
+        self._files = files
+        self._fingerprint: str | None = None
+        self._id_refs: Counter = Counter()
+        self._pending: Dict[str, Tuple[int, float, str]] = {}
+        self._updated: Set[str] = set()
+
+        for entry in self._files.values():
+            self._id_refs.update(entry[_MANIFEST_KEY_IDS])
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(path={self._path}, num_files={len(self._files)})"
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    @classmethod
+    def load(cls, path: str) -> "IngestionManifest":
+        """
+        Load the manifest from the given path or create an empty one if it does not exist.
+
+        Args:
+            path (str): The path to the manifest file.
+
+        Returns:
+            IngestionManifest: The loaded manifest.
+        """
+        if not os.path.isfile(path):
+            logger.debug(f"No ingestion manifest found at {path}")
+
+            return cls(path)
+
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        logger.debug(f"Loaded ingestion manifest from {path}")
+
+        return cls(path, data[_MANIFEST_KEY_FILES])
+
+    def save(self) -> None:
+        """Atomically write the manifest to its path."""
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({_MANIFEST_KEY_FILES: self._files}, file)
+
+        os.replace(temp_path, self._path)
+
+        logger.debug(f"Saved ingestion manifest with {len(self._files)} files")
+
+    def delete(self) -> None:
+        """Delete the manifest file and forget all entries."""
+        if os.path.isfile(self._path):
+            os.remove(self._path)
+
+        self._files = {}
+        self._id_refs = Counter()
+        self._pending = {}
+        self._updated = set()
+
+    def set_fingerprint(self, fingerprint: str) -> None:
+        """
+        Set the fingerprint of the current ingestion settings.
+
+        The files processed with other settings are returned by
+        get_changed_files, so that their items are built again and the items
+        of the previous settings are released.
+
+        Args:
+            fingerprint (str): The fingerprint of the settings, see KnowledgeGatherer.get_fingerprint.
+        """
+        self._fingerprint = fingerprint
+
+        num_stale_files = sum(
+            entry.get(_MANIFEST_KEY_FINGERPRINT) != fingerprint
+            for entry in self._files.values()
+        )
+        if num_stale_files:
+            logger.info(
+                f"{num_stale_files} files were ingested with other settings "
+                "and will be processed again"
+            )
+
+    def get_changed_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Get the files that are new or whose content changed since they were ingested.
+
+        A file whose size and modification time did not change is considered
+        unchanged without reading it. Otherwise its content hash is compared,
+        and a file that was only touched gets its entry refreshed. A file
+        processed with other settings than the current ones, see
+        set_fingerprint, is changed whatever its content.
+
+        Args:
+            file_paths (List[str]): The paths to the files currently in the data path.
+
+        Returns:
+            List[str]: The paths of the files that have to be processed.
+        """
+        changed_file_paths: List[str] = []
+
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            entry = self._files.get(os.path.abspath(file_path))
+
+            if (
+                entry is not None
+                and entry.get(_MANIFEST_KEY_FINGERPRINT) != self._fingerprint
+            ):
+                entry = None
+
+            if (
+                entry is not None
+                and entry[_MANIFEST_KEY_SIZE] == stat.st_size
+                and entry[_MANIFEST_KEY_MTIME] == stat.st_mtime
+            ):
+                continue
+
+            sha256 = _get_file_sha256(file_path)
+
+            if entry is not None and entry[_MANIFEST_KEY_SHA256] == sha256:
+                entry[_MANIFEST_KEY_SIZE] = stat.st_size
+                entry[_MANIFEST_KEY_MTIME] = stat.st_mtime
+
+                continue
+
+            self._pending[os.path.abspath(file_path)] = (
+                stat.st_size,
+                stat.st_mtime,
+                sha256,
+            )
+
+            changed_file_paths.append(file_path)
+
+        logger.debug(
+            f"{len(changed_file_paths)} of {len(file_paths)} files changed since last ingestion"
+        )
+
+        return changed_file_paths
+
+    def update_file(self, file_path: str, ids: List[str]) -> Set[str]:
+        """
+        Record the knowledge item IDs stored from a changed file.
+
+        The items of a file can be recorded in several calls, such as the
+        ones of the files inside a ZIP file, the IDs of the calls after the
+        first being added to the entry.
+
+        Args:
+            file_path (str): The path to the file, as returned by get_changed_files.
+            ids (List[str]): The IDs of the knowledge items stored from the file.
+
+        Returns:
+            Set[str]: The IDs previously stored from the file, empty after the first call.
+        """
+        file_path = os.path.abspath(file_path)
+        released_ids: Set[str] = set()
+
+        if file_path not in self._updated:
+            size, mtime, sha256 = self._pending.pop(file_path)
+
+            released_ids = self._release(file_path)
+
+            self._files[file_path] = {
+                _MANIFEST_KEY_SIZE: size,
+                _MANIFEST_KEY_MTIME: mtime,
+                _MANIFEST_KEY_SHA256: sha256,
+                _MANIFEST_KEY_FINGERPRINT: self._fingerprint,
+                _MANIFEST_KEY_IDS: [],
+            }
+            self._updated.add(file_path)
+
+        entry_ids = self._files[file_path][_MANIFEST_KEY_IDS]
+        known_ids = set(entry_ids)
+
+        ids = [id for id in dict.fromkeys(ids) if id not in known_ids]
+        self._id_refs.update(ids)
+        entry_ids.extend(ids)
+
+        return released_ids
+
+    def remove_missing_files(self, data_path: str, file_paths: List[str]) -> Set[str]:
+        """
+        Forget the files under the data path that do not exist anymore.
+
+        Args:
+            data_path (str): The path to the ingested file or directory.
+            file_paths (List[str]): The paths to the files currently in the data path.
+
+        Returns:
+            Set[str]: The IDs previously stored from the removed files.
+        """
+        data_path = os.path.abspath(data_path)
+        existing_file_paths = {os.path.abspath(file_path) for file_path in file_paths}
+
+        released_ids: Set[str] = set()
+        for file_path in list(self._files):
+            if file_path in existing_file_paths:
+                continue
+
+            if file_path != data_path and not file_path.startswith(
+                os.path.join(data_path, "")
+            ):
+                continue
+
+            logger.debug(f"File removed since last ingestion: {file_path}")
+
+            released_ids.update(self._release(file_path))
+            del self._files[file_path]
+
+        return released_ids
+
+    def get_files_to_refresh(self, ids: Set[str], file_paths: List[str]) -> List[str]:
+        """
+        Get the unchanged files to process again for the given released IDs still referenced.
+
+        An item shared by several files, or stored under the item of a
+        near-duplicate from another file, was last written from one of them.
+        When that file releases it, the item keeps the metadata of the file,
+        or is deleted along with it while the files depending on it are
+        skipped as unchanged. For every such ID not written again by a file
+        updated since the manifest was loaded, the first unchanged file
+        referencing it is marked as changed.
+
+        Args:
+            ids (Set[str]): The released IDs.
+            file_paths (List[str]): The paths to the files currently in the data path.
+
+        Returns:
+            List[str]: The paths of the files that have to be processed again.
+        """
+        updated_ids = {
+            id
+            for file_path in self._updated
+            if file_path in self._files
+            for id in self._files[file_path][_MANIFEST_KEY_IDS]
+        }
+        orphaned_ids = {
+            id for id in ids if self._id_refs[id] > 0 and id not in updated_ids
+        }
+
+        refreshed_file_paths: List[str] = []
+
+        for file_path in file_paths:
+            if not orphaned_ids:
+                break
+
+            entry = self._files.get(os.path.abspath(file_path))
+            if entry is None or os.path.abspath(file_path) in self._updated:
+                continue
+
+            if orphaned_ids.isdisjoint(entry[_MANIFEST_KEY_IDS]):
+                continue
+
+            orphaned_ids.difference_update(entry[_MANIFEST_KEY_IDS])
+
+            self._pending[os.path.abspath(file_path)] = (
+                entry[_MANIFEST_KEY_SIZE],
+                entry[_MANIFEST_KEY_MTIME],
+                entry[_MANIFEST_KEY_SHA256],
+            )
+
+            refreshed_file_paths.append(file_path)
+
+        logger.debug(
+            f"{len(refreshed_file_paths)} unchanged files reference released items"
+        )
+
+        return refreshed_file_paths
+
+    def get_unreferenced_ids(self, ids: Set[str]) -> Set[str]:
+        """
+        Get the given IDs that are not referenced by any file in the manifest.
+
+        Args:
+            ids (Set[str]): The IDs to check.
+
+        Returns:
+            Set[str]: The IDs that can be deleted from the collection.
+        """
+        return {id for id in ids if self._id_refs[id] <= 0}
+
+    def _release(self, file_path: str) -> Set[str]:
+        entry = self._files.get(file_path)
+        if entry is None:
+            return set()
+
+        ids = entry[_MANIFEST_KEY_IDS]
+        self._id_refs.subtract(ids)
+
+        return set(ids)
@@ -1,7 +1,52 @@
-from typing import List
+import os
+import sys
+import copy
+import heapq
+import shutil
+import itertools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Set,
+    Tuple,
+)
 from abc import ABC, abstractmethod
+from ezpyai._logger import logger
+from ezpyai._lru_cache import LRUCache
+from ezpyai.constants import DICT_KEY_QUERY_EMBEDDINGS, DICT_KEY_RESULTS
 from ezpyai.llm.providers._llm_provider import LLMProvider
 from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+from ezpyai.llm.knowledge.summary_cache import SummaryCache
+from ezpyai.llm.knowledge.chunkers import Chunker
+from ezpyai.llm.knowledge._knowledge_gatherer import KnowledgeGatherer, list_files
+from ezpyai.llm.knowledge._ingestion_manifest import IngestionManifest
+from ezpyai.llm.knowledge._pipeline import Pipeline, PipelineStageStats
+from ezpyai.llm.knowledge._collection_writer import StoreBatch, CollectionWriter
+from ezpyai.llm.knowledge._embedding import get_default_embedding_function
+from ezpyai.llm.knowledge._bm25_index import BM25Index, BM25IndexedCollection
+from ezpyai.llm.knowledge._metadata_filter import validate_filters, get_filters_key
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_STORE_BATCH_SIZE: int = 1000
+_STORE_QUEUE_SIZE: int = 4
+_STORE_MAX_RETRIES: int = 3
+_MANIFESTS_DIR_NAME: str = "ezpyai_manifests"
+_BM25_DIR_NAME: str = "ezpyai_bm25"
+_QUERY_CACHE_SIZE: int = 1024
+_CANDIDATES_FACTOR: int = 4
+_MIN_CANDIDATES: int = 20
+_RRF_K: int = 60
+_FAN_OUT_MAX_WORKERS: int = 16
 
 
 class KnowledgeDB(ABC):
@@ -22,14 +67,99 @@ class KnowledgeDB(ABC):
         pass
 
     @abstractmethod
-    def search(self, collection: str, query: str) -> List[KnowledgeItem]:
+    def search(
+        self,
+        collection: str,
+        query: str,
+        num_results: int = 1,
+        *,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[KnowledgeItem]:
+        """
+        Search the collection for the given query.
+
+        Args:
+            collection (str): The name of the collection.
+            query (str): The query to search for.
+            num_results (int, optional): The maximum number of results. Defaults to 1.
+            filters (Dict[str, Any] | None, optional): The metadata filter expression the results must match, e.g. {"file_ext": ".md", "paragraph_number": {"$lte": 3}}. Defaults to None.
+
+        Returns:
+            List[KnowledgeItem]: The search results as a list of KnowledgeItem objects.
+
+        Raises:
+            ValueError: If the filters are invalid.
+        """
         pass
 
 
 class BaseKnowledgeDB(KnowledgeDB):
-    def __init__(self, name: str, dsn: str) -> None:
+    """
+    The base of the knowledge databases, implementing the store pipeline.
+
+    A backend provides its collections through _get_store_collection, as
+    objects with Chroma's count, add, upsert and delete methods, and can
+    bound the size of a write with _get_max_batch_size and persist the
+    written items in _on_stored. The searches are answered by _query with
+    the embeddings of the queries. The abstract _get_store_collection,
+    _query, _get_items and _get_embeddings must all be implemented, so that
+    an incomplete backend cannot be instantiated.
+
+    The embeddings of the queries are cached, and so are the results of the
+    searches if the result cache is enabled. The cached results of a
+    collection are invalidated by every store into it. With read-only
+    search, searching a collection that does not exist raises
+    CollectionNotFoundError instead of creating it.
+
+    With bm25, a BM25 inverted index of every collection is kept in sync by
+    store, and hybrid searches fuse the lexical ranking of the index with
+    the vector ranking of the backend by reciprocal rank fusion. Items that
+    only the index found are fetched from the backend by _get_items.
+
+    The knowledge items found by _query carry their distance to the query,
+    so that the results of several collections can be merged by
+    search_collections. Maximal marginal relevance re-ranking reads the
+    embeddings of the candidates by ID with _get_embeddings, which skips the
+    IDs not in the collection.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dsn: str,
+        embedding_function: Callable[[List[str]], Any] | None = None,
+        query_cache_size: int = _QUERY_CACHE_SIZE,
+        query_cache_ttl_seconds: float | None = None,
+        result_cache_size: int = 0,
+        result_cache_ttl_seconds: float | None = None,
+        read_only_search: bool = False,
+        bm25: bool = False,
+    ) -> None:
         self._name = name
         self._dsn = dsn
+        self._read_only_search = read_only_search
+        self._bm25 = bm25
+        self._embedding_function = embedding_function
+        self._store_stats: List[PipelineStageStats] = []
+
+        self._query_cache: LRUCache | None = None
+        if query_cache_size > 0:
+            self._query_cache = LRUCache(
+                query_cache_size, ttl_seconds=query_cache_ttl_seconds
+            )
+
+        self._result_cache: LRUCache | None = None
+        if result_cache_size > 0:
+            self._result_cache = LRUCache(
+                result_cache_size, ttl_seconds=result_cache_ttl_seconds
+            )
+
+        # bumping the generation of a collection invalidates its cached results
+        self._result_generations: Dict[str, int] = {}
+        self._result_generations_lock = threading.Lock()
+
+        self._bm25_indexes: Dict[str, BM25Index] = {}
+        self._bm25_indexes_lock = threading.Lock()
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(name={self._name}, dsn={self._dsn})"
@@ -41,6 +171,46 @@ class BaseKnowledgeDB(KnowledgeDB):
         return self._dsn
 
     def destroy(self) -> None:
+        shutil.rmtree(self._get_manifests_dir(), ignore_errors=True)
+
+        with self._bm25_indexes_lock:
+            self._bm25_indexes = {}
+            shutil.rmtree(os.path.join(self._dsn, _BM25_DIR_NAME), ignore_errors=True)
+
+        if self._result_cache is not None:
+            self._result_cache.clear()
+
+    def _get_embedding_function(self) -> Callable[[List[str]], Any]:
+        if self._embedding_function is None:
+            self._embedding_function = get_default_embedding_function()
+
+        return self._embedding_function
+
+    def _get_manifests_dir(self) -> str:
+        return os.path.join(self._dsn, _MANIFESTS_DIR_NAME)
+
+    def _load_manifest(self, collection: str) -> IngestionManifest:
+        return IngestionManifest.load(
+            os.path.join(self._get_manifests_dir(), f"{collection}.json")
+        )
+
+    def _get_bm25_index(self, collection: str) -> BM25Index:
+        with self._bm25_indexes_lock:
+            if collection not in self._bm25_indexes:
+                self._bm25_indexes[collection] = BM25Index.load(
+                    os.path.join(self._dsn, _BM25_DIR_NAME, f"{collection}.json")
+                )
+
+            return self._bm25_indexes[collection]
+
+    @abstractmethod
+    def _get_store_collection(self, collection: str) -> Any:
+        pass
+
+    def _get_max_batch_size(self) -> int:
+        return sys.maxsize
+
+    def _on_stored(self, collection: Any) -> None:
         pass
 
     def store(
@@ -48,12 +218,802 @@ class BaseKnowledgeDB(KnowledgeDB):
         collection: str,
         data_path: str,
         summarizer: LLMProvider = None,
+        num_workers: int = 1,
+        incremental: bool = False,
+        batch_size: int = _STORE_BATCH_SIZE,
+        upsert: bool | None = None,
+        max_retries: int = _STORE_MAX_RETRIES,
+        summarizer_concurrency: int = 1,
+        summarizer_rate_limit: float | None = None,
+        summarizer_pack_size: int = 1,
+        summary_cache: SummaryCache | None = None,
+        chunker: Chunker | None = None,
+        near_duplicate_threshold: float | None = None,
     ) -> None:
+        """
+        Store the data in the given collection.
+
+        The files are processed by a pipeline whose extract, summarize, embed
+        and write stages run concurrently, connected by bounded queues, and
+        whose per-stage throughput is available through get_store_stats. The
+        extracted files are packed into batches of about batch_size items, so
+        that the items of many small files are summarized and embedded
+        together instead of one file at a time.
+
+        When incremental, an ingestion manifest of the collection is kept in
+        the dsn directory and only the files that are new or changed since
+        the previous store are processed, while the items of the files that
+        were modified or removed are deleted from the collection. The
+        unchanged files sharing an item with them, or whose near-duplicates
+        were stored under one of their items, are processed again, and so
+        are the files processed with another chunker, summarizer or
+        near-duplicate threshold than the given ones. Without incremental,
+        every file is processed and nothing is deleted from the collection.
+
+        The near-duplicates are only detected among the files processed by
+        the same store, so with incremental a changed file is not compared
+        to the unchanged files and keeps the paragraphs they already have.
+
+        Args:
+            collection (str): The name of the collection.
+            data_path (str): The path to the data.
+            summarizer (LLMProvider): The LLMProvider summarizer to use for knowledge collection.
+            num_workers (int, optional): The number of processes to read the files with. Defaults to 1.
+            incremental (bool, optional): Whether to only process new or changed files. Defaults to False.
+            batch_size (int, optional): The maximum number of items per write, capped at the backend's maximum batch size, and the number of items the files are packed into for the embedding function. Defaults to 1000.
+            upsert (bool | None, optional): Whether to overwrite existing items with the same ID instead of skipping them. Defaults to None, for upserting when incremental, so that the items of the changed files get their new metadata.
+            max_retries (int, optional): The number of times a failed write is retried. Defaults to 3.
+            summarizer_concurrency (int, optional): The maximum number of summarizer requests in flight. Defaults to 1.
+            summarizer_rate_limit (float | None, optional): The maximum number of summarizer requests per second. Defaults to None.
+            summarizer_pack_size (int, optional): The maximum number of short paragraphs summarized by a single request. Defaults to 1.
+            summary_cache (SummaryCache | None, optional): The persistent cache of summaries to reuse across runs. Defaults to None.
+            chunker (Chunker | None, optional): Splits the content of a file into the stored paragraphs. Defaults to ChunkerParagraph().
+            near_duplicate_threshold (float | None, optional): The similarity from which a paragraph is not stored as a near-duplicate of a paragraph processed before, see KnowledgeGatherer. Defaults to None.
+
+        Raises:
+            ValueError: If batch_size is not a positive integer, max_retries is negative or near_duplicate_threshold is out of range.
+        """
+        logger.debug(f"Storing data in collection: {collection} from: {data_path}")
+
+        if batch_size <= 0:
+            raise ValueError("batch_size must be a positive integer")
+
+        if max_retries < 0:
+            raise ValueError("max_retries must be a non-negative integer")
+
+        batch_size = min(batch_size, self._get_max_batch_size())
+
+        if upsert is None:
+            upsert = incremental
+
+        knowledge_gatherer: KnowledgeGatherer = KnowledgeGatherer(
+            summarizer=summarizer,
+            summarizer_concurrency=summarizer_concurrency,
+            summarizer_rate_limit=summarizer_rate_limit,
+            summarizer_pack_size=summarizer_pack_size,
+            summary_cache=summary_cache,
+            chunker=chunker,
+            near_duplicate_threshold=near_duplicate_threshold,
+        )
+
+        manifest: IngestionManifest | None = None
+        if incremental:
+            manifest = self._load_manifest(collection)
+            manifest.set_fingerprint(knowledge_gatherer.get_fingerprint())
+
+        store_collection = self._get_store_collection(collection)
+        write_collection = store_collection
+
+        if manifest is not None and len(manifest) and not store_collection.count():
+            logger.debug(f"Collection {collection} is empty, discarding its manifest")
+
+            manifest.delete()
+
+        bm25_index: BM25Index | None = None
+        if self._bm25:
+            bm25_index = self._get_bm25_index(collection)
+
+            # the files stored before the index existed have to be indexed
+            if manifest is not None and len(manifest) and not bm25_index.exists():
+                logger.debug(
+                    f"Collection {collection} has no BM25 index, discarding its manifest"
+                )
+
+                manifest.delete()
+
+            write_collection = BM25IndexedCollection(store_collection, bm25_index)
+
+        file_paths = list_files(data_path)
+        changed_file_paths = file_paths
+        if manifest is not None:
+            changed_file_paths = manifest.get_changed_files(file_paths)
+
+        writer = CollectionWriter(
+            write_collection,
+            manifest=manifest,
+            batch_size=batch_size,
+            upsert=upsert,
+            max_retries=max_retries,
+        )
+
+        def run_pipeline(file_paths: List[str]) -> List[PipelineStageStats]:
+            pipeline = Pipeline(queue_size=_STORE_QUEUE_SIZE, size_func=_get_num_items)
+            if summarizer is not None:
+                # the workers share the gatherer's summarizer threads, which
+                # bound the requests in flight across all of them
+                pipeline.add_stage(
+                    "summarize",
+                    _summarize_batch(knowledge_gatherer),
+                    num_workers=summarizer_concurrency,
+                )
+
+            pipeline.add_stage("embed", self._embed_batches)
+            pipeline.add_stage("write", _write_batches(writer))
+
+            stats = pipeline.run(
+                _pack_batches(
+                    (
+                        StoreBatch(file_path, knowledge_items, duplicate_ids)
+                        for file_path, knowledge_items, duplicate_ids in knowledge_gatherer.iter_file_items(
+                            file_paths, num_workers=num_workers, summarize=False
+                        )
+                    ),
+                    batch_size,
+                ),
+                source_name="extract",
+            )
+
+            writer.flush()
+
+            return stats
+
+        try:
+            self._store_stats = run_pipeline(changed_file_paths)
+
+            if manifest is not None:
+                writer.released_ids.update(
+                    manifest.remove_missing_files(data_path, file_paths)
+                )
+
+                # the unchanged files depending on the released items are
+                # processed again, which can release items in turn, every file
+                # being processed at most once
+                while True:
+                    refreshed_file_paths = manifest.get_files_to_refresh(
+                        writer.released_ids, file_paths
+                    )
+                    if not refreshed_file_paths:
+                        break
+
+                    logger.debug(
+                        f"Processing {len(refreshed_file_paths)} files again "
+                        f"for the items released from collection: {collection}"
+                    )
+
+                    run_pipeline(refreshed_file_paths)
+
+            for stage_stats in self._store_stats:
+                logger.info(
+                    f"Store pipeline stage of collection {collection}: {stage_stats}"
+                )
+
+            logger.debug(
+                f"Stored {writer.num_stored} items in collection: {collection}"
+            )
+
+            if manifest is not None:
+                stale_ids = list(manifest.get_unreferenced_ids(writer.released_ids))
+
+                for i in range(0, len(stale_ids), batch_size):
+                    write_collection.delete(ids=stale_ids[i : i + batch_size])
+
+                logger.debug(
+                    f"Deleted {len(stale_ids)} stale items from collection: {collection}"
+                )
+
+            self._on_stored(store_collection)
+
+            if bm25_index is not None:
+                bm25_index.save()
+        finally:
+            knowledge_gatherer.close()
+
+            # a failed store may still have written some of its items
+            self._invalidate_results(collection)
+
+        if manifest is not None:
+            manifest.save()
+
+    def get_store_stats(self) -> List[PipelineStageStats]:
+        """
+        Get the per-stage throughput statistics of the last store.
+
+        The stages are extract, summarize (only with a summarizer), embed and
+        write; the stage with the highest busy time is the bottleneck.
+
+        Returns:
+            List[PipelineStageStats]: The statistics of the store pipeline stages.
+        """
+        return self._store_stats
+
+    def _embed_batches(self, batches: List[StoreBatch]) -> List[StoreBatch]:
+        contents = [
+            knowledge_item.content
+            for batch in batches
+            for knowledge_item in batch.knowledge_items
+        ]
+        if not contents:
+            return batches
+
+        embeddings = self._get_embedding_function()(contents)
+
+        start = 0
+        for batch in batches:
+            batch.embeddings = embeddings[start : start + len(batch)]
+            start += len(batch)
+
+        return batches
+
+    def _invalidate_results(self, collection: str) -> None:
+        with self._result_generations_lock:
+            self._result_generations[collection] = (
+                self._result_generations.get(collection, 0) + 1
+            )
+
+    def _get_result_cache_key(
+        self,
+        collection: str,
+        query: str,
+        num_results: int,
+        hybrid: bool,
+        filters: Dict[str, Any] | None,
+        max_distance: float | None,
+        mmr_lambda: float | None,
+    ) -> Tuple[Any, ...]:
+        return (
+            collection,
+            self._result_generations.get(collection, 0),
+            query,
+            num_results,
+            hybrid,
+            get_filters_key(filters),
+            max_distance,
+            mmr_lambda,
+        )
+
+    def _embed_queries(self, queries: List[str]) -> List[Any]:
+        if self._query_cache is None:
+            return list(self._get_embedding_function()(queries))
+
+        embeddings = [self._query_cache.get(query) for query in queries]
+        missing_queries = list(
+            dict.fromkeys(
+                query
+                for query, embedding in zip(queries, embeddings)
+                if embedding is None
+            )
+        )
+
+        if not missing_queries:
+            return embeddings
+
+        missing_embeddings = dict(
+            zip(missing_queries, self._get_embedding_function()(missing_queries))
+        )
+
+        for query, embedding in missing_embeddings.items():
+            self._query_cache.set(query, embedding)
+
+        return [
+            missing_embeddings[query] if embedding is None else embedding
+            for query, embedding in zip(queries, embeddings)
+        ]
+
+    @abstractmethod
+    def _query(
+        self,
+        collection: str,
+        embeddings: List[Any],
+        num_results: int,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[List[KnowledgeItem]]:
         pass
 
+    @abstractmethod
+    def _get_items(
+        self,
+        collection: str,
+        ids: List[str],
+        filters: Dict[str, Any] | None = None,
+    ) -> List[KnowledgeItem]:
+        pass
+
+    @abstractmethod
+    def _get_embeddings(self, collection: str, ids: List[str]) -> Dict[str, Any]:
+        pass
+
+    def _get_lexical_ids(
+        self,
+        collection: str,
+        query: str,
+        num_candidates: int,
+        filters: Dict[str, Any] | None,
+        knowledge_items_by_id: Dict[str, KnowledgeItem],
+    ) -> List[str]:
+        bm25_index = self._get_bm25_index(collection)
+
+        if filters is None:
+            return [id for id, _ in bm25_index.search(query, num_candidates)]
+
+        # the BM25 index does not know the metadata, so it is searched for
+        # more candidates until num_candidates of them match the filters
+        # pushed down to the vector search, the matching ones being added
+        # to knowledge_items_by_id
+        rejected_ids: Set[str] = set()
+        num_lexical = num_candidates
+
+        while True:
+            ranking = bm25_index.search(query, num_lexical)
+
+            unchecked_ids = [
+                id
+                for id, _ in ranking
+                if id not in knowledge_items_by_id and id not in rejected_ids
+            ]
+            for knowledge_item in self._get_items(collection, unchecked_ids, filters):
+                knowledge_items_by_id[knowledge_item.id] = knowledge_item
+
+            rejected_ids.update(
+                id for id in unchecked_ids if id not in knowledge_items_by_id
+            )
+
+            lexical_ids = [id for id, _ in ranking if id in knowledge_items_by_id]
+            if len(lexical_ids) >= num_candidates or len(ranking) < num_lexical:
+                return lexical_ids[:num_candidates]
+
+            num_lexical *= 2
+
+    def _fuse_rankings(
+        self,
+        collection: str,
+        query: str,
+        knowledge_items: List[KnowledgeItem],
+        num_candidates: int,
+        num_results: int,
+        filters: Dict[str, Any] | None,
+    ) -> List[KnowledgeItem]:
+        knowledge_items_by_id = {
+            knowledge_item.id: knowledge_item for knowledge_item in knowledge_items
+        }
+
+        lexical_ids = self._get_lexical_ids(
+            collection, query, num_candidates, filters, knowledge_items_by_id
+        )
+
+        scores: Dict[str, float] = {}
+        for rank, id in enumerate(
+            knowledge_item.id for knowledge_item in knowledge_items
+        ):
+            scores[id] = scores.get(id, 0.0) + 1 / (_RRF_K + rank + 1)
+
+        for rank, id in enumerate(lexical_ids):
+            scores[id] = scores.get(id, 0.0) + 1 / (_RRF_K + rank + 1)
+
+        ids = heapq.nlargest(num_results, scores, key=scores.get)
+
+        lexical_only_ids = [id for id in ids if id not in knowledge_items_by_id]
+        if lexical_only_ids:
+            for knowledge_item in self._get_items(collection, lexical_only_ids):
+                knowledge_items_by_id[knowledge_item.id] = knowledge_item
+
+        return [knowledge_items_by_id[id] for id in ids if id in knowledge_items_by_id]
+
     def search(
         self,
         collection: str,
         query: str,
+        num_results: int = 1,
+        hybrid: bool = False,
+        filters: Dict[str, Any] | None = None,
+        max_distance: float | None = None,
+        mmr_lambda: float | None = None,
     ) -> List[KnowledgeItem]:
-        pass
+        """
+        Search the collection for the given query.
+
+        Args:
+            collection (str): The name of the collection.
+            query (str): The query to search for.
+            num_results (int, optional): The maximum number of results. Defaults to 1.
+            hybrid (bool, optional): Whether to fuse the BM25 and vector rankings. Defaults to False.
+            filters (Dict[str, Any] | None, optional): The metadata filter expression the results must match. Defaults to None.
+            max_distance (float | None, optional): The maximum distance of the results to the query. Defaults to None.
+            mmr_lambda (float | None, optional): The relevance weight of the maximal marginal relevance re-ranking, between 0 and 1. Defaults to None, for no re-ranking.
+
+        Returns:
+            List[KnowledgeItem]: The search results as a list of KnowledgeItem objects.
+        """
+        logger.debug(f"Searching collection: {collection} with query: {query}")
+
+        return self.search_many(
+            collection,
+            [query],
+            num_results=num_results,
+            hybrid=hybrid,
+            filters=filters,
+            max_distance=max_distance,
+            mmr_lambda=mmr_lambda,
+        )[0]
+
+    def search_many(
+        self,
+        collection: str,
+        queries: List[str],
+        num_results: int = 1,
+        hybrid: bool = False,
+        filters: Dict[str, Any] | None = None,
+        max_distance: float | None = None,
+        mmr_lambda: float | None = None,
+    ) -> List[List[KnowledgeItem]]:
+        """
+        Search the collection for all the given queries at once.
+
+        The queries whose results are not cached are embedded in a single
+        call of the embedding function, for the queries whose embeddings
+        are not cached, and searched in a single query of the backend.
+
+        A hybrid search ranks more candidates with both the vector search
+        and the BM25 index, and returns the best items by reciprocal rank
+        fusion of the two rankings, so that exact identifiers, error codes
+        and names matched by the index get into the top results.
+
+        The filters are pushed down to the backend, so that only the items
+        whose metadata match them are scored, see validate_filters for the
+        filter expressions, e.g. {"file_ext": ".md", "paragraph_number":
+        {"$lte": 3}}. The BM25 index does not store the metadata, so a
+        filtered hybrid search checks its candidates against the same
+        filters, searching it for more until enough of them match.
+
+        The results farther than max_distance from the query are dropped,
+        except for the items that only the BM25 index found, which have no
+        distance. With mmr_lambda, more candidates are ranked and re-ranked
+        by maximal marginal relevance over their embeddings, trading the
+        cosine similarity of every next result to the query, weighted by
+        mmr_lambda, against its highest similarity to the results already
+        selected, so that near-duplicate paragraphs do not fill the results.
+
+        Args:
+            collection (str): The name of the collection.
+            queries (List[str]): The queries to search for.
+            num_results (int, optional): The maximum number of results per query. Defaults to 1.
+            hybrid (bool, optional): Whether to fuse the BM25 and vector rankings. Defaults to False.
+            filters (Dict[str, Any] | None, optional): The metadata filter expression the results must match. Defaults to None.
+            max_distance (float | None, optional): The maximum distance of the results to the query. Defaults to None.
+            mmr_lambda (float | None, optional): The relevance weight of the maximal marginal relevance re-ranking, between 0 and 1. Defaults to None, for no re-ranking.
+
+        Returns:
+            List[List[KnowledgeItem]]: The search results of every query, in the order of the queries.
+
+        Raises:
+            ValueError: If hybrid is True but the BM25 index is not enabled, the filters are invalid or mmr_lambda is not between 0 and 1.
+        """
+        logger.debug(f"Searching collection: {collection} with {len(queries)} queries")
+
+        if filters is not None:
+            validate_filters(filters)
+
+        if hybrid and not self._bm25:
+            raise ValueError("hybrid search requires the BM25 index (bm25=True)")
+
+        if mmr_lambda is not None and not 0 <= mmr_lambda <= 1:
+            raise ValueError("mmr_lambda must be between 0 and 1")
+
+        num_candidates = num_results
+        if hybrid or mmr_lambda is not None:
+            num_candidates = max(num_results * _CANDIDATES_FACTOR, _MIN_CANDIDATES)
+
+        results: List[List[KnowledgeItem] | None] = [None] * len(queries)
+        result_cache_keys = [None] * len(queries)
+
+        if self._result_cache is not None:
+            for i, query in enumerate(queries):
+                result_cache_keys[i] = self._get_result_cache_key(
+                    collection,
+                    query,
+                    num_results,
+                    hybrid,
+                    filters,
+                    max_distance,
+                    mmr_lambda,
+                )
+
+                knowledge_items = self._result_cache.get(result_cache_keys[i])
+                if knowledge_items is not None:
+                    results[i] = copy.deepcopy(knowledge_items)
+
+        missing = [
+            i for i, knowledge_items in enumerate(results) if knowledge_items is None
+        ]
+        if not missing:
+            return results
+
+        embeddings = self._embed_queries([queries[i] for i in missing])
+
+        for i, embedding, knowledge_items in zip(
+            missing,
+            embeddings,
+            self._query(collection, embeddings, num_candidates, filters),
+        ):
+            if hybrid:
+                knowledge_items = self._fuse_rankings(
+                    collection,
+                    queries[i],
+                    knowledge_items,
+                    num_candidates,
+                    num_results if mmr_lambda is None else num_candidates,
+                    filters,
+                )
+
+            if max_distance is not None:
+                knowledge_items = _filter_distances(knowledge_items, max_distance)
+
+            if mmr_lambda is not None:
+                knowledge_items = self._diversify(
+                    collection, embedding, knowledge_items, num_results, mmr_lambda
+                )
+
+            results[i] = knowledge_items
+
+            if self._result_cache is not None:
+                self._result_cache.set(
+                    result_cache_keys[i], copy.deepcopy(knowledge_items)
+                )
+
+        return results
+
+    def search_collections(
+        self,
+        collections: List[str],
+        query: str,
+        num_results: int = 1,
+        filters: Dict[str, Any] | None = None,
+        max_distance: float | None = None,
+        max_workers: int | None = None,
+    ) -> List[KnowledgeItem]:
+        """
+        Search all the given collections for the given query at once.
+
+        The query is embedded once and the collections are searched
+        concurrently in a thread pool, so that the latency stays close to
+        the one of the slowest collection. The results of all the
+        collections are merged by distance into a single top-k. Every
+        backend returns cosine distances, so the distances of different
+        collections are comparable as long as they are embedded with the
+        same embedding function.
+
+        Args:
+            collections (List[str]): The names of the collections.
+            query (str): The query to search for.
+            num_results (int, optional): The maximum number of results in total. Defaults to 1.
+            filters (Dict[str, Any] | None, optional): The metadata filter expression the results must match. Defaults to None.
+            max_distance (float | None, optional): The maximum distance of the results to the query. Defaults to None.
+            max_workers (int | None, optional): The maximum number of collections searched at the same time. Defaults to None, for up to 16.
+
+        Returns:
+            List[KnowledgeItem]: The search results of all the collections, closest first.
+
+        Raises:
+            ValueError: If the filters are invalid.
+        """
+        logger.debug(f"Searching {len(collections)} collections with query: {query}")
+
+        if filters is not None:
+            validate_filters(filters)
+
+        if not collections:
+            return []
+
+        embeddings = self._embed_queries([query])
+
+        def search_collection(collection: str) -> List[KnowledgeItem]:
+            return self._search_collection(
+                collection, query, embeddings, num_results, filters, max_distance
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers or _FAN_OUT_MAX_WORKERS, len(collections))
+        ) as executor:
+            results = list(executor.map(search_collection, collections))
+
+        return heapq.nsmallest(
+            num_results,
+            itertools.chain.from_iterable(results),
+            key=lambda knowledge_item: knowledge_item.distance,
+        )
+
+    def _search_collection(
+        self,
+        collection: str,
+        query: str,
+        embeddings: List[Any],
+        num_results: int,
+        filters: Dict[str, Any] | None,
+        max_distance: float | None,
+    ) -> List[KnowledgeItem]:
+        result_cache_key = None
+
+        if self._result_cache is not None:
+            result_cache_key = self._get_result_cache_key(
+                collection, query, num_results, False, filters, max_distance, None
+            )
+
+            knowledge_items = self._result_cache.get(result_cache_key)
+            if knowledge_items is not None:
+                return copy.deepcopy(knowledge_items)
+
+        knowledge_items = self._query(collection, embeddings, num_results, filters)[0]
+        if max_distance is not None:
+            knowledge_items = _filter_distances(knowledge_items, max_distance)
+
+        if self._result_cache is not None:
+            self._result_cache.set(result_cache_key, copy.deepcopy(knowledge_items))
+
+        return knowledge_items
+
+    def _diversify(
+        self,
+        collection: str,
+        embedding: Any,
+        knowledge_items: List[KnowledgeItem],
+        num_results: int,
+        mmr_lambda: float,
+    ) -> List[KnowledgeItem]:
+        if len(knowledge_items) <= 1:
+            return knowledge_items[:num_results]
+
+        embeddings_by_id = self._get_embeddings(
+            collection, [knowledge_item.id for knowledge_item in knowledge_items]
+        )
+
+        # the candidates deleted since the search have no embedding to rank
+        knowledge_items = [
+            knowledge_item
+            for knowledge_item in knowledge_items
+            if knowledge_item.id in embeddings_by_id
+        ]
+        candidate_embeddings = [
+            embeddings_by_id[knowledge_item.id] for knowledge_item in knowledge_items
+        ]
+
+        if not knowledge_items:
+            return []
+
+        return [
+            knowledge_items[i]
+            for i in _get_mmr_order(
+                embedding, candidate_embeddings, num_results, mmr_lambda
+            )
+        ]
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the hit and miss counters and the sizes of the enabled search caches.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The stats of the query embedding and result caches, by cache.
+        """
+        stats: Dict[str, Dict[str, int]] = {}
+
+        if self._query_cache is not None:
+            stats[DICT_KEY_QUERY_EMBEDDINGS] = self._query_cache.get_stats()
+
+        if self._result_cache is not None:
+            stats[DICT_KEY_RESULTS] = self._result_cache.get_stats()
+
+        return stats
+
+
+def _filter_distances(
+    knowledge_items: List[KnowledgeItem], max_distance: float
+) -> List[KnowledgeItem]:
+    return [
+        knowledge_item
+        for knowledge_item in knowledge_items
+        if knowledge_item.distance is None or knowledge_item.distance <= max_distance
+    ]
+
+
+def _get_mmr_order(
+    embedding: Any, candidate_embeddings: List[Any], num_results: int, mmr_lambda: float
+) -> List[int]:
+    import numpy as np
+
+    vectors = _normalize(np.asarray(candidate_embeddings, dtype=np.float32))
+    relevances = vectors @ _normalize(np.asarray(embedding, dtype=np.float32))
+    similarities = vectors @ vectors.T
+
+    # the highest similarity of every candidate to the selected ones
+    max_similarities = np.zeros(len(vectors), dtype=np.float32)
+    available = np.ones(len(vectors), dtype=bool)
+    order: List[int] = []
+
+    for _ in range(min(num_results, len(vectors))):
+        scores = mmr_lambda * relevances - (1 - mmr_lambda) * max_similarities
+        scores[~available] = -np.inf
+
+        best = int(np.argmax(scores))
+        order.append(best)
+        available[best] = False
+
+        if len(order) == 1:
+            max_similarities = similarities[best].copy()
+        else:
+            np.maximum(max_similarities, similarities[best], out=max_similarities)
+
+    return order
+
+
+def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+
+    return vectors / norms
+
+
+def _get_num_items(batches: List[StoreBatch]) -> int:
+    return sum(len(batch) for batch in batches)
+
+
+def _pack_batches(
+    batches: Iterable[StoreBatch], batch_size: int
+) -> Iterator[List[StoreBatch]]:
+    # the batches of consecutive files are packed until they hold batch_size
+    # items, so a pack can exceed it by the items of its last file
+    pack: List[StoreBatch] = []
+    num_items = 0
+
+    try:
+        for batch in batches:
+            pack.append(batch)
+            num_items += len(batch)
+
+            if num_items >= batch_size:
+                yield pack
+
+                pack = []
+                num_items = 0
+
+        if pack:
+            yield pack
+    finally:
+        # a stopped pipeline also stops the reading of the files
+        close = getattr(batches, "close", None)
+        if close is not None:
+            close()
+
+
+def _summarize_batch(
+    knowledge_gatherer: KnowledgeGatherer,
+) -> Callable[[List[StoreBatch]], List[StoreBatch]]:
+    def summarize_batch(batches: List[StoreBatch]) -> List[StoreBatch]:
+        knowledge_gatherer.summarize(
+            [
+                knowledge_item
+                for batch in batches
+                for knowledge_item in batch.knowledge_items
+            ]
+        )
+
+        return batches
+
+    return summarize_batch
+
+
+def _write_batches(writer: CollectionWriter) -> Callable[[List[StoreBatch]], None]:
+    def write_batches(batches: List[StoreBatch]) -> None:
+        for batch in batches:
+            writer.write(batch)
+
+    return write_batches
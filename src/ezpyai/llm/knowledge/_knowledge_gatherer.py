@@ -1,28 +1,35 @@
 import os
 import json
-import magic
 import tempfile
 import zipfile
 import shutil
 import hashlib
-import pandas as pd
+import threading
 import xml.etree.ElementTree as ET
 
 from ezpyai.exceptions import (
     UnsupportedFileTypeError,
     FileReadError,
     FileProcessingError,
+    JSONParseError,
 )
 
-from bs4 import BeautifulSoup
-from typing import Dict
-from PyPDF2 import PdfReader
-from docx import Document
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from ezpyai._logger import logger
-from ezpyai.constants import DICT_KEY_SUMMARY
-from ezpyai.llm.providers._llm_provider import LLMProvider
-from ezpyai.llm.prompt import Prompt, get_summarizer_prompt
+from ezpyai._rate_limiter import RateLimiter
+from ezpyai.constants import DICT_KEY_SUMMARY, DICT_KEY_SUMMARIES
+from ezpyai.llm.providers._llm_provider import LLMProvider, get_provider_identity
+from ezpyai.llm.prompt import (
+    Prompt,
+    get_summarizer_prompt,
+    get_batch_summarizer_prompt,
+)
 from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+from ezpyai.llm.knowledge.summary_cache import SummaryCache
+from ezpyai.llm.knowledge.chunkers import Chunker, ChunkerParagraph
+from ezpyai.llm.knowledge._minhash_index import MinHashIndex
 
 _MIMETYPE_TEXT = "text/plain"
 _MIMETYPE_JSON = "application/json"
@@ -35,6 +42,197 @@ _MIMETYPE_CSV = "text/csv"
 _MIMETYPE_HTML = "text/html"
 _MIMETYPE_XML = "text/xml"
 
+_READ_AHEAD_PER_WORKER = 4
+_SUMMARIZER_PACK_MAX_CHARS = 500
+
+
+def _read_file_content(file_path: str) -> str | None:
+    """
+    Read the given file and convert its content into plain text.
+
+    This is a module-level function so that it can be run in a process pool.
+    The parsers of the binary formats are only imported when first needed.
+
+    Args:
+        file_path (str): The path to the file.
+
+    Returns:
+        str | None: The plain text content of the file or None if it is a ZIP
+        file, which has to be extracted and processed by the caller.
+
+    Raises:
+        FileReadError: If the file cannot be read or its type is not supported.
+    """
+    logger.debug(f"Processing file: {file_path}")
+
+    import magic
+
+    mime = magic.Magic(mime=True)
+    mime_type = mime.from_file(file_path)
+
+    try:
+        if _MIMETYPE_TEXT in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_TEXT}")
+
+            with open(file_path, "r", encoding="utf-8") as file:
+                return file.read()
+
+        if _MIMETYPE_JSON in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_JSON}")
+
+            with open(file_path, "r", encoding="utf-8") as file:
+                return json.dumps(json.load(file))
+
+        if _MIMETYPE_PDF in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_PDF}")
+
+            from PyPDF2 import PdfReader
+
+            reader = PdfReader(file_path)
+            return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+        if _MIMETYPE_DOCX in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_DOCX}")
+
+            from docx import Document
+
+            doc = Document(file_path)
+            return "\n\n".join(para.text for para in doc.paragraphs if para.text)
+
+        if _MIMETYPE_CSV in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_CSV}")
+
+            import pandas as pd
+
+            df = pd.read_csv(file_path)
+            return df.to_string()
+
+        if _MIMETYPE_HTML in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_HTML}")
+
+            from bs4 import BeautifulSoup
+
+            with open(file_path, "r", encoding="utf-8") as file:
+                soup = BeautifulSoup(file, "html.parser")
+                return soup.get_text()
+
+        if _MIMETYPE_XML in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_XML}")
+
+            tree = ET.parse(file_path)
+            root = tree.getroot()
+            return "".join(root.itertext())
+
+        if _MIMETYPE_ZIP in mime_type:
+            logger.debug(f"Processing file: {file_path} as {_MIMETYPE_ZIP}")
+
+            return None
+
+        raise UnsupportedFileTypeError(f"Unsupported file type for {file_path}")
+    except Exception as e:
+        raise FileReadError(f"Error reading {file_path}: {str(e)}") from e
+
+
+def _list_directory(directory: str) -> List[str]:
+    """
+    Recursively list all files in the specified directory in a deterministic order.
+
+    Args:
+        directory (str): The path to the directory.
+
+    Returns:
+        List[str]: The sorted paths of the files in the directory.
+    """
+    logger.debug(f"Listing directory: {directory}")
+
+    file_paths: List[str] = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+
+        for file in sorted(files):
+            file_paths.append(os.path.join(root, file))
+
+    return file_paths
+
+
+def list_files(file_path: str) -> List[str]:
+    """
+    List the files to gather knowledge from for the given file or directory.
+
+    Args:
+        file_path (str): The path to the file or directory.
+
+    Returns:
+        List[str]: The sorted paths of the files.
+    """
+    if os.path.isdir(file_path):
+        return _list_directory(file_path)
+
+    return [file_path]
+
+
+class _FileReader:
+    """
+    Reads files into plain text, in a process pool when more than one worker is used.
+
+    At most _READ_AHEAD_PER_WORKER files per worker are read ahead of the
+    consumer, so slow consumers do not make the read content pile up in memory.
+    """
+
+    def __init__(self, num_workers: int = 1) -> None:
+        self._num_workers = num_workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "_FileReader":
+        if self._num_workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self._num_workers)
+
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def read(self, file_paths: List[str]) -> Iterator[Tuple[str, str | None]]:
+        """
+        Read the given files.
+
+        The results are yielded in the same order as the given file paths
+        regardless of the order in which the workers finish.
+
+        Args:
+            file_paths (List[str]): The paths to the files.
+
+        Yields:
+            Tuple[str, str | None]: The file path and its content, None for ZIP files.
+        """
+        if self._executor is None:
+            for file_path in file_paths:
+                yield file_path, _read_file_content(file_path)
+
+            return
+
+        max_pending = self._num_workers * _READ_AHEAD_PER_WORKER
+        pending: Deque[Tuple[str, Future]] = deque()
+
+        try:
+            for file_path in file_paths:
+                pending.append(
+                    (file_path, self._executor.submit(_read_file_content, file_path))
+                )
+
+                if len(pending) >= max_pending:
+                    file_path, future = pending.popleft()
+                    yield file_path, future.result()
+
+            while pending:
+                file_path, future = pending.popleft()
+                yield file_path, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
 
 class KnowledgeGatherer:
     """
@@ -42,29 +240,141 @@ class KnowledgeGatherer:
 
     This class supports reading and processing text, JSON, PDF, DOCX, and ZIP files,
     converting their content into plain text.
-    It adds each file's data to the _items dictionary with its SHA256 hash as the key.
+    It adds each file's data to the _items dictionary with its SHA256 hash as the key
+    or, through iter_items, yields it file by file without keeping it.
 
     Attributes:
         _items (Dict[str, KnowledgeItem]): A dictionary of KnowledgeItem objects indexed by SHA256 hashes of their content.
         _summarizer (LLMProvider): The LLMProvider hosting the summarizer model to use for knowledge collection.
+        _summarizer_concurrency (int): The maximum number of summarizer requests in flight.
+        _summarizer_pack_size (int): The maximum number of short paragraphs summarized by a single request.
+        _summarizer_pack_max_chars (int): The maximum length of a paragraph to be packed with others.
+        _summarizer_semaphore (threading.BoundedSemaphore): Limits the summarizer requests in flight.
+        _summarizer_executor (ThreadPoolExecutor | None): The threads sending the packs of all the summarize calls, created on first use.
+        _summarizer_rate_limiter (RateLimiter | None): Limits the summarizer requests per second.
+        _summary_cache (SummaryCache | None): The persistent cache of summaries.
+        _chunker (Chunker): Splits the content of a file into the paragraphs of the knowledge items.
+        _near_duplicate_threshold (float | None): The similarity from which a paragraph is dropped as a near-duplicate.
+        _near_duplicates (MinHashIndex | None): The index of the paragraphs gathered since the last gather or iter_items call, to drop their near-duplicates.
     """
 
-    def __init__(self, summarizer: LLMProvider = None) -> None:
+    def __init__(
+        self,
+        summarizer: LLMProvider = None,
+        summarizer_concurrency: int = 1,
+        summarizer_rate_limit: float | None = None,
+        summarizer_pack_size: int = 1,
+        summarizer_pack_max_chars: int = _SUMMARIZER_PACK_MAX_CHARS,
+        summary_cache: SummaryCache | None = None,
+        chunker: Chunker | None = None,
+        near_duplicate_threshold: float | None = None,
+    ) -> None:
         """
         Initialize the KnowledgeGatherer with an empty _items dictionary.
 
+        With a near-duplicate threshold, the paragraphs whose estimated
+        Jaccard similarity of word shingles to a paragraph gathered before
+        reaches it are dropped before being summarized, so that boilerplate
+        and lightly edited copies are only summarized, embedded and stored
+        once, under the first paragraph found. The near-duplicates are only
+        detected within a single call of gather or iter_items, whose
+        paragraphs are forgotten by the next call, so that the index does
+        not grow over the lifetime of the gatherer. The calls of
+        iter_file_items, which store makes for the passes over the files of
+        a single store, detect them across all of the calls.
+
         Args:
             summarizer (LLMProvider, optional): The LLMProvider hosting the summarizer model to use for knowledge collection. Defaults to None.
+            summarizer_concurrency (int, optional): The maximum number of summarizer requests in flight. Defaults to 1.
+            summarizer_rate_limit (float | None, optional): The maximum number of summarizer requests per second. Defaults to None.
+            summarizer_pack_size (int, optional): The maximum number of short paragraphs summarized by a single request. Defaults to 1.
+            summarizer_pack_max_chars (int, optional): The maximum length of a paragraph to be packed with others. Defaults to 500.
+            summary_cache (SummaryCache | None, optional): The persistent cache of summaries to reuse across runs. Defaults to None.
+            chunker (Chunker | None, optional): Splits the content of a file into paragraphs. Defaults to ChunkerParagraph().
+            near_duplicate_threshold (float | None, optional): The similarity from which a paragraph is dropped as a near-duplicate, greater than 0 and at most 1. Defaults to None, for no near-duplicate detection.
+
+        Raises:
+            ValueError: If summarizer_concurrency or summarizer_pack_size is not a positive integer or near_duplicate_threshold is out of range.
         """
+        if summarizer_concurrency <= 0:
+            raise ValueError("summarizer_concurrency must be a positive integer")
+
+        if summarizer_pack_size <= 0:
+            raise ValueError("summarizer_pack_size must be a positive integer")
 
         self._items: Dict[str, KnowledgeItem] = {}
         self._summarizer: LLMProvider = summarizer
+        self._summarizer_concurrency = summarizer_concurrency
+        self._summarizer_pack_size = summarizer_pack_size
+        self._summarizer_pack_max_chars = summarizer_pack_max_chars
+        self._summarizer_semaphore = threading.BoundedSemaphore(summarizer_concurrency)
+        self._summarizer_executor: ThreadPoolExecutor | None = None
+        self._summarizer_executor_lock = threading.Lock()
+        self._summary_cache = summary_cache
+
+        if chunker is None:
+            chunker = ChunkerParagraph()
+
+        self._chunker: Chunker = chunker
+
+        self._near_duplicate_threshold = near_duplicate_threshold
+        self._near_duplicates: MinHashIndex | None = None
+        if near_duplicate_threshold is not None:
+            self._near_duplicates = MinHashIndex(near_duplicate_threshold)
+
+        self._summarizer_rate_limiter: RateLimiter | None = None
+        if summarizer_rate_limit is not None:
+            self._summarizer_rate_limiter = RateLimiter(summarizer_rate_limit)
 
         logger.debug("KnowledgeGatherer initialized with an empty _items dictionary.")
 
     def __str__(self) -> str:
         return f"{self.__class__.__name__}(data={self._items.keys()})"
 
+    def close(self) -> None:
+        """Shut down the threads sending the summarizer requests, if any."""
+        with self._summarizer_executor_lock:
+            if self._summarizer_executor is not None:
+                self._summarizer_executor.shutdown()
+                self._summarizer_executor = None
+
+    def get_fingerprint(self) -> str:
+        """
+        Get a fingerprint of the settings that determine the gathered knowledge items.
+
+        The fingerprint covers the chunker, as described by its str, the
+        identity of the summarizer, see get_provider_identity, and the
+        near-duplicate threshold, so that the items gathered with other
+        settings can be told apart.
+
+        Returns:
+            str: The SHA256 hex digest of the settings.
+        """
+        settings = json.dumps(
+            {
+                "chunker": str(self._chunker),
+                "summarizer": (
+                    get_provider_identity(self._summarizer)
+                    if self._summarizer is not None
+                    else None
+                ),
+                "near_duplicate_threshold": self._near_duplicate_threshold,
+            },
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(settings.encode("utf-8")).hexdigest()
+
+    def _get_summarizer_executor(self) -> ThreadPoolExecutor:
+        with self._summarizer_executor_lock:
+            if self._summarizer_executor is None:
+                self._summarizer_executor = ThreadPoolExecutor(
+                    max_workers=self._summarizer_concurrency,
+                    thread_name_prefix="summarizer",
+                )
+
+            return self._summarizer_executor
+
     def _get_knowledge_item_from_file_paragraph(
         self,
         file_path: str,
@@ -102,10 +412,29 @@ class KnowledgeGatherer:
             },
         )
 
-        self._summarize(knowledge_item)
-
         return knowledge_item
 
+    def _get_structured_summary(
+        self, prompt: Prompt, response_format: Dict[str, Any]
+    ) -> Dict[str, Any] | None:
+        """
+        Get a structured response from the summarizer within the concurrency and rate limits.
+
+        Args:
+            prompt (Prompt): The summarizer prompt.
+            response_format (Dict[str, Any]): The expected response format.
+
+        Returns:
+            Dict[str, Any] | None: The structured response or None if it does not match the format.
+        """
+        with self._summarizer_semaphore:
+            if self._summarizer_rate_limiter is not None:
+                self._summarizer_rate_limiter.acquire()
+
+            return self._summarizer.get_structured_response(
+                prompt, response_format=response_format
+            )
+
     def _summarize(self, knowledge_item: KnowledgeItem) -> None:
         """
         Summarize the given knowledge item.
@@ -123,95 +452,356 @@ class KnowledgeGatherer:
 
         prompt: Prompt = get_summarizer_prompt(knowledge_item.content)
 
-        knowledge_item.summary = self._summarizer.get_structured_response(
+        knowledge_item.summary = self._get_structured_summary(
             prompt, response_format={DICT_KEY_SUMMARY: ""}
         )[DICT_KEY_SUMMARY]
 
         logger.debug(f"Summarized knowledge item: {knowledge_item}")
 
-    def _process_file(self, file_path: str):
-        logger.debug(f"Processing file: {file_path}")
+    def _summarize_pack(self, knowledge_items: List[KnowledgeItem]) -> None:
+        """
+        Summarize the given knowledge items with a single summarizer request.
+
+        Falls back to summarizing the items one by one if the response does
+        not contain exactly one summary per item.
+
+        Args:
+            knowledge_items (List[KnowledgeItem]): The knowledge items to summarize.
+        """
+        if len(knowledge_items) == 1:
+            self._summarize(knowledge_items[0])
+
+            return
 
-        mime = magic.Magic(mime=True)
-        mime_type = mime.from_file(file_path)
+        logger.debug(f"Summarizing a pack of {len(knowledge_items)} knowledge items")
+
+        prompt: Prompt = get_batch_summarizer_prompt(
+            [knowledge_item.content for knowledge_item in knowledge_items]
+        )
 
         try:
-            if _MIMETYPE_TEXT in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_TEXT}")
-
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = file.read()
-            elif _MIMETYPE_JSON in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_JSON}")
-
-                with open(file_path, "r", encoding="utf-8") as file:
-                    content = json.dumps(json.load(file))
-            elif _MIMETYPE_PDF in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_PDF}")
-
-                reader = PdfReader(file_path)
-                content = " ".join(page.extract_text() or "" for page in reader.pages)
-            elif _MIMETYPE_DOCX in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_DOCX}")
-
-                doc = Document(file_path)
-                content = " ".join(para.text for para in doc.paragraphs if para.text)
-            elif _MIMETYPE_CSV in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_CSV}")
-
-                df = pd.read_csv(file_path)
-                content = df.to_string()
-            elif _MIMETYPE_HTML in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_HTML}")
-
-                with open(file_path, "r", encoding="utf-8") as file:
-                    soup = BeautifulSoup(file, "html.parser")
-                    content = soup.get_text()
-            elif _MIMETYPE_XML in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_XML}")
-
-                tree = ET.parse(file_path)
-                root = tree.getroot()
-                content = "".join(root.itertext())
-            elif _MIMETYPE_ZIP in mime_type:
-                logger.debug(f"Processing file: {file_path} as {_MIMETYPE_ZIP}")
-
-                self._process_zip(file_path)
-                return
-            else:
-                raise UnsupportedFileTypeError(f"Unsupported file type for {file_path}")
-        except Exception as e:
-            raise FileReadError(f"Error reading {file_path}: {str(e)}") from e
+            response = self._get_structured_summary(
+                prompt, response_format={DICT_KEY_SUMMARIES: [""]}
+            )
+        except JSONParseError as e:
+            logger.debug(f"Failed to parse the summaries of the pack: {str(e)}")
+
+            response = None
+
+        summaries = None
+        if response is not None:
+            summaries = response[DICT_KEY_SUMMARIES]
+
+        if (
+            not isinstance(summaries, list)
+            or len(summaries) != len(knowledge_items)
+            or not all(isinstance(summary, str) for summary in summaries)
+        ):
+            logger.debug("Unexpected pack summaries, summarizing items one by one")
+
+            for knowledge_item in knowledge_items:
+                self._summarize(knowledge_item)
+
+            return
+
+        for knowledge_item, summary in zip(knowledge_items, summaries):
+            knowledge_item.summary = summary
+
+    def _get_summarizer_packs(
+        self, knowledge_items: List[KnowledgeItem]
+    ) -> List[List[KnowledgeItem]]:
+        """
+        Group the given knowledge items into packs to be summarized by a single request each.
+
+        Paragraphs longer than _summarizer_pack_max_chars get a pack of their own,
+        shorter ones are packed together up to _summarizer_pack_size per pack.
+
+        Args:
+            knowledge_items (List[KnowledgeItem]): The knowledge items to group.
+
+        Returns:
+            List[List[KnowledgeItem]]: The packs of knowledge items.
+        """
+        packs: List[List[KnowledgeItem]] = []
+        pack: List[KnowledgeItem] = []
+
+        for knowledge_item in knowledge_items:
+            if len(knowledge_item.content) > self._summarizer_pack_max_chars:
+                packs.append([knowledge_item])
+
+                continue
+
+            pack.append(knowledge_item)
+
+            if len(pack) >= self._summarizer_pack_size:
+                packs.append(pack)
+                pack = []
+
+        if pack:
+            packs.append(pack)
+
+        return packs
+
+    def summarize(self, knowledge_items: List[KnowledgeItem]) -> None:
+        """
+        Summarize the given knowledge items that do not have a summary yet.
+
+        Does nothing if the KnowledgeGatherer has no summarizer. Summaries
+        found in the summary cache are reused, the others are requested
+        concurrently, up to summarizer_concurrency in flight across all the
+        threads calling summarize and at most summarizer_rate_limit per
+        second, with short paragraphs packed into a single request each.
+        The packs are sent by a pool of summarizer_concurrency threads shared
+        by all the calls, shut down by close.
+
+        Args:
+            knowledge_items (List[KnowledgeItem]): The knowledge items to summarize.
+        """
+        if self._summarizer is None:
+            return
+
+        knowledge_items = [
+            knowledge_item
+            for knowledge_item in knowledge_items
+            if not knowledge_item.summary
+        ]
+
+        if self._summary_cache is not None:
+            for knowledge_item in knowledge_items:
+                knowledge_item.summary = (
+                    self._summary_cache.get(self._summarizer, knowledge_item.id) or ""
+                )
+
+            knowledge_items = [
+                knowledge_item
+                for knowledge_item in knowledge_items
+                if not knowledge_item.summary
+            ]
+
+        packs = self._get_summarizer_packs(knowledge_items)
+        if not packs:
+            return
+
+        logger.debug(
+            f"Summarizing {len(knowledge_items)} knowledge items in {len(packs)} requests"
+        )
+
+        if self._summarizer_concurrency == 1 or len(packs) == 1:
+            for pack in packs:
+                self._summarize_pack(pack)
+        else:
+            # the threads are shared by all the callers, so that concurrent
+            # calls do not each start summarizer_concurrency more of them
+            executor = self._get_summarizer_executor()
+
+            for future in [
+                executor.submit(self._summarize_pack, pack) for pack in packs
+            ]:
+                future.result()
+
+        if self._summary_cache is None:
+            return
+
+        for knowledge_item in knowledge_items:
+            if knowledge_item.summary:
+                self._summary_cache.set(
+                    self._summarizer, knowledge_item.id, knowledge_item.summary
+                )
+
+    def _get_file_content_items(
+        self, file_path: str, content: str
+    ) -> Tuple[List[KnowledgeItem], List[str]]:
+        """
+        Split the given file content into paragraphs with the chunker and get a knowledge item for each of them.
+
+        Args:
+            file_path (str): The path to the file the content was read from.
+            content (str): The plain text content of the file.
+
+        Returns:
+            Tuple[List[KnowledgeItem], List[str]]: The knowledge items of the file's paragraphs, and the IDs of the items their dropped near-duplicates are stored under.
+        """
+        knowledge_items: List[KnowledgeItem] = []
 
-        paragraphs = content.split("\n")
         paragraph_counter = 1
-        for paragraph in paragraphs:
+        for paragraph in self._chunker.chunk(content):
             paragraph = paragraph.strip()
             if not paragraph:
                 continue
 
-            knowledge_item = self._get_knowledge_item_from_file_paragraph(
-                file_path=file_path,
-                paragraph=paragraph,
-                paragraph_number=paragraph_counter,
+            knowledge_items.append(
+                self._get_knowledge_item_from_file_paragraph(
+                    file_path=file_path,
+                    paragraph=paragraph,
+                    paragraph_number=paragraph_counter,
+                )
             )
 
-            self._items[knowledge_item.id] = knowledge_item
+            paragraph_counter += 1
 
-            logger.debug(f"Added {knowledge_item.id} to _items dictionary")
+        duplicate_ids: List[str] = []
 
-            paragraph_counter += 1
+        if self._near_duplicates is not None:
+            unique_knowledge_items: List[KnowledgeItem] = []
+
+            for knowledge_item in knowledge_items:
+                duplicate_id = self._get_near_duplicate_id(knowledge_item)
+                if duplicate_id is None:
+                    unique_knowledge_items.append(knowledge_item)
+                else:
+                    duplicate_ids.append(duplicate_id)
+
+            knowledge_items = unique_knowledge_items
 
         logger.debug(
-            f"Processed file: {file_path} and added {len(paragraphs)} paragraphs to data dictionary"
+            f"Processed file: {file_path} with {len(knowledge_items)} paragraphs"
+        )
+
+        return knowledge_items, duplicate_ids
+
+    def _reset_near_duplicates(self) -> None:
+        # every run detects the near-duplicates among its own paragraphs only
+        if self._near_duplicate_threshold is not None:
+            self._near_duplicates = MinHashIndex(self._near_duplicate_threshold)
+
+    def _get_near_duplicate_id(self, knowledge_item: KnowledgeItem) -> str | None:
+        duplicate_id = self._near_duplicates.add(
+            knowledge_item.id, knowledge_item.content
         )
+        if duplicate_id is not None:
+            logger.debug(
+                f"Dropped {knowledge_item.id} as a near-duplicate of {duplicate_id}"
+            )
 
-    def _process_zip(self, zip_path: str):
+        return duplicate_id
+
+    def _iter_file_groups(
+        self, file_paths: List[str], reader: "_FileReader"
+    ) -> Iterator[Tuple[str, List[KnowledgeItem], List[str]]]:
         """
-        Extract a zip file to a temporary directory and process its contents.
+        Yield the unsummarized knowledge items of the given files grouped by file, see iter_file_items.
+
+        Args:
+            file_paths (List[str]): The paths to the files.
+            reader (_FileReader): The reader to read the files with.
+
+        Yields:
+            Tuple[str, List[KnowledgeItem], List[str]]: The file path, its knowledge items, or those of one file inside it, and the IDs of the items of its near-duplicates.
+        """
+        for file_path, content in reader.read(file_paths):
+            if content is not None:
+                yield file_path, *self._get_file_content_items(file_path, content)
+
+                continue
+
+            num_groups = 0
+            for zip_file_path, zip_file_content in self._read_zip_files(
+                file_path, reader
+            ):
+                yield file_path, *self._get_file_content_items(
+                    zip_file_path, zip_file_content
+                )
+
+                num_groups += 1
+
+            if not num_groups:
+                yield file_path, [], []
+
+    def _iter_summarized(
+        self, groups: Iterator[Tuple[str, List[KnowledgeItem], List[str]]]
+    ) -> Iterator[Tuple[str, List[KnowledgeItem], List[str]]]:
+        """
+        Summarize the knowledge items of the given groups, yielding the groups in order once summarized.
+
+        Up to summarizer_concurrency groups are summarized at the same time,
+        so that the summarizer requests of consecutive files are in flight
+        together, within the limits of summarize, and not only the ones of
+        a single file.
+
+        Args:
+            groups (Iterator[Tuple[str, List[KnowledgeItem], List[str]]]): The groups of knowledge items, see iter_file_items.
+
+        Yields:
+            Tuple[str, List[KnowledgeItem], List[str]]: The groups, with their knowledge items summarized.
+        """
+        if self._summarizer is None:
+            yield from groups
+
+            return
+
+        if self._summarizer_concurrency == 1:
+            for group in groups:
+                self.summarize(group[1])
+
+                yield group
+
+            return
+
+        pending: Deque[Tuple[Tuple[str, List[KnowledgeItem], List[str]], Future]] = (
+            deque()
+        )
+
+        # the files are summarized by their own threads, which wait for the
+        # packs sent by the summarizer threads
+        with ThreadPoolExecutor(
+            max_workers=self._summarizer_concurrency,
+            thread_name_prefix="summarize-file",
+        ) as executor:
+            try:
+                for group in groups:
+                    pending.append((group, executor.submit(self.summarize, group[1])))
+
+                    if len(pending) >= self._summarizer_concurrency:
+                        group, future = pending.popleft()
+                        future.result()
+
+                        yield group
+
+                while pending:
+                    group, future = pending.popleft()
+                    future.result()
+
+                    yield group
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def _read_files(
+        self, file_paths: List[str], reader: "_FileReader"
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Read the given files, and the files inside the ZIP files among them.
+
+        Args:
+            file_paths (List[str]): The paths to the files.
+            reader (_FileReader): The reader to read the files with.
+
+        Yields:
+            Tuple[str, str]: The path and content of every file, extracted ones included.
+        """
+        for file_path, content in reader.read(file_paths):
+            if content is None:
+                yield from self._read_zip_files(file_path, reader)
+
+                continue
+
+            yield file_path, content
+
+    def _read_zip_files(
+        self, zip_path: str, reader: "_FileReader"
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Extract a zip file to a temporary directory and read the files inside it one by one.
+
+        The temporary directory is removed once the files are exhausted
+        or the iteration is stopped.
 
         Args:
             zip_path (str): The path to the zip file.
+            reader (_FileReader): The reader to read the extracted files with.
+
+        Yields:
+            Tuple[str, str]: The path and content of every extracted file.
 
         Raises:
             FileProcessingError: If an error occurs during the processing of the ZIP file.
@@ -224,7 +814,7 @@ class KnowledgeGatherer:
             with zipfile.ZipFile(zip_path, "r") as zip_ref:
                 zip_ref.extractall(temp_dir)
 
-            self._process_directory(temp_dir)
+            yield from self._read_files(_list_directory(temp_dir), reader)
         except Exception as e:
             raise FileProcessingError(
                 f"Error processing ZIP file {zip_path}: {str(e)}"
@@ -232,35 +822,108 @@ class KnowledgeGatherer:
         finally:
             shutil.rmtree(temp_dir)
 
-    def _process_directory(self, directory: str):
+    def iter_items(
+        self, file_path: str, num_workers: int = 1
+    ) -> Iterator[KnowledgeItem]:
         """
-        Recursively process all files in the specified directory.
+        Yield the knowledge items of the given file or directory, file by file.
+
+        Unlike gather, the items are not kept in the _items dictionary, so the
+        memory used depends on the largest file rather than on the whole data.
+        Items with the same content in different files are all yielded.
+
+        With a summarizer, the items of up to summarizer_concurrency files
+        are summarized at the same time, ahead of the consumer.
+
+        With more than one worker the files are read and converted to plain text
+        in a process pool, a bounded number of files ahead of the consumer,
+        while the knowledge items are still built in the main process in the
+        sorted order of the file paths.
 
         Args:
-            directory (str): The path to the directory.
+            file_path (str): The path to the file or directory.
+            num_workers (int, optional): The number of processes to read the files with. Defaults to 1.
+
+        Yields:
+            KnowledgeItem: The knowledge items of the files.
+
+        Raises:
+            ValueError: If num_workers is not a positive integer.
         """
-        logger.debug(f"Processing directory: {directory}")
+        logger.debug(f"Iterating items from: {file_path} with {num_workers} workers")
+
+        if num_workers <= 0:
+            raise ValueError("num_workers must be a positive integer")
 
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                self._process_file(file_path)
+        self._reset_near_duplicates()
 
-    def gather(self, file_path: str):
+        with _FileReader(num_workers) as reader:
+            for _, knowledge_items, _ in self._iter_summarized(
+                self._iter_file_groups(list_files(file_path), reader)
+            ):
+                yield from knowledge_items
+
+    def iter_file_items(
+        self,
+        file_paths: List[str],
+        num_workers: int = 1,
+        summarize: bool = True,
+    ) -> Iterator[Tuple[str, List[KnowledgeItem], List[str]]]:
+        """
+        Yield the knowledge items of the given files grouped by file.
+
+        The items of the files inside a ZIP file are yielded under the ZIP
+        file, in one group per extracted file so that the archive is never
+        held in memory whole: the consecutive groups of a file path make up
+        its items, and an empty ZIP file gets a single empty group.
+        Summarization can be skipped to run it separately through summarize,
+        otherwise the items of up to summarizer_concurrency groups are
+        summarized at the same time, ahead of the consumer.
+
+        Every group also holds the IDs of the items its dropped
+        near-duplicates are stored under, which the file depends on.
+
+        Args:
+            file_paths (List[str]): The paths to the files.
+            num_workers (int, optional): The number of processes to read the files with. Defaults to 1.
+            summarize (bool, optional): Whether to summarize the knowledge items. Defaults to True.
+
+        Yields:
+            Tuple[str, List[KnowledgeItem], List[str]]: The file path, its knowledge items, or those of one file inside it, and the IDs of the items of its near-duplicates.
+
+        Raises:
+            ValueError: If num_workers is not a positive integer.
+        """
+        if num_workers <= 0:
+            raise ValueError("num_workers must be a positive integer")
+
+        with _FileReader(num_workers) as reader:
+            groups = self._iter_file_groups(file_paths, reader)
+            if summarize:
+                groups = self._iter_summarized(groups)
+
+            yield from groups
+
+    def gather(self, file_path: str, num_workers: int = 1) -> None:
         """
         Determine if the given path is a directory or a file and process it accordingly.
 
+        The items are added to the _items dictionary in the sorted order of
+        the file paths, so the result does not depend on the number of workers.
+
         Args:
             file_path (str): The path to the file or directory.
+            num_workers (int, optional): The number of processes to read the files with. Defaults to 1.
+
+        Raises:
+            ValueError: If num_workers is not a positive integer.
         """
         logger.debug(f"Gathering data from: {file_path}")
 
-        if os.path.isdir(file_path):
-            self._process_directory(file_path)
-
-            return
+        for knowledge_item in self.iter_items(file_path, num_workers=num_workers):
+            self._items[knowledge_item.id] = knowledge_item
 
-        self._process_file(file_path)
+            logger.debug(f"Added {knowledge_item.id} to _items dictionary")
 
     def get_items(self) -> Dict[str, KnowledgeItem]:
         """
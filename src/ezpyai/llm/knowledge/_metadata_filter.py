@@ -0,0 +1,208 @@
+import json
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_OPERATOR_AND: str = "$and"
+_OPERATOR_OR: str = "$or"
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value > operand,
+    "$gte": lambda value, operand: value >= operand,
+    "$lt": lambda value, operand: value < operand,
+    "$lte": lambda value, operand: value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+_ORDER_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+_LIST_OPERATORS = ("$in", "$nin")
+
+
+def validate_filters(filters: Dict[str, Any]) -> None:
+    """
+    Validate a metadata filter expression.
+
+    A filter maps metadata keys to a value, matched for equality, or to a
+    single comparison {"$eq" | "$ne" | "$gt" | "$gte" | "$lt" | "$lte": value}
+    or {"$in" | "$nin": [values]}. Several keys must all match, and filters
+    can be combined with {"$and": [filters]} and {"$or": [filters]}, e.g.
+    {"file_ext": ".md", "paragraph_number": {"$lte": 3}}. This is the
+    subset of Chroma's where filters that every backend supports. As in
+    Chroma, an item without the key of a condition never matches it, not
+    even with $ne or $nin.
+
+    Args:
+        filters (Dict[str, Any]): The filter expression.
+
+    Raises:
+        ValueError: If the filter expression is invalid.
+    """
+    if not isinstance(filters, dict) or not filters:
+        raise ValueError(f"filters must be a non-empty dict, got: {filters!r}")
+
+    for key, condition in filters.items():
+        if key in (_OPERATOR_AND, _OPERATOR_OR):
+            if not isinstance(condition, list) or not condition:
+                raise ValueError(f"{key} must be a non-empty list of filters")
+
+            for sub_filters in condition:
+                validate_filters(sub_filters)
+
+            continue
+
+        if key.startswith("$"):
+            raise ValueError(f"unsupported logical operator: {key}")
+
+        if not isinstance(condition, dict):
+            continue
+
+        if len(condition) != 1:
+            raise ValueError(f"the condition of {key} must have a single operator")
+
+        operator, operand = next(iter(condition.items()))
+
+        if operator not in _COMPARISONS:
+            raise ValueError(f"unsupported comparison operator: {operator}")
+
+        if operator in _LIST_OPERATORS and not isinstance(operand, list):
+            raise ValueError(f"the operand of {operator} must be a list")
+
+        if operator in _ORDER_OPERATORS and not isinstance(operand, (int, float)):
+            raise ValueError(f"the operand of {operator} must be a number")
+
+
+def get_filters_key(filters: Dict[str, Any] | None) -> str | None:
+    """
+    Get a canonical string of the given filter expression, for cache keys.
+
+    Args:
+        filters (Dict[str, Any] | None): The filter expression.
+
+    Returns:
+        str | None: The canonical string, None without filters.
+    """
+    if filters is None:
+        return None
+
+    return json.dumps(filters, sort_keys=True)
+
+
+def match_filters(filters: Dict[str, Any], metadata: Dict[str, Any]) -> bool:
+    """
+    Check whether the given metadata matches the filter expression.
+
+    A comparison of a missing key or of values of incomparable types does
+    not match, even with $ne and $nin, as in Chroma.
+
+    Args:
+        filters (Dict[str, Any]): The filter expression.
+        metadata (Dict[str, Any]): The metadata.
+
+    Returns:
+        bool: Whether the metadata matches.
+    """
+    for key, condition in filters.items():
+        if key == _OPERATOR_AND:
+            if not all(match_filters(sub, metadata) for sub in condition):
+                return False
+        elif key == _OPERATOR_OR:
+            if not any(match_filters(sub, metadata) for sub in condition):
+                return False
+        elif not _match_condition(condition, metadata.get(key)):
+            return False
+
+    return True
+
+
+def get_filters_mask(
+    filters: Dict[str, Any],
+    get_column: Callable[[str], Tuple[List[Any], "np.ndarray"]],
+    size: int,
+) -> "np.ndarray":
+    """
+    Evaluate the filter expression over dictionary-encoded columns of metadata.
+
+    A column is given as its distinct values and the code of every row, the
+    position of the row's value or -1 where the row has no value, so that a
+    condition is evaluated once per distinct value and the rows are matched
+    by indexing instead of one by one.
+
+    Args:
+        filters (Dict[str, Any]): The filter expression.
+        get_column (Callable[[str], Tuple[List[Any], np.ndarray]]): Returns the distinct values and the row codes of a metadata key, only called for the filtered keys.
+        size (int): The number of rows.
+
+    Returns:
+        np.ndarray: Whether each row matches.
+    """
+    import numpy as np
+
+    mask = np.ones(size, dtype=bool)
+
+    for key, condition in filters.items():
+        if key in (_OPERATOR_AND, _OPERATOR_OR):
+            masks = [get_filters_mask(sub, get_column, size) for sub in condition]
+            combine = np.logical_and if key == _OPERATOR_AND else np.logical_or
+            key_mask = combine.reduce(masks)
+        else:
+            values, codes = get_column(key)
+
+            # the match of a missing value comes last, where the code -1 points
+            matches = np.array(
+                [_match_condition(condition, value) for value in values]
+                + [_match_condition(condition, None)],
+                dtype=bool,
+            )
+            key_mask = matches[codes[:size]]
+
+        mask &= key_mask
+
+    return mask
+
+
+def to_chroma_where(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert the filter expression to a Chroma where filter.
+
+    Chroma only accepts a single key per filter, so filters with several
+    keys are combined with $and, and $and and $or of a single filter are
+    replaced by that filter, as Chroma requires at least two.
+
+    Args:
+        filters (Dict[str, Any]): The filter expression.
+
+    Returns:
+        Dict[str, Any]: The Chroma where filter.
+    """
+    where: List[Dict[str, Any]] = []
+    for key, condition in filters.items():
+        if key not in (_OPERATOR_AND, _OPERATOR_OR):
+            where.append({key: condition})
+            continue
+
+        sub_where = [to_chroma_where(sub) for sub in condition]
+        where.append(sub_where[0] if len(sub_where) == 1 else {key: sub_where})
+
+    if len(where) == 1:
+        return where[0]
+
+    return {_OPERATOR_AND: where}
+
+
+def _match_condition(condition: Any, value: Any) -> bool:
+    operator, operand = "$eq", condition
+    if isinstance(condition, dict):
+        operator, operand = next(iter(condition.items()))
+
+    if value is None:
+        return False
+
+    try:
+        return _COMPARISONS[operator](value, operand)
+    except TypeError:
+        return False
@@ -0,0 +1,167 @@
+import hashlib
+import threading
+
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from ezpyai.llm.knowledge._bm25_index import get_terms
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_NUM_PERMUTATIONS: int = 128
+_SHINGLE_SIZE: int = 3
+_MERSENNE_PRIME: int = (1 << 61) - 1
+_MAX_HASH: int = (1 << 32) - 1
+_SEED: int = 1
+
+
+class MinHashIndex:
+    """
+    A MinHash LSH index of texts, to find the near-duplicates of a text.
+
+    Every text is reduced to the set of its word shingles and to a MinHash
+    signature, whose fraction of equal values estimates the Jaccard
+    similarity of the shingle sets of two texts. The signatures are split
+    into bands and only the texts sharing a band with a new text are
+    compared to it, so that a lookup does not depend on the number of
+    indexed texts.
+
+    Attributes:
+        _threshold (float): The Jaccard similarity from which a text is a near-duplicate.
+        _num_bands (int): The number of bands of the signatures.
+        _num_rows (int): The number of signature values per band.
+        _ids (List[str]): The ID of every indexed text.
+        _signatures (List[np.ndarray]): The signature of every indexed text.
+        _buckets (List[Dict[bytes, List[int]]]): The indexed texts by the value of every band.
+        _indexed_ids (Dict[str, int]): The position of every indexed ID.
+        num_duplicates (int): The number of near-duplicates found.
+    """
+
+    def __init__(
+        self, threshold: float, num_permutations: int = _NUM_PERMUTATIONS
+    ) -> None:
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be greater than 0 and at most 1")
+
+        if num_permutations <= 0:
+            raise ValueError("num_permutations must be a positive integer")
+
+        import numpy as np
+
+        self._threshold = threshold
+        self._num_bands, self._num_rows = _get_bands(threshold, num_permutations)
+
+        generator = np.random.default_rng(_SEED)
+        self._a = generator.integers(
+            1, _MERSENNE_PRIME, num_permutations, dtype=np.uint64
+        )
+        self._b = generator.integers(
+            0, _MERSENNE_PRIME, num_permutations, dtype=np.uint64
+        )
+
+        self._ids: List[str] = []
+        self._signatures: List["np.ndarray"] = []
+        self._buckets: List[Dict[bytes, List[int]]] = [
+            {} for _ in range(self._num_bands)
+        ]
+        self._indexed_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.num_duplicates = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(threshold={self._threshold}, "
+            f"num_bands={self._num_bands}, num_rows={self._num_rows}, "
+            f"num_texts={len(self._ids)})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _get_signature(self, text: str) -> "np.ndarray":
+        import numpy as np
+
+        terms = get_terms(text)
+        shingles = {
+            " ".join(terms[i : i + _SHINGLE_SIZE])
+            for i in range(max(len(terms) - _SHINGLE_SIZE + 1, 1))
+        }
+
+        hashes = np.array(
+            [
+                int.from_bytes(
+                    hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(),
+                    "little",
+                )
+                for shingle in shingles
+            ],
+            dtype=np.uint64,
+        )
+
+        # the products overflow and wrap around, which is fine for hashing
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a + self._b) % np.uint64(
+                _MERSENNE_PRIME
+            )
+
+        return (permuted & np.uint64(_MAX_HASH)).min(axis=0).astype(np.uint32)
+
+    def add(self, id: str, text: str) -> str | None:
+        """
+        Index the given text unless it is a near-duplicate of an indexed text.
+
+        A text whose ID is already indexed has the same content and is not a
+        near-duplicate of itself.
+
+        Args:
+            id (str): The ID of the text.
+            text (str): The text.
+
+        Returns:
+            str | None: The ID of the indexed text the text is a near-duplicate of, None if it was indexed.
+        """
+        signature = self._get_signature(text)
+        bands = [
+            signature[i * self._num_rows : (i + 1) * self._num_rows].tobytes()
+            for i in range(self._num_bands)
+        ]
+
+        with self._lock:
+            if id in self._indexed_ids:
+                return None
+
+            candidates = {
+                position
+                for bucket, band in zip(self._buckets, bands)
+                for position in bucket.get(band, ())
+            }
+
+            for position in sorted(candidates):
+                similarity = float((self._signatures[position] == signature).mean())
+                if similarity >= self._threshold:
+                    self.num_duplicates += 1
+
+                    return self._ids[position]
+
+            position = len(self._ids)
+            self._ids.append(id)
+            self._signatures.append(signature)
+            self._indexed_ids[id] = position
+
+            for bucket, band in zip(self._buckets, bands):
+                bucket.setdefault(band, []).append(position)
+
+        return None
+
+
+def _get_bands(threshold: float, num_permutations: int) -> Tuple[int, int]:
+    # texts with a similarity s share a band with a probability of
+    # 1 - (1 - s^rows)^bands, whose steepest rise is near (1 / bands)^(1 / rows)
+    return min(
+        (
+            (num_bands, num_permutations // num_bands)
+            for num_bands in range(1, num_permutations + 1)
+        ),
+        key=lambda bands: abs((1 / bands[0]) ** (1 / bands[1]) - threshold),
+    )
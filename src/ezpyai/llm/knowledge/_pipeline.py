@@ -0,0 +1,283 @@
+import time
+import queue
+import threading
+
+from typing import Any, Callable, Iterable, List
+
+from ezpyai._logger import logger
+
+_QUEUE_POLL_INTERVAL: float = 0.1
+
+
+class _EndOfStream:
+    pass
+
+
+_END_OF_STREAM = _EndOfStream()
+
+
+class PipelineStageStats:
+    """
+    The throughput statistics of a pipeline stage.
+
+    Attributes:
+        name (str): The name of the stage.
+        num_batches (int): The number of batches processed by the stage.
+        num_items (int): The number of items in the processed batches.
+        busy_seconds (float): The time spent processing, summed over the stage's workers.
+        wall_seconds (float): The time from the start of the pipeline until the stage finished.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.num_batches = 0
+        self.num_items = 0
+        self.busy_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name}, "
+            f"num_batches={self.num_batches}, num_items={self.num_items}, "
+            f"busy_seconds={self.busy_seconds:.3f}, "
+            f"items_per_busy_second={self.get_items_per_busy_second():.2f}, "
+            f"items_per_second={self.get_items_per_second():.2f})"
+        )
+
+    def get_items_per_busy_second(self) -> float:
+        """
+        Get the throughput of the stage while it was working, the stage's capacity.
+
+        Returns:
+            float: The number of items processed per busy second.
+        """
+        if not self.busy_seconds:
+            return 0.0
+
+        return self.num_items / self.busy_seconds
+
+    def get_items_per_second(self) -> float:
+        """
+        Get the throughput of the stage over the pipeline's run time.
+
+        Returns:
+            float: The number of items processed per second.
+        """
+        if not self.wall_seconds:
+            return 0.0
+
+        return self.num_items / self.wall_seconds
+
+
+class _PipelineStage:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        num_workers: int,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.num_workers = num_workers
+        self.stats = PipelineStageStats(name)
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """
+    A staged pipeline running each stage in its own worker threads.
+
+    The stages are connected by bounded queues so that a slow stage applies
+    back-pressure to the stages before it instead of letting batches pile up
+    in memory, while I/O, network and native code (which release the GIL) of
+    the different stages overlap. Each stage's function gets a batch and
+    returns the batch to pass to the next stage; the last stage is the sink.
+    With more than one worker in a stage, batches can leave it out of order.
+
+    Attributes:
+        _queue_size (int): The maximum number of batches waiting between two stages.
+        _size_func (Callable[[Any], int]): Returns the number of items in a batch.
+        _stages (List[_PipelineStage]): The stages in processing order.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 4,
+        size_func: Callable[[Any], int] = len,
+    ) -> None:
+        if queue_size <= 0:
+            raise ValueError("queue_size must be a positive integer")
+
+        self._queue_size = queue_size
+        self._size_func = size_func
+        self._stages: List[_PipelineStage] = []
+
+    def add_stage(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        num_workers: int = 1,
+    ) -> "Pipeline":
+        """
+        Add a stage at the end of the pipeline.
+
+        Args:
+            name (str): The name of the stage.
+            func (Callable[[Any], Any]): The function processing a batch.
+            num_workers (int, optional): The number of threads running the stage. Defaults to 1.
+
+        Returns:
+            Pipeline: The pipeline, for chaining.
+        """
+        if num_workers <= 0:
+            raise ValueError("num_workers must be a positive integer")
+
+        self._stages.append(_PipelineStage(name, func, num_workers))
+
+        return self
+
+    def run(
+        self, source: Iterable[Any], source_name: str = "source"
+    ) -> List[PipelineStageStats]:
+        """
+        Run the pipeline over the batches of the given source until it is exhausted.
+
+        The source is iterated in its own thread as the first stage.
+
+        Args:
+            source (Iterable[Any]): The batches to process.
+            source_name (str, optional): The name of the source stage. Defaults to "source".
+
+        Returns:
+            List[PipelineStageStats]: The statistics of the source and of every stage.
+
+        Raises:
+            Exception: The first exception raised by the source or any stage.
+        """
+        if not self._stages:
+            raise ValueError("the pipeline has no stages")
+
+        stop_event = threading.Event()
+        errors: List[BaseException] = []
+        queues = [queue.Queue(maxsize=self._queue_size) for _ in self._stages]
+        source_stats = PipelineStageStats(source_name)
+        started_at = time.perf_counter()
+
+        def put(q: queue.Queue, batch: Any) -> bool:
+            while not stop_event.is_set():
+                try:
+                    q.put(batch, timeout=_QUEUE_POLL_INTERVAL)
+
+                    return True
+                except queue.Full:
+                    continue
+
+            return False
+
+        def get(q: queue.Queue) -> Any:
+            while not stop_event.is_set():
+                try:
+                    return q.get(timeout=_QUEUE_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+
+            return _END_OF_STREAM
+
+        def fail(e: BaseException) -> None:
+            errors.append(e)
+            stop_event.set()
+
+        def run_source() -> None:
+            iterator = iter(source)
+
+            try:
+                while True:
+                    batch_started_at = time.perf_counter()
+                    batch = next(iterator, _END_OF_STREAM)
+                    source_stats.busy_seconds += time.perf_counter() - batch_started_at
+
+                    if batch is _END_OF_STREAM:
+                        break
+
+                    source_stats.num_batches += 1
+                    source_stats.num_items += self._size_func(batch)
+
+                    if not put(queues[0], batch):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                source_stats.wall_seconds = time.perf_counter() - started_at
+
+                if hasattr(iterator, "close"):
+                    iterator.close()
+
+            for _ in range(self._stages[0].num_workers):
+                put(queues[0], _END_OF_STREAM)
+
+        remaining_workers = [stage.num_workers for stage in self._stages]
+
+        def run_stage(i: int) -> None:
+            stage = self._stages[i]
+            in_queue = queues[i]
+            out_queue = queues[i + 1] if i + 1 < len(self._stages) else None
+
+            try:
+                while True:
+                    batch = get(in_queue)
+                    if batch is _END_OF_STREAM:
+                        break
+
+                    num_items = self._size_func(batch)
+                    batch_started_at = time.perf_counter()
+                    batch = stage.func(batch)
+                    busy_seconds = time.perf_counter() - batch_started_at
+
+                    with stage.lock:
+                        stage.stats.num_batches += 1
+                        stage.stats.num_items += num_items
+                        stage.stats.busy_seconds += busy_seconds
+
+                    if out_queue is not None and not put(out_queue, batch):
+                        return
+            except BaseException as e:
+                fail(e)
+
+                return
+            finally:
+                with stage.lock:
+                    stage.stats.wall_seconds = time.perf_counter() - started_at
+                    remaining_workers[i] -= 1
+                    is_last_worker = remaining_workers[i] == 0
+
+            if out_queue is not None and is_last_worker:
+                for _ in range(self._stages[i + 1].num_workers):
+                    put(out_queue, _END_OF_STREAM)
+
+        threads = [threading.Thread(target=run_source, name=source_name, daemon=True)]
+        for i, stage in enumerate(self._stages):
+            for n in range(stage.num_workers):
+                threads.append(
+                    threading.Thread(
+                        target=run_stage,
+                        args=(i,),
+                        name=f"{stage.name}-{n}",
+                        daemon=True,
+                    )
+                )
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        stats = [source_stats] + [stage.stats for stage in self._stages]
+
+        for stage_stats in stats:
+            logger.debug(f"Pipeline stage finished: {stage_stats}")
+
+        if errors:
+            raise errors[0]
+
+        return stats
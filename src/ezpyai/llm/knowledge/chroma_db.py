@@ -1,16 +1,24 @@
-import chromadb
-import chromadb.utils.embedding_functions as ef
+import threading
 
-from typing import Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 from ezpyai._logger import logger
 from ezpyai.constants import DICT_KEY_SUMMARY
-from ezpyai.llm.providers._llm_provider import LLMProvider
-from ezpyai.llm.knowledge._knowledge_db import BaseKnowledgeDB
-from ezpyai.llm.knowledge._knowledge_gatherer import KnowledgeGatherer
+from ezpyai.exceptions import CollectionNotFoundError
+from ezpyai.llm.knowledge._knowledge_db import BaseKnowledgeDB, _QUERY_CACHE_SIZE
 from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+from ezpyai.llm.knowledge._metadata_filter import to_chroma_where
+from ezpyai.llm.knowledge._embedding import get_default_embedding_function
 
+if TYPE_CHECKING:
+    import chromadb
+    import chromadb.utils.embedding_functions as ef
 
-EMBEDDING_FUNCTION_ONNX_MINI_LM_L6_V2: ef.EmbeddingFunction = ef.ONNXMiniLM_L6_V2()
+# the collections are searched by cosine distance, as in NumpyDB, instead
+# of chroma's default squared L2 distance
+_COLLECTION_METADATA_KEY_SPACE: str = "hnsw:space"
+_SPACE_COSINE: str = "cosine"
+_SPACE_L2: str = "l2"
+_COLLECTION_METADATA: Dict[str, Any] = {_COLLECTION_METADATA_KEY_SPACE: _SPACE_COSINE}
 
 
 class ChromaDB(BaseKnowledgeDB):
@@ -23,13 +31,46 @@ class ChromaDB(BaseKnowledgeDB):
         self,
         name: str,
         dsn: str,
-        embedding_function: ef.EmbeddingFunction = EMBEDDING_FUNCTION_ONNX_MINI_LM_L6_V2,
+        embedding_function: "ef.EmbeddingFunction | None" = None,
+        query_cache_size: int = _QUERY_CACHE_SIZE,
+        query_cache_ttl_seconds: float | None = None,
+        result_cache_size: int = 0,
+        result_cache_ttl_seconds: float | None = None,
+        read_only_search: bool = False,
+        bm25: bool = False,
     ) -> None:
         """
         Initialize the ChromaDB with the given name, dsn and embedding
-        function(default: EMBEDDING_FUNCTION_ONNX_MINI_LM_L6_V2).
+        function(default: EMBEDDING_FUNCTION_ONNX_MINI_LM_L6_V2, loaded on first use).
+
+        The embeddings of the last query_cache_size queries are cached, and
+        so are the results of the last result_cache_size searches, each for
+        the given TTL or forever if None. A cache of size 0 is disabled.
+
+        With read_only_search, searches never create collections and raise
+        CollectionNotFoundError for the collections that do not exist.
+
+        With bm25, a BM25 index of every collection is kept in sync by store
+        for hybrid searches.
+
+        The collections are created in the cosine distance space. The space
+        of a collection cannot change once created, so the collections
+        created before in the default L2 space have to be migrated by
+        deleting them and storing their data again.
         """
-        super().__init__(name, dsn)
+        super().__init__(
+            name,
+            dsn,
+            embedding_function,
+            query_cache_size=query_cache_size,
+            query_cache_ttl_seconds=query_cache_ttl_seconds,
+            result_cache_size=result_cache_size,
+            result_cache_ttl_seconds=result_cache_ttl_seconds,
+            read_only_search=read_only_search,
+            bm25=bm25,
+        )
+
+        import chromadb
 
         self._client = chromadb.PersistentClient(
             path=dsn,
@@ -39,7 +80,8 @@ class ChromaDB(BaseKnowledgeDB):
             ),
         )
 
-        self._embedding_function = embedding_function
+        self._collections: Dict[str, "chromadb.Collection"] = {}
+        self._collections_lock = threading.Lock()
 
         logger.debug(f"ChromaDB initialized with name={name} and dsn={dsn}")
 
@@ -47,110 +89,179 @@ class ChromaDB(BaseKnowledgeDB):
         """Destroy the ChromaDB."""
         logger.debug("ChromaDB destroyed")
 
-        self._client.reset()
+        with self._collections_lock:
+            self._client.reset()
+            self._collections = {}
 
-    def store(
-        self, collection: str, data_path: str, summarizer: LLMProvider = None
-    ) -> None:
+        super().destroy()
+
+    def _get_collection(
+        self, collection: str, create: bool = True
+    ) -> "chromadb.Collection":
         """
-        Store the data in the given collection.
+        Get the handle of the given collection from the registry of open
+        collections, getting it from the client only on first use.
 
         Args:
             collection (str): The name of the collection.
-            data_path (str): The path to the data.
-            summarizer (LLMProvider): The LLMProvider summarizer to use for knowledge collection.
+            create (bool, optional): Whether to create the collection if it does not exist. Defaults to True.
+
+        Returns:
+            chromadb.Collection: The collection.
+
+        Raises:
+            CollectionNotFoundError: If the collection does not exist and create is False.
         """
-        logger.debug(f"Storing data in collection: {collection} from: {data_path}")
+        with self._collections_lock:
+            if collection in self._collections:
+                return self._collections[collection]
+
+            if create:
+                handle = self._client.get_or_create_collection(
+                    name=collection,
+                    embedding_function=self._get_embedding_function(),
+                    metadata=_COLLECTION_METADATA,
+                )
+            else:
+                import chromadb.errors
+
+                try:
+                    handle = self._client.get_collection(
+                        name=collection,
+                        embedding_function=self._get_embedding_function(),
+                    )
+                except (ValueError, chromadb.errors.ChromaError) as e:
+                    raise CollectionNotFoundError(
+                        f"Collection {collection} not found"
+                    ) from e
+
+            space = _get_space(handle)
+            if space != _SPACE_COSINE:
+                logger.warning(
+                    f"Collection {collection} is in the {space} distance space, its "
+                    "distances are converted to cosine distances assuming normalized "
+                    "embeddings, store its data again in a new collection to migrate it"
+                )
 
-        knowledge_gatherer: KnowledgeGatherer = KnowledgeGatherer(
-            summarizer=summarizer,
-        )
+            self._collections[collection] = handle
 
-        knowledge_gatherer.gather(data_path)
-        knowledge_items = knowledge_gatherer.get_items()
+            return handle
 
-        logger.debug(f"Collected knowlege items: {knowledge_items}")
+    def _get_store_collection(self, collection: str) -> "chromadb.Collection":
+        return self._get_collection(collection)
 
-        collection: chromadb.Collection = self._client.get_or_create_collection(
-            name=collection,
-            embedding_function=self._embedding_function,
-        )
+    def _get_max_batch_size(self) -> int:
+        return self._client.get_max_batch_size()
 
-        logger.debug(
-            f"Storing {len(knowledge_items)} items in collection: {collection}"
+    def _query(
+        self,
+        collection: str,
+        embeddings: List[Any],
+        num_results: int,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[List[KnowledgeItem]]:
+        collection: "chromadb.Collection" = self._get_collection(
+            collection, create=not self._read_only_search
         )
 
-        document_ids: List[str] = []
-        documents: List[str] = []
-        metadatas: List[Dict[str, str]] = []
+        # all the queries are sent to chroma in a single query
+        result: "chromadb.QueryResult" = collection.query(
+            include=["documents", "metadatas", "distances"],
+            query_embeddings=embeddings,
+            n_results=num_results,
+            where=to_chroma_where(filters) if filters is not None else None,
+        )
 
-        for _, knowledge_item in knowledge_items.items():
-            logger.debug(f"Pre-processing item: {knowledge_item}")
+        space = _get_space(collection)
 
-            metadata = knowledge_item.metadata
-            metadata[DICT_KEY_SUMMARY] = knowledge_item.summary
+        return [
+            _get_knowledge_items(
+                result["ids"][i],
+                result["documents"][i],
+                result["metadatas"][i],
+                _to_cosine_distances(result["distances"][i], space),
+            )
+            for i in range(len(embeddings))
+        ]
 
-            document_ids.append(knowledge_item.id)
-            documents.append(knowledge_item.content)
-            metadatas.append(metadata)
+    def _get_items(
+        self,
+        collection: str,
+        ids: List[str],
+        filters: Dict[str, Any] | None = None,
+    ) -> List[KnowledgeItem]:
+        collection: "chromadb.Collection" = self._get_collection(
+            collection, create=not self._read_only_search
+        )
 
-        collection.add(
-            ids=document_ids,
-            documents=documents,
-            metadatas=metadatas,
+        result: "chromadb.GetResult" = collection.get(
+            ids=ids,
+            include=["documents", "metadatas"],
+            where=to_chroma_where(filters) if filters is not None else None,
         )
 
-        logger.debug(
-            f"Stored {len(document_ids)} items in collection: "
-            f"{collection} with document IDs: {document_ids}"
+        knowledge_items_by_id = {
+            knowledge_item.id: knowledge_item
+            for knowledge_item in _get_knowledge_items(
+                result["ids"], result["documents"], result["metadatas"]
+            )
+        }
+
+        return [knowledge_items_by_id[id] for id in ids if id in knowledge_items_by_id]
+
+    def _get_embeddings(self, collection: str, ids: List[str]) -> Dict[str, Any]:
+        collection: "chromadb.Collection" = self._get_collection(
+            collection, create=not self._read_only_search
         )
 
-    def search(
-        self,
-        collection: str,
-        query: str,
-        num_results: int = 1,
-    ) -> List[KnowledgeItem]:
-        """
-        Search the collection for the given query.
+        result: "chromadb.GetResult" = collection.get(ids=ids, include=["embeddings"])
 
-        Args:
-            collection (str): The name of the collection.
-            query (str): The query to search for.
+        return dict(zip(result["ids"], result["embeddings"]))
 
-        Returns:
-            List[KnowledgeItem]: The search results as a list of KnowledgeItem objects.
-        """
-        logger.debug(f"Searching collection: {collection} with query: {query}")
 
-        collection: chromadb.Collection = self._client.get_or_create_collection(
-            name=collection,
-            embedding_function=self._embedding_function,
-        )
+def _get_space(collection: "chromadb.Collection") -> str:
+    return (collection.metadata or {}).get(_COLLECTION_METADATA_KEY_SPACE, _SPACE_L2)
 
-        result: chromadb.QueryResult = collection.query(
-            include=["documents", "metadatas"],
-            query_texts=[query],
-            n_results=num_results,
-        )
 
-        ids = result["ids"][0]
-        documents = result["documents"][0]
-        metadatas = result["metadatas"][0]
-        knowledge_items: List[KnowledgeItem] = []
-
-        for i in range(len(documents)):
-            summary = ""
-            if DICT_KEY_SUMMARY in metadatas[i]:
-                summary = metadatas[i].pop(DICT_KEY_SUMMARY, "")
-
-            knowledge_items.append(
-                KnowledgeItem(
-                    id=ids[i],
-                    content=documents[i],
-                    summary=summary,
-                    metadata=metadatas[i],
-                )
+def _to_cosine_distances(distances: List[float], space: str) -> List[float]:
+    # the squared L2 distance of normalized embeddings is twice their cosine
+    # distance, and chroma's inner product distance 1 - ip is their cosine one
+    if space == _SPACE_L2:
+        return [distance / 2 for distance in distances]
+
+    return distances
+
+
+def _get_knowledge_items(
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    distances: List[float] | None = None,
+) -> List[KnowledgeItem]:
+    knowledge_items: List[KnowledgeItem] = []
+
+    for i in range(len(documents)):
+        summary = ""
+        if DICT_KEY_SUMMARY in metadatas[i]:
+            summary = metadatas[i].pop(DICT_KEY_SUMMARY, "")
+
+        knowledge_items.append(
+            KnowledgeItem(
+                id=ids[i],
+                content=documents[i],
+                summary=summary,
+                metadata=metadatas[i],
+                distance=distances[i] if distances is not None else None,
             )
+        )
+
+    return knowledge_items
+
+
+def __getattr__(name: str) -> Any:
+    # the default embedding function loads onnxruntime, so it is only
+    # created when first accessed instead of when this module is imported
+    if name == "EMBEDDING_FUNCTION_ONNX_MINI_LM_L6_V2":
+        return get_default_embedding_function()
 
-        return knowledge_items
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,5 @@
+from ezpyai.llm.knowledge.chunkers._chunker import Chunker, BaseChunker
+from ezpyai.llm.knowledge.chunkers.newline import ChunkerNewline
+from ezpyai.llm.knowledge.chunkers.fixed_tokens import ChunkerFixedTokens
+from ezpyai.llm.knowledge.chunkers.paragraph import ChunkerParagraph
+from ezpyai.llm.knowledge.chunkers.semantic import ChunkerSemantic
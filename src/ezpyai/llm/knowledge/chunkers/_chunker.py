@@ -0,0 +1,85 @@
+import re
+
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\S+")
+
+
+def get_token_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Get the start and end offsets of the tokens of the given text.
+
+    Tokens are approximated by runs of non-whitespace characters, which keeps
+    chunking independent of any particular model's tokenizer.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        List[Tuple[int, int]]: The start and end offsets of the tokens.
+    """
+    return [match.span() for match in _TOKEN_PATTERN.finditer(text)]
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of the given text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The number of tokens.
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+class Chunker(ABC):
+    # the str of a chunker describes its settings, which the ingestion
+    # manifests compare to tell whether stored chunks have to be rebuilt
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}()"
+
+    @abstractmethod
+    def chunk(self, text: str) -> List[str]:
+        pass
+
+
+class BaseChunker(Chunker):
+    def __init__(self, max_tokens: int) -> None:
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be a positive integer")
+
+        self._max_tokens = max_tokens
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(max_tokens={self._max_tokens})"
+
+    def _split_fixed(self, text: str, overlap_tokens: int = 0) -> List[str]:
+        """
+        Split the given text into windows of at most _max_tokens tokens.
+
+        Args:
+            text (str): The text to split.
+            overlap_tokens (int, optional): The number of tokens shared by consecutive windows. Defaults to 0.
+
+        Returns:
+            List[str]: The windows, keeping the original whitespace between their tokens.
+        """
+        spans = get_token_spans(text)
+        step = self._max_tokens - overlap_tokens
+
+        chunks: List[str] = []
+        for start in range(0, len(spans), step):
+            window = spans[start : start + self._max_tokens]
+            chunks.append(text[window[0][0] : window[-1][1]])
+
+            if start + self._max_tokens >= len(spans):
+                break
+
+        return chunks
+
+    @abstractmethod
+    def chunk(self, text: str) -> List[str]:
+        return []
@@ -0,0 +1,42 @@
+from typing import List
+
+from ezpyai.llm.knowledge.chunkers._chunker import BaseChunker
+
+_DEFAULT_MAX_TOKENS: int = 256
+_DEFAULT_OVERLAP_TOKENS: int = 32
+
+
+class ChunkerFixedTokens(BaseChunker):
+    """
+    Splits text into fixed windows of max_tokens tokens, with consecutive
+    windows sharing overlap_tokens tokens so that no statement is only ever
+    seen cut in half.
+
+    Args:
+        max_tokens (int): The number of tokens per chunk.
+        overlap_tokens (int): The number of tokens shared by consecutive chunks.
+
+    Raises:
+        ValueError: If max_tokens is not positive or overlap_tokens is not in [0, max_tokens).
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = _DEFAULT_MAX_TOKENS,
+        overlap_tokens: int = _DEFAULT_OVERLAP_TOKENS,
+    ) -> None:
+        super().__init__(max_tokens)
+
+        if overlap_tokens < 0:
+            raise ValueError("overlap_tokens must be a non-negative integer")
+
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be less than max_tokens")
+
+        self._overlap_tokens = overlap_tokens
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(max_tokens={self._max_tokens}, overlap_tokens={self._overlap_tokens})"
+
+    def chunk(self, text: str) -> List[str]:
+        return self._split_fixed(text, self._overlap_tokens)
@@ -0,0 +1,16 @@
+from typing import List
+
+from ezpyai.llm.knowledge.chunkers._chunker import Chunker
+
+
+class ChunkerNewline(Chunker):
+    """Splits text on newlines, making every non-empty line a chunk."""
+
+    def chunk(self, text: str) -> List[str]:
+        chunks: List[str] = []
+        for line in text.split("\n"):
+            line = line.strip()
+            if line:
+                chunks.append(line)
+
+        return chunks
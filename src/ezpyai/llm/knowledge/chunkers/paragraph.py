@@ -0,0 +1,92 @@
+import re
+
+from typing import List, Tuple
+
+from ezpyai.llm.knowledge.chunkers._chunker import BaseChunker, count_tokens
+
+_DEFAULT_MAX_TOKENS: int = 256
+
+# from the coarsest to the finest boundary, with the string to rejoin pieces with
+_SEPARATORS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\n\s*\n"), "\n\n"),
+    (re.compile(r"\n"), "\n"),
+    (re.compile(r"(?<=[.!?])\s+"), " "),
+]
+
+
+class ChunkerParagraph(BaseChunker):
+    """
+    Packs paragraphs into chunks of up to max_tokens tokens.
+
+    Text longer than the budget is split at the coarsest boundary that
+    works, paragraphs first, then lines, then sentences and only as a last
+    resort into fixed token windows, and the resulting pieces are packed
+    back together in order as long as they fit in the budget.
+
+    Args:
+        max_tokens (int): The maximum number of tokens per chunk.
+
+    Raises:
+        ValueError: If max_tokens is not a positive integer.
+    """
+
+    def __init__(self, max_tokens: int = _DEFAULT_MAX_TOKENS) -> None:
+        super().__init__(max_tokens)
+
+    def chunk(self, text: str) -> List[str]:
+        return self._split(text.strip(), 0)
+
+    def _split(self, text: str, level: int) -> List[str]:
+        if not text:
+            return []
+
+        if count_tokens(text) <= self._max_tokens:
+            return [text]
+
+        if level == len(_SEPARATORS):
+            return self._split_fixed(text)
+
+        pattern, joiner = _SEPARATORS[level]
+
+        pieces = [piece.strip() for piece in pattern.split(text)]
+        pieces = [piece for piece in pieces if piece]
+
+        if len(pieces) == 1:
+            return self._split(text, level + 1)
+
+        chunks: List[str] = []
+        for piece in pieces:
+            chunks.extend(self._split(piece, level + 1))
+
+        return self._pack(chunks, joiner)
+
+    def _pack(self, pieces: List[str], joiner: str) -> List[str]:
+        """
+        Greedily merge consecutive pieces while they fit in the token budget.
+
+        Args:
+            pieces (List[str]): The pieces, each within the budget.
+            joiner (str): The string to join merged pieces with.
+
+        Returns:
+            List[str]: The packed chunks.
+        """
+        chunks: List[str] = []
+        current: List[str] = []
+        current_tokens = 0
+
+        for piece in pieces:
+            piece_tokens = count_tokens(piece)
+
+            if current and current_tokens + piece_tokens > self._max_tokens:
+                chunks.append(joiner.join(current))
+                current = []
+                current_tokens = 0
+
+            current.append(piece)
+            current_tokens += piece_tokens
+
+        if current:
+            chunks.append(joiner.join(current))
+
+        return chunks
@@ -0,0 +1,124 @@
+import re
+
+from typing import Any, Callable, List, Sequence
+
+from ezpyai.llm.knowledge.chunkers._chunker import BaseChunker, count_tokens
+
+_DEFAULT_MAX_TOKENS: int = 256
+_DEFAULT_BREAKPOINT_PERCENTILE: float = 90.0
+
+# the attributes the model of an embedding function is found in, as named
+# by Chroma's embedding functions
+_MODEL_NAME_ATTRIBUTES = ("model_name", "_model_name", "MODEL_NAME")
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+class ChunkerSemantic(BaseChunker):
+    """
+    Splits text into sentences and groups consecutive sentences into chunks,
+    starting a new chunk where the meaning shifts, that is where the cosine
+    distance between the embeddings of two adjacent sentences is above the
+    breakpoint_percentile of all the adjacent distances of the text, or where
+    the chunk would exceed max_tokens tokens.
+
+    Args:
+        embedding_function (Callable[[List[str]], Sequence[Sequence[float]]]): Embeds a list of texts, e.g. a Chroma embedding function.
+        max_tokens (int): The maximum number of tokens per chunk.
+        breakpoint_percentile (float): The percentile of the adjacent sentence distances above which a chunk ends.
+
+    Raises:
+        ValueError: If max_tokens is not positive or breakpoint_percentile is not in [0, 100].
+    """
+
+    def __init__(
+        self,
+        embedding_function: Callable[[List[str]], Sequence[Sequence[float]]],
+        max_tokens: int = _DEFAULT_MAX_TOKENS,
+        breakpoint_percentile: float = _DEFAULT_BREAKPOINT_PERCENTILE,
+    ) -> None:
+        super().__init__(max_tokens)
+
+        if not 0 <= breakpoint_percentile <= 100:
+            raise ValueError("breakpoint_percentile must be between 0 and 100")
+
+        self._embedding_function = embedding_function
+        self._breakpoint_percentile = breakpoint_percentile
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(embedding_function={_get_embedding_function_identity(self._embedding_function)}, max_tokens={self._max_tokens}, breakpoint_percentile={self._breakpoint_percentile})"
+
+    def _get_sentences(self, text: str) -> List[str]:
+        sentences: List[str] = []
+        for sentence in _SENTENCE_BOUNDARY.split(text):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+
+            if count_tokens(sentence) > self._max_tokens:
+                sentences.extend(self._split_fixed(sentence))
+
+                continue
+
+            sentences.append(sentence)
+
+        return sentences
+
+    def _get_distances(self, sentences: List[str]) -> Any:
+        import numpy as np
+
+        embeddings = np.asarray(self._embedding_function(sentences), dtype=np.float32)
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, np.finfo(np.float32).tiny)
+
+        return 1.0 - np.einsum("ij,ij->i", embeddings[:-1], embeddings[1:])
+
+    def chunk(self, text: str) -> List[str]:
+        sentences = self._get_sentences(text)
+        if len(sentences) <= 1:
+            return sentences
+
+        import numpy as np
+
+        distances = self._get_distances(sentences)
+        threshold = np.percentile(distances, self._breakpoint_percentile)
+
+        chunks: List[str] = []
+        current: List[str] = [sentences[0]]
+        current_tokens = count_tokens(sentences[0])
+
+        for i in range(1, len(sentences)):
+            sentence_tokens = count_tokens(sentences[i])
+
+            if (
+                distances[i - 1] > threshold
+                or current_tokens + sentence_tokens > self._max_tokens
+            ):
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+
+            current.append(sentences[i])
+            current_tokens += sentence_tokens
+
+        chunks.append(" ".join(current))
+
+        return chunks
+
+
+def _get_embedding_function_identity(embedding_function: Any) -> str:
+    # the breakpoints depend on the embeddings, so the str of the chunker tells
+    # the function or class of the embedding function and its model, if any
+    name = getattr(embedding_function, "__qualname__", None)
+    if name is None:
+        name = type(embedding_function).__qualname__
+
+    identity = f"{embedding_function.__module__}.{name}"
+
+    for attribute in _MODEL_NAME_ATTRIBUTES:
+        model_name = getattr(embedding_function, attribute, None)
+        if isinstance(model_name, str):
+            return f"{identity}({model_name})"
+
+    return identity
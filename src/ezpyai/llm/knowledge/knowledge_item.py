@@ -1,9 +1,10 @@
-from typing import Dict
+from typing import Any, Dict
 from ezpyai.constants import (
     DICT_KEY_ID,
     DICT_KEY_METADATA,
     DICT_KEY_CONTENT,
     DICT_KEY_SUMMARY,
+    DICT_KEY_DISTANCE,
 )
 
 
@@ -16,6 +17,7 @@ class KnowledgeItem:
         metadata (Dict[str, str]): The metadata of the knowledge item.
         content (str): The content of the knowledge item.
         summary (str): The summary of the knowledge item's content.
+        distance (float | None): The cosine distance of the knowledge item to the search query, lower is closer, None if not a vector search result.
     """
 
     def __init__(
@@ -24,6 +26,7 @@ class KnowledgeItem:
         content: str,
         summary: str = "",
         metadata: Dict[str, str] = None,
+        distance: float | None = None,
     ):
         if metadata is None:
             metadata = {}
@@ -32,14 +35,16 @@ class KnowledgeItem:
         self.metadata = metadata
         self.content = content
         self.summary = summary
+        self.distance = distance
 
     def __str__(self):
-        return f"{self.__class__.__name__}(id={self.id}, metadata={self.metadata}, content={self.content}, summary={self.summary})"
+        return f"{self.__class__.__name__}(id={self.id}, metadata={self.metadata}, content={self.content}, summary={self.summary}, distance={self.distance})"
 
-    def to_dict(self) -> Dict[str, str]:
+    def to_dict(self) -> Dict[str, Any]:
         return {
             DICT_KEY_ID: self.id,
             DICT_KEY_METADATA: self.metadata,
             DICT_KEY_CONTENT: self.content,
             DICT_KEY_SUMMARY: self.summary,
+            DICT_KEY_DISTANCE: self.distance,
         }
@@ -0,0 +1,958 @@
+import os
+import json
+import shutil
+import threading
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
+from ezpyai._logger import logger
+from ezpyai.constants import (
+    DICT_KEY_SUMMARY,
+    QUANTIZATION_INT8,
+    QUANTIZATION_BINARY,
+)
+from ezpyai.exceptions import CollectionNotFoundError
+from ezpyai.llm.knowledge._knowledge_db import (
+    BaseKnowledgeDB,
+    _QUERY_CACHE_SIZE,
+    _normalize,
+)
+from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+from ezpyai.llm.knowledge._metadata_filter import match_filters, get_filters_mask
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_COLLECTIONS_DIR_NAME: str = "ezpyai_numpy_collections"
+_EMBEDDINGS_FILE_NAME: str = "embeddings.npy"
+_IDS_FILE_NAME: str = "ids.npy"
+_RECORDS_FILE_NAME: str = "records.bin"
+_RECORD_OFFSETS_FILE_NAME: str = "record_offsets.npy"
+_METADATA_KEYS_FILE_NAME: str = "metadata_keys.json"
+_METADATA_VALUES_FILE_NAME: str = "metadata_values_{}.json"
+_METADATA_CODES_FILE_NAME: str = "metadata_codes_{}.npy"
+_SCALES_FILE_NAME: str = "scales.npy"
+_MIN_CAPACITY: int = 1024
+_QUANTIZATIONS: Tuple[str, ...] = (QUANTIZATION_INT8, QUANTIZATION_BINARY)
+_DEFAULT_RESCORE_FACTOR: int = 4
+_INT8_MAX: int = 127
+_SCORE_BLOCK_SIZE: int = 65536
+
+
+class _NumpyCollection:
+    """
+    A collection of embeddings held in a single contiguous float32 matrix.
+
+    The embeddings are L2-normalized when added, so that the cosine
+    similarity of all of them to a query is a single matrix-vector product.
+    The matrix grows by doubling its capacity and deletions move the last
+    row into the freed one, so that the rows in use always stay contiguous.
+    The documents and metadata are kept in columns alongside the matrix,
+    one list per metadata key.
+
+    The collection is persisted as an .npy embedding matrix, an .npy table
+    of IDs, the documents and metadata of every row as JSON records in a
+    binary file with an .npy table of their offsets, and every metadata key
+    as a dictionary-encoded column: a JSON file of its distinct values and
+    an .npy table of the value of every row. A loaded collection
+    memory-maps the matrix and the tables read-only, so that loading takes
+    the same time whatever the size of the collection and the processes
+    searching the same collection share its pages through the OS page
+    cache. Only the rows of the results are read from the records, only
+    the columns of the filtered keys are read, and the collection is copied
+    into memory on the first write.
+
+    With a quantization, every embedding also gets an int8 code, one byte
+    per dimension scaled by the maximum absolute value of the dimension,
+    or a binary code, one bit per dimension set where it is positive. The
+    codes, 4 or 32 times smaller than the embeddings, are scanned to find
+    rescore_factor times the requested number of candidates, and only the
+    embeddings of the candidates are read to rescore them exactly, so that
+    the memory-mapped embeddings of a large collection do not have to fit
+    in memory. The codes are rebuilt after the collection is modified.
+
+    A search only holds the lock of the collection to take the arrays it
+    scores and to read the items of its results, so that concurrent
+    searches are not serialized. A search raced by a write is scored again
+    holding the lock.
+
+    Attributes:
+        name (str): The name of the collection.
+        _path (str): The directory holding the collection files.
+        _embeddings (np.ndarray | None): The embedding matrix, None until the first add.
+        _size (int): The number of rows in use.
+        _version (int): The number of writes, to detect the writes racing a search.
+        _ids (List[str] | np.ndarray): The item ID of every row.
+        _documents (List[str]): The content of every row, once in memory.
+        _metadatas (Dict[str, List[Any]]): The metadata columns, None where a row has no value, once in memory.
+        _metadata_keys (List[str]): The keys of the persisted metadata columns, while memory-mapped.
+        _metadata_columns (Dict[str, Tuple[List[Any], np.ndarray]]): The dictionary-encoded metadata columns filtered on since the last write.
+        _rows (Dict[str, int]): The row of every item ID, once in memory.
+        _records (np.ndarray | None): The memory-mapped records of the rows, None once in memory.
+        _record_offsets (np.ndarray | None): The memory-mapped offsets of the records, None once in memory.
+        _quantization (str | None): The quantization of the codes, QUANTIZATION_INT8, QUANTIZATION_BINARY or None.
+        _rescore_factor (int): The number of candidates rescored per requested result.
+        _codes (np.ndarray | None): The quantized embeddings, None until built.
+        _scales (np.ndarray | None): The per-dimension scales of the int8 codes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        quantization: str | None = None,
+        rescore_factor: int = _DEFAULT_RESCORE_FACTOR,
+    ) -> None:
+        self.name = name
+        self._path = path
+        self._quantization = quantization
+        self._rescore_factor = rescore_factor
+        self._lock = threading.RLock()
+
+        self._embeddings: "np.ndarray | None" = None
+        self._size = 0
+        self._version = 0
+        self._ids: "List[str] | np.ndarray" = []
+        self._documents: List[str] = []
+        self._metadatas: Dict[str, List[Any]] = {}
+        self._metadata_keys: List[str] = []
+        self._metadata_columns: Dict[str, Tuple[List[Any], "np.ndarray"]] = {}
+        self._rows: Dict[str, int] = {}
+        self._records: "np.ndarray | None" = None
+        self._record_offsets: "np.ndarray | None" = None
+        self._codes: "np.ndarray | None" = None
+        self._scales: "np.ndarray | None" = None
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, size={self._size})"
+
+    def _get_file_path(self, file_name: str) -> str:
+        return os.path.join(self._path, file_name)
+
+    @classmethod
+    def load(
+        cls,
+        name: str,
+        path: str,
+        quantization: str | None = None,
+        rescore_factor: int = _DEFAULT_RESCORE_FACTOR,
+    ) -> "_NumpyCollection":
+        """
+        Memory-map the collection in the given directory or create an empty one if it does not exist.
+
+        Args:
+            name (str): The name of the collection.
+            path (str): The directory holding the collection files.
+            quantization (str | None, optional): The quantization of the codes searched first. Defaults to None.
+            rescore_factor (int, optional): The number of candidates rescored per requested result. Defaults to 4.
+
+        Returns:
+            _NumpyCollection: The loaded collection.
+        """
+        collection = cls(name, path, quantization, rescore_factor)
+
+        if not cls.exists(path):
+            return collection
+
+        import numpy as np
+
+        ids = np.load(collection._get_file_path(_IDS_FILE_NAME), mmap_mode="r")
+        if not len(ids):
+            return collection
+
+        collection._ids = ids
+        collection._size = len(ids)
+        collection._embeddings = np.load(
+            collection._get_file_path(_EMBEDDINGS_FILE_NAME), mmap_mode="r"
+        )
+        collection._record_offsets = np.load(
+            collection._get_file_path(_RECORD_OFFSETS_FILE_NAME), mmap_mode="r"
+        )
+        collection._records = np.memmap(
+            collection._get_file_path(_RECORDS_FILE_NAME), dtype=np.uint8, mode="r"
+        )
+
+        with open(
+            collection._get_file_path(_METADATA_KEYS_FILE_NAME), "r", encoding="utf-8"
+        ) as file:
+            collection._metadata_keys = json.load(file)
+
+        codes_path = collection._get_file_path(collection._get_codes_file_name())
+        if quantization is not None and os.path.isfile(codes_path):
+            codes = np.load(codes_path, mmap_mode="r")
+
+            # codes not of the saved rows are left to be rebuilt when needed
+            if len(codes) != collection._size:
+                logger.warning(
+                    f"Ignoring the {quantization} codes of {collection}: "
+                    f"{len(codes)} codes for {collection._size} rows"
+                )
+
+                return collection
+
+            collection._codes = codes
+
+            if quantization == QUANTIZATION_INT8:
+                collection._scales = np.load(
+                    collection._get_file_path(_SCALES_FILE_NAME)
+                )
+
+        logger.debug(f"Memory-mapped {collection} from {path}")
+
+        return collection
+
+    def _get_codes_file_name(self) -> str:
+        return f"codes_{self._quantization}.npy"
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """
+        Check whether a collection was saved in the given directory.
+
+        Args:
+            path (str): The directory holding the collection files.
+
+        Returns:
+            bool: Whether the collection exists.
+        """
+        # the metadata keys are written last, so they mark a complete collection
+        return os.path.isfile(os.path.join(path, _METADATA_KEYS_FILE_NAME))
+
+    def _is_mapped(self) -> bool:
+        return self._records is not None
+
+    def _load_into_memory(self) -> None:
+        if not self._is_mapped():
+            return
+
+        import numpy as np
+
+        items = [self._get_item(row) for row in range(self._size)]
+
+        self._ids = [id for id, _, _ in items]
+        self._documents = [document for _, document, _ in items]
+        self._rows = {id: row for row, id in enumerate(self._ids)}
+        self._embeddings = np.array(self._embeddings, dtype=np.float32)
+        self._records = None
+        self._record_offsets = None
+        self._metadata_keys = []
+
+        self._metadatas = {}
+        for row, (_, _, metadata) in enumerate(items):
+            self._set_metadata(row, metadata)
+
+        logger.debug(f"Loaded {self} into memory")
+
+    def _get_metadata_column(self, key: str) -> Tuple[List[Any], "np.ndarray"]:
+        import numpy as np
+
+        column = self._metadata_columns.get(key)
+        if column is not None:
+            return column
+
+        if not self._is_mapped():
+            column = _encode_column(self._metadatas.get(key, []), self._size)
+        elif key in self._metadata_keys:
+            i = self._metadata_keys.index(key)
+
+            with open(
+                self._get_file_path(_METADATA_VALUES_FILE_NAME.format(i)),
+                "r",
+                encoding="utf-8",
+            ) as file:
+                values = json.load(file)
+
+            column = (
+                values,
+                np.load(
+                    self._get_file_path(_METADATA_CODES_FILE_NAME.format(i)),
+                    mmap_mode="r",
+                ),
+            )
+        else:
+            column = ([], np.full(self._size, -1, dtype=np.int32))
+
+        self._metadata_columns[key] = column
+
+        return column
+
+    def _get_filtered_rows(self, filters: Dict[str, Any]) -> "np.ndarray":
+        import numpy as np
+
+        return np.flatnonzero(
+            get_filters_mask(filters, self._get_metadata_column, self._size)
+        )
+
+    def save(self) -> None:
+        """Atomically write the files of the collection to its directory."""
+        import numpy as np
+
+        with self._lock:
+            if self._is_mapped():
+                return
+
+            os.makedirs(self._path, exist_ok=True)
+
+            dimension = 0
+            if self._embeddings is not None:
+                dimension = self._embeddings.shape[1]
+
+            records = [
+                json.dumps([self._documents[row], self._get_metadata(row)]).encode(
+                    "utf-8"
+                )
+                for row in range(self._size)
+            ]
+
+            record_offsets = np.zeros(self._size + 1, dtype=np.int64)
+            record_offsets[1:] = np.cumsum([len(record) for record in records])
+
+            file_names = set()
+
+            def write(file_name: str, write_file: Callable[[Any], None]) -> None:
+                file_names.add(file_name)
+
+                file_path = self._get_file_path(file_name)
+                with open(f"{file_path}.tmp", "wb") as file:
+                    write_file(file)
+
+                # replacing instead of overwriting keeps the files mapped
+                # by other processes intact until they load the collection again
+                os.replace(f"{file_path}.tmp", file_path)
+
+            write(
+                _EMBEDDINGS_FILE_NAME,
+                lambda file: np.save(
+                    file,
+                    (
+                        self._embeddings[: self._size]
+                        if dimension
+                        else np.empty((0, 0), dtype=np.float32)
+                    ),
+                ),
+            )
+            write(
+                _IDS_FILE_NAME,
+                lambda file: np.save(file, np.array(self._ids, dtype=np.str_)),
+            )
+            write(_RECORDS_FILE_NAME, lambda file: file.write(b"".join(records)))
+            write(_RECORD_OFFSETS_FILE_NAME, lambda file: np.save(file, record_offsets))
+
+            if self._quantization is not None and self._size:
+                codes = self._get_codes()
+                write(self._get_codes_file_name(), lambda file: np.save(file, codes))
+
+                if self._quantization == QUANTIZATION_INT8:
+                    write(_SCALES_FILE_NAME, lambda file: np.save(file, self._scales))
+
+            metadata_keys = list(self._metadatas)
+
+            for i, key in enumerate(metadata_keys):
+                values, codes = self._get_metadata_column(key)
+
+                write(
+                    _METADATA_VALUES_FILE_NAME.format(i),
+                    lambda file: file.write(json.dumps(values).encode("utf-8")),
+                )
+                write(
+                    _METADATA_CODES_FILE_NAME.format(i),
+                    lambda file: np.save(file, codes),
+                )
+
+            write(
+                _METADATA_KEYS_FILE_NAME,
+                lambda file: file.write(json.dumps(metadata_keys).encode("utf-8")),
+            )
+
+            # the files this save did not write, such as the codes of another
+            # quantization or the columns of deleted metadata keys, are stale
+            for file_name in os.listdir(self._path):
+                if file_name not in file_names:
+                    os.remove(self._get_file_path(file_name))
+
+        logger.debug(f"Saved {self} to {self._path}")
+
+    def count(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: List[Any],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Add the items whose IDs are not in the collection yet, like Chroma's add."""
+        self._write(ids, embeddings, documents, metadatas, overwrite=False)
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[Any],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Add the items, overwriting the ones whose IDs are already in the collection."""
+        self._write(ids, embeddings, documents, metadatas, overwrite=True)
+
+    def _write(
+        self,
+        ids: List[str],
+        embeddings: List[Any],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        overwrite: bool,
+    ) -> None:
+        import numpy as np
+
+        vectors = _normalize(np.asarray(embeddings, dtype=np.float32))
+
+        with self._lock:
+            self._load_into_memory()
+            self._reserve(len(ids), vectors.shape[1])
+            self._on_write()
+
+            for i, id in enumerate(ids):
+                row = self._rows.get(id)
+                if row is not None and not overwrite:
+                    continue
+
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self._rows[id] = row
+                    self._ids.append(id)
+                    self._documents.append(documents[i])
+
+                    for column in self._metadatas.values():
+                        column.append(None)
+
+                self._embeddings[row] = vectors[i]
+                self._documents[row] = documents[i]
+                self._set_metadata(row, metadatas[i])
+
+    def _on_write(self) -> None:
+        self._version += 1
+        self._codes = None
+        self._metadata_columns = {}
+
+    def _reserve(self, num_rows: int, dimension: int) -> None:
+        import numpy as np
+
+        if self._embeddings is None:
+            self._embeddings = np.empty(
+                (max(num_rows, _MIN_CAPACITY), dimension), dtype=np.float32
+            )
+
+            return
+
+        if self._embeddings.shape[1] != dimension:
+            raise ValueError(
+                f"embedding dimension {dimension} does not match the "
+                f"collection's dimension {self._embeddings.shape[1]}"
+            )
+
+        capacity = self._embeddings.shape[0]
+        if self._size + num_rows <= capacity:
+            return
+
+        while capacity < self._size + num_rows:
+            capacity *= 2
+
+        embeddings = np.empty((capacity, dimension), dtype=np.float32)
+        embeddings[: self._size] = self._embeddings[: self._size]
+        self._embeddings = embeddings
+
+    def _set_metadata(self, row: int, metadata: Dict[str, Any]) -> None:
+        for column in self._metadatas.values():
+            column[row] = None
+
+        for key, value in metadata.items():
+            if key not in self._metadatas:
+                self._metadatas[key] = [None] * self._size
+
+            self._metadatas[key][row] = value
+
+    def _get_metadata(self, row: int) -> Dict[str, Any]:
+        return {
+            key: column[row]
+            for key, column in self._metadatas.items()
+            if column[row] is not None
+        }
+
+    def get(
+        self, ids: List[str], filters: Dict[str, Any] | None = None
+    ) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Get the items with the given IDs, skipping the IDs not in the collection or not matching the filters.
+
+        Args:
+            ids (List[str]): The IDs of the items.
+            filters (Dict[str, Any] | None, optional): The metadata filter expression. Defaults to None.
+
+        Returns:
+            List[Tuple[str, str, Dict[str, Any]]]: The ID, content and metadata of the items, in the order of the IDs.
+        """
+        with self._lock:
+            self._index_rows()
+
+            items = [self._get_item(self._rows[id]) for id in ids if id in self._rows]
+
+            if filters is None:
+                return items
+
+            return [item for item in items if match_filters(filters, item[2])]
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, "np.ndarray"]:
+        """
+        Get the normalized embeddings of the items with the given IDs, skipping the IDs not in the collection.
+
+        Args:
+            ids (List[str]): The IDs of the items.
+
+        Returns:
+            Dict[str, np.ndarray]: The embeddings of the items found, by ID.
+        """
+        with self._lock:
+            self._index_rows()
+
+            found_ids = [id for id in ids if id in self._rows]
+            embeddings = self._embeddings[[self._rows[id] for id in found_ids]]
+
+        return dict(zip(found_ids, embeddings))
+
+    def _index_rows(self) -> None:
+        # a memory-mapped collection only indexes its IDs when first needed
+        if self._is_mapped() and not self._rows:
+            self._rows = {str(id): row for row, id in enumerate(self._ids)}
+
+    def _get_item(self, row: int) -> Tuple[str, str, Dict[str, Any]]:
+        if not self._is_mapped():
+            return self._ids[row], self._documents[row], self._get_metadata(row)
+
+        start, end = self._record_offsets[row], self._record_offsets[row + 1]
+        document, metadata = json.loads(self._records[start:end].tobytes())
+
+        return str(self._ids[row]), document, metadata
+
+    def delete(self, ids: List[str]) -> None:
+        """
+        Delete the items with the given IDs, ignoring the IDs not in the collection.
+
+        Args:
+            ids (List[str]): The IDs of the items to delete.
+        """
+        with self._lock:
+            self._load_into_memory()
+            self._on_write()
+
+            for id in ids:
+                row = self._rows.pop(id, None)
+                if row is None:
+                    continue
+
+                last_row = self._size - 1
+                if row != last_row:
+                    self._embeddings[row] = self._embeddings[last_row]
+                    self._ids[row] = self._ids[last_row]
+                    self._documents[row] = self._documents[last_row]
+
+                    for column in self._metadatas.values():
+                        column[row] = column[last_row]
+
+                    self._rows[self._ids[row]] = row
+
+                self._ids.pop()
+                self._documents.pop()
+
+                for column in self._metadatas.values():
+                    column.pop()
+
+                self._size -= 1
+
+            for key in [
+                key
+                for key, column in self._metadatas.items()
+                if all(value is None for value in column)
+            ]:
+                del self._metadatas[key]
+
+    def _get_codes(self) -> "np.ndarray":
+        import numpy as np
+
+        if self._codes is not None:
+            return self._codes
+
+        embeddings = self._embeddings[: self._size]
+
+        # the codes and scales are replaced rather than updated, so that
+        # the searches scoring the previous ones are not affected
+        if self._quantization == QUANTIZATION_BINARY:
+            self._codes = np.packbits(embeddings > 0, axis=1)
+        else:
+            scales = np.abs(embeddings).max(axis=0) / _INT8_MAX
+            scales[scales == 0] = 1
+
+            self._scales = scales.astype(np.float32)
+            self._codes = np.rint(embeddings / self._scales).astype(np.int8)
+
+        logger.debug(f"Built the {self._quantization} codes of {self}")
+
+        return self._codes
+
+    def _get_approximate_scores(
+        self, vectors: "np.ndarray", codes: "np.ndarray", scales: "np.ndarray | None"
+    ) -> "np.ndarray":
+        import numpy as np
+
+        scores = np.empty((len(codes), len(vectors)), dtype=np.float32)
+
+        if self._quantization == QUANTIZATION_BINARY:
+            query_codes = np.packbits(vectors > 0, axis=1)
+            popcounts = _get_popcounts()
+        else:
+            query_codes = (vectors * scales).T
+
+        # the codes are scored in blocks to bound the size of the temporaries
+        for start in range(0, len(codes), _SCORE_BLOCK_SIZE):
+            block = codes[start : start + _SCORE_BLOCK_SIZE]
+            end = start + len(block)
+
+            if self._quantization == QUANTIZATION_BINARY:
+                for i, query_code in enumerate(query_codes):
+                    scores[start:end, i] = -popcounts[block ^ query_code].sum(axis=1)
+            else:
+                scores[start:end] = block.astype(np.float32) @ query_codes
+
+        return scores
+
+    def _get_search_arrays(
+        self, filters: Dict[str, Any] | None
+    ) -> "Tuple[np.ndarray, np.ndarray | None, np.ndarray | None, np.ndarray | None]":
+        # a view of the embeddings in use, which the writes update in place
+        # and only replace when growing, so the scoring is redone by query
+        # if a write raced it
+        embeddings = self._embeddings[: self._size]
+
+        # the selected rows, all of them without filters
+        selected = None
+        if filters is not None:
+            selected = self._get_filtered_rows(filters)
+
+        codes, scales = None, None
+        if self._quantization is not None:
+            codes, scales = self._get_codes(), self._scales
+
+        return embeddings, selected, codes, scales
+
+    def _score(
+        self,
+        vectors: "np.ndarray",
+        num_results: int,
+        embeddings: "np.ndarray",
+        selected: "np.ndarray | None",
+        codes: "np.ndarray | None",
+        scales: "np.ndarray | None",
+    ) -> List[List[Tuple[int, float]]]:
+        import numpy as np
+
+        if selected is not None and not len(selected):
+            return [[] for _ in vectors]
+
+        results: List[List[Tuple[int, float]]] = []
+
+        if codes is None:
+            if selected is None:
+                scores = embeddings @ vectors.T
+            else:
+                scores = embeddings[selected] @ vectors.T
+
+            for i in range(len(vectors)):
+                rows = _get_top_rows(scores[:, i], num_results)
+                results.append(
+                    [
+                        (
+                            int(row if selected is None else selected[row]),
+                            float(scores[row, i]),
+                        )
+                        for row in rows
+                    ]
+                )
+
+            return results
+
+        if selected is not None:
+            codes = codes[selected]
+
+        approximate_scores = self._get_approximate_scores(vectors, codes, scales)
+
+        for i, vector in enumerate(vectors):
+            candidates = np.sort(
+                _get_top_rows(
+                    approximate_scores[:, i], num_results * self._rescore_factor
+                )
+            )
+            if selected is not None:
+                candidates = selected[candidates]
+
+            scores = embeddings[candidates] @ vector
+            rows = _get_top_rows(scores, num_results)
+            results.append([(int(candidates[row]), float(scores[row])) for row in rows])
+
+        return results
+
+    def query(
+        self,
+        embeddings: List[Any],
+        num_results: int,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[List[Tuple[str, str, Dict[str, Any], float]]]:
+        """
+        Get the items most similar to each of the given embeddings.
+
+        Without a quantization the search is exact, with the similarities of
+        all the queries computed by a single matrix product, otherwise the
+        candidates found with the codes are rescored with the full precision
+        embeddings. With filters, only the rows whose metadata match them are
+        scored.
+
+        Args:
+            embeddings (List[Any]): The query embeddings.
+            num_results (int): The maximum number of items to return per query.
+            filters (Dict[str, Any] | None, optional): The metadata filter expression. Defaults to None.
+
+        Returns:
+            List[List[Tuple[str, str, Dict[str, Any], float]]]: The ID, content, metadata and cosine similarity of the items of every query, most similar first.
+        """
+        import numpy as np
+
+        vectors = _normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+
+        with self._lock:
+            if not self._size or num_results <= 0:
+                return [[] for _ in vectors]
+
+            version = self._version
+            arrays = self._get_search_arrays(filters)
+
+        results = self._score(vectors, num_results, *arrays)
+
+        with self._lock:
+            if self._version != version:
+                # a write raced the scoring, so the rows may have moved
+                results = self._score(
+                    vectors, num_results, *self._get_search_arrays(filters)
+                )
+
+            return [
+                [(*self._get_item(row), score) for row, score in rows]
+                for rows in results
+            ]
+
+
+def _encode_column(column: List[Any], size: int) -> Tuple[List[Any], "np.ndarray"]:
+    import numpy as np
+
+    values: List[Any] = []
+    codes = np.full(size, -1, dtype=np.int32)
+
+    # the values are told apart by type too, so that True is not 1
+    positions: Dict[Tuple[type, str], int] = {}
+
+    for row, value in enumerate(column[:size]):
+        if value is None:
+            continue
+
+        key = (type(value), json.dumps(value, sort_keys=True))
+        if key not in positions:
+            positions[key] = len(values)
+            values.append(value)
+
+        codes[row] = positions[key]
+
+    return values, codes
+
+
+def _get_top_rows(scores: "np.ndarray", num_rows: int) -> "np.ndarray":
+    import numpy as np
+
+    num_rows = min(num_rows, len(scores))
+    rows = np.argpartition(-scores, num_rows - 1)[:num_rows]
+
+    return rows[np.argsort(-scores[rows], kind="stable")]
+
+
+def _get_popcounts() -> "np.ndarray":
+    import numpy as np
+
+    bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+
+    return bits.sum(axis=1).astype(np.float32)
+
+
+class NumpyDB(BaseKnowledgeDB):
+    """
+    NumpyDB is an in-process vector store keeping the embeddings of every
+    collection in a contiguous float32 NumPy matrix and answering searches
+    by exact cosine similarity, without a database server or index.
+    The collections are persisted in the dsn directory after every store
+    and memory-mapped when loaded, so that a search is answered without
+    reading the whole collection and the worker processes of a host share
+    one copy of it. A process does not see the items stored by another
+    process until it creates a new NumpyDB.
+
+    With a quantization, QUANTIZATION_INT8 or QUANTIZATION_BINARY, searches
+    first scan int8 or binary codes of the embeddings, 4 or 32 times
+    smaller, and rescore the best rescore_factor times the requested number
+    of results with the full precision embeddings.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dsn: str,
+        embedding_function: Callable[[List[str]], Any] | None = None,
+        quantization: str | None = None,
+        rescore_factor: int = _DEFAULT_RESCORE_FACTOR,
+        query_cache_size: int = _QUERY_CACHE_SIZE,
+        query_cache_ttl_seconds: float | None = None,
+        result_cache_size: int = 0,
+        result_cache_ttl_seconds: float | None = None,
+        read_only_search: bool = False,
+        bm25: bool = False,
+    ) -> None:
+        """
+        Initialize the NumpyDB with the given name, dsn, embedding
+        function(default: EMBEDDING_FUNCTION_ONNX_MINI_LM_L6_V2, loaded on first use),
+        quantization(default: None, exact search) and rescore factor(default: 4).
+
+        The embeddings of the last query_cache_size queries are cached, and
+        so are the results of the last result_cache_size searches, each for
+        the given TTL or forever if None. A cache of size 0 is disabled.
+
+        With read_only_search, searches never create collections and raise
+        CollectionNotFoundError for the collections that do not exist.
+
+        With bm25, a BM25 index of every collection is kept in sync by store
+        for hybrid searches.
+
+        Raises:
+            ValueError: If the quantization is unknown or rescore_factor is not a positive integer.
+        """
+        if quantization is not None and quantization not in _QUANTIZATIONS:
+            raise ValueError(
+                f"quantization must be one of {', '.join(_QUANTIZATIONS)} or None"
+            )
+
+        if rescore_factor <= 0:
+            raise ValueError("rescore_factor must be a positive integer")
+
+        super().__init__(
+            name,
+            dsn,
+            embedding_function,
+            query_cache_size=query_cache_size,
+            query_cache_ttl_seconds=query_cache_ttl_seconds,
+            result_cache_size=result_cache_size,
+            result_cache_ttl_seconds=result_cache_ttl_seconds,
+            read_only_search=read_only_search,
+            bm25=bm25,
+        )
+
+        self._quantization = quantization
+        self._rescore_factor = rescore_factor
+
+        self._collections: Dict[str, _NumpyCollection] = {}
+        self._collections_lock = threading.Lock()
+
+        logger.debug(f"NumpyDB initialized with name={name} and dsn={dsn}")
+
+    def _get_collections_dir(self) -> str:
+        return os.path.join(self._dsn, _COLLECTIONS_DIR_NAME)
+
+    def _get_collection(self, collection: str, create: bool = True) -> _NumpyCollection:
+        with self._collections_lock:
+            if collection in self._collections:
+                return self._collections[collection]
+
+            path = os.path.join(self._get_collections_dir(), collection)
+            if not create and not _NumpyCollection.exists(path):
+                raise CollectionNotFoundError(f"Collection {collection} not found")
+
+            self._collections[collection] = _NumpyCollection.load(
+                collection,
+                path,
+                quantization=self._quantization,
+                rescore_factor=self._rescore_factor,
+            )
+
+            return self._collections[collection]
+
+    def _get_store_collection(self, collection: str) -> _NumpyCollection:
+        return self._get_collection(collection)
+
+    def _on_stored(self, collection: _NumpyCollection) -> None:
+        collection.save()
+
+    def destroy(self) -> None:
+        """Destroy the NumpyDB."""
+        logger.debug("NumpyDB destroyed")
+
+        with self._collections_lock:
+            self._collections = {}
+
+        shutil.rmtree(self._get_collections_dir(), ignore_errors=True)
+
+        super().destroy()
+
+    def _query(
+        self,
+        collection: str,
+        embeddings: List[Any],
+        num_results: int,
+        filters: Dict[str, Any] | None = None,
+    ) -> List[List[KnowledgeItem]]:
+        results: List[List[KnowledgeItem]] = []
+        collection = self._get_collection(collection, create=not self._read_only_search)
+
+        for rows in collection.query(embeddings, num_results, filters):
+            results.append(
+                [
+                    # the cosine distance, as in the chroma collections created by ChromaDB
+                    _get_knowledge_item(id, content, metadata, 1 - score)
+                    for id, content, metadata, score in rows
+                ]
+            )
+
+        return results
+
+    def _get_items(
+        self,
+        collection: str,
+        ids: List[str],
+        filters: Dict[str, Any] | None = None,
+    ) -> List[KnowledgeItem]:
+        collection = self._get_collection(collection, create=not self._read_only_search)
+
+        return [
+            _get_knowledge_item(id, content, metadata)
+            for id, content, metadata in collection.get(ids, filters)
+        ]
+
+    def _get_embeddings(self, collection: str, ids: List[str]) -> Dict[str, Any]:
+        collection = self._get_collection(collection, create=not self._read_only_search)
+
+        return collection.get_embeddings(ids)
+
+
+def _get_knowledge_item(
+    id: str, content: str, metadata: Dict[str, Any], distance: float | None = None
+) -> KnowledgeItem:
+    summary = metadata.pop(DICT_KEY_SUMMARY, "")
+
+    return KnowledgeItem(
+        id=id,
+        content=content,
+        summary=summary,
+        metadata=metadata,
+        distance=distance,
+    )
@@ -0,0 +1,96 @@
+import os
+import json
+import hashlib
+
+from typing import Dict
+
+from ezpyai._sqlite_cache import SQLiteCache
+from ezpyai.llm.providers._llm_provider import LLMProvider, get_provider_identity
+
+_SUMMARY_CACHE_FILE_NAME: str = "summaries.sqlite3"
+_DEFAULT_MAX_SIZE_BYTES: int = 256 * 1024 * 1024
+
+
+class SummaryCache:
+    """
+    A persistent cache of knowledge item summaries.
+
+    Summaries are keyed by the SHA256 ID of the summarized content together
+    with the identity of the summarizer: its class, model, temperature and
+    max tokens, see get_provider_identity.
+    Once the cache grows over max_size_bytes the least recently used
+    summaries are evicted.
+
+    Attributes:
+        _cache_dir (str): The directory holding the cache database.
+        _cache (SQLiteCache): The underlying cache.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_bytes: int = _DEFAULT_MAX_SIZE_BYTES,
+    ) -> None:
+        """
+        Initialize the SummaryCache in the given directory.
+
+        Args:
+            cache_dir (str): The directory holding the cache database, created if missing.
+            max_size_bytes (int, optional): The maximum total size of the cached summaries. Defaults to 256MiB.
+        """
+        self._cache_dir = cache_dir
+        self._cache = SQLiteCache(
+            os.path.join(cache_dir, _SUMMARY_CACHE_FILE_NAME),
+            max_size_bytes=max_size_bytes,
+        )
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(cache_dir={self._cache_dir})"
+
+    def _get_key(self, summarizer: LLMProvider, content_id: str) -> str:
+        key = json.dumps(
+            {
+                "summarizer": get_provider_identity(summarizer),
+                "content_id": content_id,
+            },
+            sort_keys=True,
+        )
+
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, summarizer: LLMProvider, content_id: str) -> str | None:
+        """
+        Get the cached summary of the content with the given ID.
+
+        Args:
+            summarizer (LLMProvider): The summarizer the summary was made with.
+            content_id (str): The SHA256 ID of the summarized content.
+
+        Returns:
+            str | None: The summary or None if it is not cached.
+        """
+        return self._cache.get(self._get_key(summarizer, content_id))
+
+    def set(self, summarizer: LLMProvider, content_id: str, summary: str) -> None:
+        """
+        Cache the summary of the content with the given ID.
+
+        Args:
+            summarizer (LLMProvider): The summarizer the summary was made with.
+            content_id (str): The SHA256 ID of the summarized content.
+            summary (str): The summary.
+        """
+        self._cache.set(self._get_key(summarizer, content_id), summary)
+
+    def clear(self) -> None:
+        """Delete all cached summaries."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the hit and miss counters and the current size of the cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses, number of entries and total size in bytes.
+        """
+        return self._cache.get_stats()
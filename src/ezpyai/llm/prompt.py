@@ -6,6 +6,9 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 GENERIC_SYSTEM_MESSAGE = "You are a helpful AI assistant."
 SUMMARIZER_SYSTEM_MESSAGE = """You are a summarizer AI assistant.
 Whenever a user gives you a chunk of text, you will respond with a summary of the text."""
+BATCH_SUMMARIZER_SYSTEM_MESSAGE = """You are a summarizer AI assistant.
+Whenever a user gives you a numbered list of texts, you will respond with a list
+containing a summary of each text, in the same order and with as many summaries as texts."""
 
 
 class Prompt:
@@ -67,3 +70,12 @@ def get_summarizer_prompt(to_summarize: str) -> Prompt:
         system_message=SUMMARIZER_SYSTEM_MESSAGE,
         user_message=f"Summarize the following text: {to_summarize}",
     )
+
+
+def get_batch_summarizer_prompt(to_summarize: List[str]) -> Prompt:
+    texts = "\n".join(f"{i}. {text}" for i, text in enumerate(to_summarize, start=1))
+
+    return Prompt(
+        system_message=BATCH_SUMMARIZER_SYSTEM_MESSAGE,
+        user_message=f"Summarize each of the following {len(to_summarize)} texts:\n{texts}",
+    )
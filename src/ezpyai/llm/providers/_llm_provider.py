@@ -1,14 +1,31 @@
 import json
+import asyncio
+import threading
+
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Tuple,
+    TypeVar,
+)
 
 from ezpyai.llm.prompt import Prompt
+from ezpyai.llm.providers._response_stream import ResponseStream, AsyncResponseStream
+from ezpyai.llm.providers._streaming_json_parser import StreamingJSONParser
 from ezpyai.exceptions import JSONParseError
 
-
 _STRUCTURED_RESPONSE_OUTPUT_INSTRUCTIONS = (
     "Output instructions: your output must be JSON-formatted similar to the following:"
 )
+_DEFAULT_MAX_CONCURRENCY: int = 8
+
+_T = TypeVar("_T")
 
 
 class LLMProvider(ABC):
@@ -23,11 +40,88 @@ class LLMProvider(ABC):
         pass
 
 
-class BaseLLMProvider(LLMProvider):
+class AsyncLLMProvider(ABC):
+    @abstractmethod
+    async def aget_response(self, prompt: Prompt) -> str:
+        pass
+
+    @abstractmethod
+    async def aget_structured_response(
+        self, prompt: Prompt, response_format: List[Any] | Dict[Any, Any]
+    ) -> List[Any] | Dict[Any, Any] | None:
+        pass
+
+
+class BaseLLMProvider(LLMProvider, AsyncLLMProvider):
+    """
+    The base of the LLM providers, implementing the structured responses on
+    top of get_response and aget_response.
+
+    A provider without a native asyncio client gets aget_response running
+    get_response in a worker thread, so that it does not block the event
+    loop; providers with an asyncio client override it.
+
+    The bulk methods send a list of prompts with a bounded number of
+    requests in flight, get_responses and get_structured_responses from
+    worker threads and their async counterparts from the event loop. They
+    return the results in the order of the prompts, with the exception
+    raised for a prompt in place of its result, so that a failed prompt
+    does not abort the others.
+
+    The streaming methods return the response as an iterator of text
+    deltas measuring the time to first token and the tokens per second. A
+    provider without a streaming API streams its whole response as a single
+    delta; providers with one override _iter_response_chunks and
+    _aiter_response_chunks. The streamed structured responses are parsed
+    as they arrive and the generation is stopped as soon as the response
+    is complete or can no longer match the response format.
+    """
+
     @abstractmethod
     def get_response(self, prompt: Prompt) -> str:
         return ""
 
+    async def aget_response(self, prompt: Prompt) -> str:
+        return await asyncio.to_thread(self.get_response, prompt)
+
+    def stream_response(
+        self, prompt: Prompt, on_delta: Callable[[str], None] | None = None
+    ) -> ResponseStream:
+        """
+        Stream the response to the given prompt as it is generated.
+
+        Args:
+            prompt (Prompt): The prompt.
+            on_delta (Callable[[str], None] | None, optional): Called with every text delta as it arrives. Defaults to None.
+
+        Returns:
+            ResponseStream: The iterator over the text deltas of the response, requested on the first iteration.
+        """
+        return ResponseStream(self._iter_response_chunks(prompt), on_delta)
+
+    def astream_response(
+        self, prompt: Prompt, on_delta: Callable[[str], None] | None = None
+    ) -> AsyncResponseStream:
+        """
+        Stream the response to the given prompt as it is generated.
+
+        Args:
+            prompt (Prompt): The prompt.
+            on_delta (Callable[[str], None] | None, optional): Called with every text delta as it arrives. Defaults to None.
+
+        Returns:
+            AsyncResponseStream: The async iterator over the text deltas of the response, requested on the first iteration.
+        """
+        return AsyncResponseStream(self._aiter_response_chunks(prompt), on_delta)
+
+    def _iter_response_chunks(self, prompt: Prompt) -> Iterator[Tuple[str, int | None]]:
+        yield self.get_response(prompt), None
+
+    async def _aiter_response_chunks(
+        self, prompt: Prompt
+    ) -> AsyncIterator[Tuple[str, int | None]]:
+        yield await self.aget_response(prompt), None
+
     def _validate_response_format(
         self, data: Any, response_format: Dict[Any, Any] | List[Any]
     ) -> bool:
@@ -56,16 +150,215 @@ class BaseLLMProvider(LLMProvider):
 
         return response
 
-    def get_structured_response(
+    def _get_structured_prompt(
         self, prompt: Prompt, response_format: Dict[Any, Any] | List[Any]
-    ) -> Dict[Any, Any] | List[Any] | None:
-        prompt = Prompt(
+    ) -> Prompt:
+        return Prompt(
             user_message=prompt.get_user_message(),
             context=prompt.get_context(),
             system_message=f"{prompt.get_system_message()}. {_STRUCTURED_RESPONSE_OUTPUT_INSTRUCTIONS} {json.dumps(response_format)}",
         )
 
-        response = self.remove_artifacts(self.get_response(prompt)).strip()
+    def get_structured_response(
+        self, prompt: Prompt, response_format: Dict[Any, Any] | List[Any]
+    ) -> Dict[Any, Any] | List[Any] | None:
+        response = self.get_response(
+            self._get_structured_prompt(prompt, response_format)
+        )
+
+        return self._parse_structured_response(response, response_format)
+
+    async def aget_structured_response(
+        self, prompt: Prompt, response_format: Dict[Any, Any] | List[Any]
+    ) -> Dict[Any, Any] | List[Any] | None:
+        response = await self.aget_response(
+            self._get_structured_prompt(prompt, response_format)
+        )
+
+        return self._parse_structured_response(response, response_format)
+
+    def get_responses(
+        self, prompts: List[Prompt], max_concurrency: int = _DEFAULT_MAX_CONCURRENCY
+    ) -> List[str | Exception]:
+        """
+        Get the responses to all the given prompts, with up to max_concurrency requests in flight.
+
+        Args:
+            prompts (List[Prompt]): The prompts.
+            max_concurrency (int, optional): The maximum number of requests in flight. Defaults to 8.
+
+        Returns:
+            List[str | Exception]: The response or the raised exception of every prompt, in the order of the prompts.
+
+        Raises:
+            ValueError: If max_concurrency is not a positive integer.
+        """
+        return _map_concurrently(self.get_response, prompts, max_concurrency)
+
+    def get_structured_responses(
+        self,
+        prompts: List[Prompt],
+        response_format: Dict[Any, Any] | List[Any],
+        max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+    ) -> List[Dict[Any, Any] | List[Any] | None | Exception]:
+        """
+        Get the structured responses to all the given prompts, with up to max_concurrency requests in flight.
+
+        Args:
+            prompts (List[Prompt]): The prompts.
+            response_format (Dict[Any, Any] | List[Any]): The format of the responses.
+            max_concurrency (int, optional): The maximum number of requests in flight. Defaults to 8.
+
+        Returns:
+            List[Dict[Any, Any] | List[Any] | None | Exception]: The structured response or the raised exception of every prompt, in the order of the prompts.
+
+        Raises:
+            ValueError: If max_concurrency is not a positive integer.
+        """
+        return _map_concurrently(
+            lambda prompt: self.get_structured_response(prompt, response_format),
+            prompts,
+            max_concurrency,
+        )
+
+    async def aget_responses(
+        self, prompts: List[Prompt], max_concurrency: int = _DEFAULT_MAX_CONCURRENCY
+    ) -> List[str | Exception]:
+        """
+        Get the responses to all the given prompts, with up to max_concurrency requests in flight.
+
+        Args:
+            prompts (List[Prompt]): The prompts.
+            max_concurrency (int, optional): The maximum number of requests in flight. Defaults to 8.
+
+        Returns:
+            List[str | Exception]: The response or the raised exception of every prompt, in the order of the prompts.
+
+        Raises:
+            ValueError: If max_concurrency is not a positive integer.
+        """
+        return await _amap_concurrently(self.aget_response, prompts, max_concurrency)
+
+    async def aget_structured_responses(
+        self,
+        prompts: List[Prompt],
+        response_format: Dict[Any, Any] | List[Any],
+        max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+    ) -> List[Dict[Any, Any] | List[Any] | None | Exception]:
+        """
+        Get the structured responses to all the given prompts, with up to max_concurrency requests in flight.
+
+        Args:
+            prompts (List[Prompt]): The prompts.
+            response_format (Dict[Any, Any] | List[Any]): The format of the responses.
+            max_concurrency (int, optional): The maximum number of requests in flight. Defaults to 8.
+
+        Returns:
+            List[Dict[Any, Any] | List[Any] | None | Exception]: The structured response or the raised exception of every prompt, in the order of the prompts.
+
+        Raises:
+            ValueError: If max_concurrency is not a positive integer.
+        """
+        return await _amap_concurrently(
+            lambda prompt: self.aget_structured_response(prompt, response_format),
+            prompts,
+            max_concurrency,
+        )
+
+    def stream_structured_response(
+        self,
+        prompt: Prompt,
+        response_format: Dict[Any, Any] | List[Any],
+        on_partial: Callable[[Dict[Any, Any] | List[Any]], None] | None = None,
+    ) -> Dict[Any, Any] | List[Any] | None:
+        """
+        Get the structured response to the given prompt, parsing it as it is streamed.
+
+        The generation is stopped as soon as all the keys of an object
+        response format are complete, the root is closed or the response
+        can no longer match the response format, see StreamingJSONParser.
+
+        Args:
+            prompt (Prompt): The prompt.
+            response_format (Dict[Any, Any] | List[Any]): The format of the response.
+            on_partial (Callable[[Dict[Any, Any] | List[Any]], None] | None, optional): Called with the partial response every time a top-level value completes. Defaults to None.
+
+        Returns:
+            Dict[Any, Any] | List[Any] | None: The structured response, None if it does not match the response format.
+
+        Raises:
+            JSONParseError: If the response is not valid JSON.
+        """
+        parser = StreamingJSONParser(
+            response_format, self._validate_response_format, on_partial
+        )
+
+        with self.stream_response(
+            self._get_structured_prompt(prompt, response_format)
+        ) as stream:
+            for delta in stream:
+                if parser.feed(delta):
+                    break
+
+        return self._get_streamed_structured_response(
+            parser, stream.get_text(), response_format
+        )
+
+    async def astream_structured_response(
+        self,
+        prompt: Prompt,
+        response_format: Dict[Any, Any] | List[Any],
+        on_partial: Callable[[Dict[Any, Any] | List[Any]], None] | None = None,
+    ) -> Dict[Any, Any] | List[Any] | None:
+        """
+        Get the structured response to the given prompt, parsing it as it is streamed.
+
+        The generation is stopped as soon as all the keys of an object
+        response format are complete, the root is closed or the response
+        can no longer match the response format, see StreamingJSONParser.
+
+        Args:
+            prompt (Prompt): The prompt.
+            response_format (Dict[Any, Any] | List[Any]): The format of the response.
+            on_partial (Callable[[Dict[Any, Any] | List[Any]], None] | None, optional): Called with the partial response every time a top-level value completes. Defaults to None.
+
+        Returns:
+            Dict[Any, Any] | List[Any] | None: The structured response, None if it does not match the response format.
+
+        Raises:
+            JSONParseError: If the response is not valid JSON.
+        """
+        parser = StreamingJSONParser(
+            response_format, self._validate_response_format, on_partial
+        )
+
+        async with self.astream_response(
+            self._get_structured_prompt(prompt, response_format)
+        ) as stream:
+            async for delta in stream:
+                if parser.feed(delta):
+                    break
+
+        return self._get_streamed_structured_response(
+            parser, stream.get_text(), response_format
+        )
+
+    def _get_streamed_structured_response(
+        self,
+        parser: StreamingJSONParser,
+        response: str,
+        response_format: Dict[Any, Any] | List[Any],
+    ) -> Dict[Any, Any] | List[Any] | None:
+        if parser.is_done():
+            return parser.get_value()
+
+        # a response ending before its root or whose root is not a container
+        return self._parse_structured_response(response, response_format)
+
+    def _parse_structured_response(
+        self, response: str, response_format: Dict[Any, Any] | List[Any]
+    ) -> Dict[Any, Any] | List[Any] | None:
+        response = self.remove_artifacts(response).strip()
 
         try:
             structured_resp = json.loads(response)
@@ -78,3 +371,96 @@ class BaseLLMProvider(LLMProvider):
             return structured_resp
 
         return None
+
+
+def get_provider_identity(provider: LLMProvider) -> Dict[str, Any]:
+    """
+    Get the fields identifying the responses of the given provider, for cache keys.
+
+    The fields are the class of the provider, the base URL of its client
+    and its model, temperature and max tokens, None for the ones it does
+    not have, so that they stay the same across processes and the same
+    model served by different endpoints is told apart. A provider wrapping
+    another one is identified by the wrapped provider.
+
+    Args:
+        provider (LLMProvider): The provider.
+
+    Returns:
+        Dict[str, Any]: The identifying fields, JSON-serializable.
+    """
+    wrapped_provider = getattr(provider, "_provider", None)
+    if isinstance(wrapped_provider, LLMProvider):
+        return get_provider_identity(wrapped_provider)
+
+    base_url = getattr(getattr(provider, "_client", None), "base_url", None)
+
+    return {
+        "provider": provider.__class__.__name__,
+        "base_url": str(base_url) if base_url is not None else None,
+        "model": getattr(provider, "_model", None),
+        "temperature": getattr(provider, "_temperature", None),
+        "max_tokens": getattr(provider, "_max_tokens", None),
+    }
+
+
+def _map_concurrently(
+    function: Callable[[Prompt], _T], prompts: List[Prompt], max_concurrency: int
+) -> List[_T | Exception]:
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be a positive integer")
+
+    results: List[_T | Exception | None] = [None] * len(prompts)
+    indexed_prompts = iter(enumerate(prompts))
+    lock = threading.Lock()
+
+    # every worker takes the next prompt once done with its previous one,
+    # so that no more than max_concurrency prompts are pending at once
+    def work() -> None:
+        while True:
+            with lock:
+                i, prompt = next(indexed_prompts, (None, None))
+
+            if i is None:
+                return
+
+            try:
+                results[i] = function(prompt)
+            except Exception as e:
+                results[i] = e
+
+    workers = [
+        threading.Thread(target=work, daemon=True)
+        for _ in range(min(max_concurrency, len(prompts)))
+    ]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        worker.join()
+
+    return results
+
+
+async def _amap_concurrently(
+    function: Callable[[Prompt], Awaitable[_T]],
+    prompts: List[Prompt],
+    max_concurrency: int,
+) -> List[_T | Exception]:
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be a positive integer")
+
+    results: List[_T | Exception | None] = [None] * len(prompts)
+    indexed_prompts = iter(enumerate(prompts))
+
+    async def work() -> None:
+        for i, prompt in indexed_prompts:
+            try:
+                results[i] = await function(prompt)
+            except Exception as e:
+                results[i] = e
+
+    await asyncio.gather(*(work() for _ in range(min(max_concurrency, len(prompts)))))
+
+    return results
@@ -0,0 +1,223 @@
+import time
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Tuple,
+)
+
+from ezpyai._logger import logger
+from ezpyai.constants import (
+    DICT_KEY_NUM_TOKENS,
+    DICT_KEY_DURATION_SECONDS,
+    DICT_KEY_TIME_TO_FIRST_TOKEN_SECONDS,
+    DICT_KEY_TOKENS_PER_SECOND,
+)
+
+
+class _BaseResponseStream:
+    """
+    The measurements shared by the sync and async response streams.
+
+    A stream consumes the chunks of a response as (text delta, number of
+    tokens) tuples, the number of tokens being None except in the chunk
+    reporting the usage of the response. Without a usage chunk, every
+    non-empty delta is counted as a token.
+
+    Attributes:
+        _on_delta (Callable[[str], None] | None): Called with every text delta as it arrives.
+        _deltas (List[str]): The text deltas received so far.
+        _num_tokens (int | None): The number of tokens reported by the usage chunk.
+        _start_time (float | None): When the response was requested.
+        _first_token_time (float | None): When the first text delta arrived.
+        _end_time (float | None): When the response ended.
+    """
+
+    def __init__(self, on_delta: Callable[[str], None] | None = None) -> None:
+        self._on_delta = on_delta
+        self._deltas: List[str] = []
+        self._num_tokens: int | None = None
+        self._start_time: float | None = None
+        self._first_token_time: float | None = None
+        self._end_time: float | None = None
+
+    def _on_start(self) -> None:
+        if self._start_time is None:
+            self._start_time = time.monotonic()
+
+    def _on_chunk(self, delta: str, num_tokens: int | None) -> bool:
+        if num_tokens is not None:
+            self._num_tokens = num_tokens
+
+        if not delta:
+            return False
+
+        if self._first_token_time is None:
+            self._first_token_time = time.monotonic()
+
+        self._deltas.append(delta)
+
+        if self._on_delta is not None:
+            self._on_delta(delta)
+
+        return True
+
+    def _on_end(self) -> None:
+        if self._end_time is not None:
+            return
+
+        self._end_time = time.monotonic()
+
+        logger.debug(f"Response stream ended: {self.get_stats()}")
+
+    def get_text(self) -> str:
+        """
+        Get the text received so far.
+
+        Returns:
+            str: The concatenated text deltas.
+        """
+        return "".join(self._deltas)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the latency and throughput of the response.
+
+        The tokens per second are the ones generated after the first token,
+        so that they measure the generation speed apart from the time to
+        first token. Before the end of the response they are measured up to
+        now.
+
+        Returns:
+            Dict[str, Any]: The number of tokens, the time to first token, the duration in seconds and the tokens per second, None while unknown.
+        """
+        num_tokens = self._num_tokens
+        if num_tokens is None:
+            num_tokens = len(self._deltas)
+
+        end_time = self._end_time
+        if end_time is None:
+            end_time = time.monotonic()
+
+        time_to_first_token = None
+        tokens_per_second = None
+
+        if self._first_token_time is not None:
+            time_to_first_token = self._first_token_time - self._start_time
+
+            generation_time = end_time - self._first_token_time
+            if generation_time > 0 and num_tokens > 1:
+                tokens_per_second = (num_tokens - 1) / generation_time
+
+        return {
+            DICT_KEY_NUM_TOKENS: num_tokens,
+            DICT_KEY_TIME_TO_FIRST_TOKEN_SECONDS: time_to_first_token,
+            DICT_KEY_DURATION_SECONDS: (
+                end_time - self._start_time if self._start_time is not None else None
+            ),
+            DICT_KEY_TOKENS_PER_SECOND: tokens_per_second,
+        }
+
+
+class ResponseStream(_BaseResponseStream):
+    """
+    An iterator over the text deltas of a streamed response.
+
+    The response is requested on the first iteration. Closing the stream
+    before its end stops the generation.
+
+    Args:
+        chunks (Iterator[Tuple[str, int | None]]): The text delta and number of tokens of every chunk.
+        on_delta (Callable[[str], None] | None, optional): Called with every text delta as it arrives. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterator[Tuple[str, int | None]],
+        on_delta: Callable[[str], None] | None = None,
+    ) -> None:
+        super().__init__(on_delta)
+
+        self._chunks = chunks
+
+    def __iter__(self) -> "ResponseStream":
+        return self
+
+    def __next__(self) -> str:
+        self._on_start()
+
+        for delta, num_tokens in self._chunks:
+            if self._on_chunk(delta, num_tokens):
+                return delta
+
+        self._on_end()
+
+        raise StopIteration
+
+    def __enter__(self) -> "ResponseStream":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the response, closing its connection if still open."""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+        self._on_end()
+
+
+class AsyncResponseStream(_BaseResponseStream):
+    """
+    An async iterator over the text deltas of a streamed response.
+
+    The response is requested on the first iteration. Closing the stream
+    before its end stops the generation.
+
+    Args:
+        chunks (AsyncIterator[Tuple[str, int | None]]): The text delta and number of tokens of every chunk.
+        on_delta (Callable[[str], None] | None, optional): Called with every text delta as it arrives. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[Tuple[str, int | None]],
+        on_delta: Callable[[str], None] | None = None,
+    ) -> None:
+        super().__init__(on_delta)
+
+        self._chunks = chunks
+
+    def __aiter__(self) -> "AsyncResponseStream":
+        return self
+
+    async def __anext__(self) -> str:
+        self._on_start()
+
+        async for delta, num_tokens in self._chunks:
+            if self._on_chunk(delta, num_tokens):
+                return delta
+
+        self._on_end()
+
+        raise StopAsyncIteration
+
+    async def __aenter__(self) -> "AsyncResponseStream":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop the response, closing its connection if still open."""
+        aclose = getattr(self._chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+        self._on_end()
@@ -0,0 +1,273 @@
+import json
+
+from typing import Any, Callable, Dict, List
+
+from ezpyai.exceptions import JSONParseError
+
+_FENCES: List[str] = ["```json", "```"]
+_FENCE_CHARS: str = "`json"
+_WHITESPACE: str = " \t\r\n"
+_OPENERS: Dict[str, str] = {"{": "}", "[": "]"}
+
+# the expectations of the parser at the top level of the root container
+_EXPECT_KEY: str = "key"
+_EXPECT_COLON: str = "colon"
+_EXPECT_VALUE: str = "value"
+_EXPECT_COMMA: str = "comma"
+
+
+class StreamingJSONParser:
+    """
+    An incremental parser of a structured response, fed the text deltas of
+    the response as they arrive.
+
+    Only the top level of the root object or array is tracked character by
+    character: every top-level value is decoded with json.loads as soon as
+    it ends, and added to the partial value. The parser is done once the
+    root is closed, once all the keys of an object response format are
+    complete, or as soon as the response can no longer match the response
+    format: a root of the wrong type or an array item failing validation,
+    in which case the value is None. A response that is not JSON raises
+    JSONParseError as soon as it is seen, and one whose root is not an
+    object or an array with an empty response format is left to be parsed
+    whole, see is_streamable.
+
+    Args:
+        response_format (Dict[Any, Any] | List[Any]): The format of the response.
+        validate (Callable[[Any, Any], bool]): Checks a value against a response format.
+        on_partial (Callable[[Dict[Any, Any] | List[Any]], None] | None, optional): Called with a copy of the partial value every time a top-level value completes. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        response_format: Dict[Any, Any] | List[Any],
+        validate: Callable[[Any, Any], bool],
+        on_partial: Callable[[Dict[Any, Any] | List[Any]], None] | None = None,
+    ) -> None:
+        self._response_format = response_format
+        self._validate = validate
+        self._on_partial = on_partial
+
+        self._text = ""
+        self._position = 0
+        self._root_start: int | None = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._expect = _EXPECT_VALUE
+        self._token_start: int | None = None
+        self._key: Any = None
+        self._value: Dict[Any, Any] | List[Any] | None = None
+        self._done = False
+        self._matches = True
+        self._streamable = True
+
+    def is_done(self) -> bool:
+        """
+        Check whether the parser needs no more text.
+
+        Returns:
+            bool: Whether the value is complete or can no longer match the response format.
+        """
+        return self._done
+
+    def is_streamable(self) -> bool:
+        """
+        Check whether the response is parsed incrementally.
+
+        Returns:
+            bool: False if the root of the response is not an object or an array, so the whole text has to be parsed.
+        """
+        return self._streamable
+
+    def get_value(self) -> Dict[Any, Any] | List[Any] | None:
+        """
+        Get the value parsed so far.
+
+        Returns:
+            Dict[Any, Any] | List[Any] | None: The top-level values completed so far, None if the response does not match the response format.
+        """
+        if not self._matches:
+            return None
+
+        return self._value
+
+    def feed(self, delta: str) -> bool:
+        """
+        Parse the given text delta.
+
+        Args:
+            delta (str): The next text of the response.
+
+        Returns:
+            bool: Whether the parser is done.
+
+        Raises:
+            JSONParseError: If the response is not valid JSON.
+        """
+        self._text += delta
+
+        while not self._done and self._streamable and self._position < len(self._text):
+            if self._root_start is None:
+                self._parse_prefix_char(self._text[self._position])
+            else:
+                self._parse_char(self._text[self._position])
+
+            self._position += 1
+
+        return self._done
+
+    def _fail(self) -> None:
+        raise JSONParseError(f"Failed to parse structured response: {self._text}")
+
+    def _stop(self, matches: bool) -> None:
+        self._done = True
+        self._matches = matches
+
+    def _parse_prefix_char(self, char: str) -> None:
+        if char in _OPENERS:
+            if _remove_fences(self._text[: self._position]).strip(_WHITESPACE):
+                self._fail()
+
+            self._root_start = self._position
+            self._stack.append(char)
+            self._value = {} if char == "{" else []
+            self._expect = _EXPECT_KEY if char == "{" else _EXPECT_VALUE
+
+            if not self._matches_root_type():
+                self._stop(False)
+
+            return
+
+        # the fences may still be incomplete, they are checked at the root
+        if char not in _WHITESPACE and char not in _FENCE_CHARS:
+            if self._response_format:
+                self._fail()
+
+            # any JSON matches an empty response format
+            self._streamable = False
+
+    def _matches_root_type(self) -> bool:
+        if not self._response_format:
+            return True
+
+        return isinstance(self._value, type(self._response_format))
+
+    def _parse_char(self, char: str) -> None:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+
+                if len(self._stack) == 1:
+                    self._on_token(self._position + 1)
+
+            return
+
+        if len(self._stack) > 1:
+            # nested values are only followed to find where they end
+            if char == '"':
+                self._in_string = True
+            elif char in _OPENERS:
+                self._stack.append(char)
+            elif char in "}]":
+                if _OPENERS[self._stack.pop()] != char:
+                    self._fail()
+
+                if len(self._stack) == 1:
+                    self._on_token(self._position + 1)
+
+            return
+
+        if self._token_start is not None and (char in _WHITESPACE or char in ",}]"):
+            # a number, true, false or null ends with the next separator
+            self._on_token(self._position)
+
+            if self._done:
+                return
+
+        if char in _WHITESPACE:
+            return
+
+        if self._token_start is not None:
+            return
+
+        if char == '"' or (self._expect == _EXPECT_VALUE and char not in ",:}]"):
+            if self._expect not in (_EXPECT_KEY, _EXPECT_VALUE):
+                self._fail()
+
+            self._token_start = self._position
+            self._in_string = char == '"'
+
+            if char in _OPENERS:
+                self._stack.append(char)
+                self._in_string = False
+
+            return
+
+        if char == ":" and self._expect == _EXPECT_COLON:
+            self._expect = _EXPECT_VALUE
+        elif char == "," and self._expect == _EXPECT_COMMA:
+            self._expect = (
+                _EXPECT_KEY if isinstance(self._value, dict) else _EXPECT_VALUE
+            )
+        elif char == _OPENERS[self._stack[0]] and self._can_close():
+            self._stack.pop()
+            self._stop(self._validate(self._value, self._response_format))
+        else:
+            self._fail()
+
+    def _can_close(self) -> bool:
+        if self._expect == _EXPECT_COMMA:
+            return True
+
+        # an empty container, without a pending key or a trailing comma
+        empty_expect = _EXPECT_KEY if isinstance(self._value, dict) else _EXPECT_VALUE
+
+        return not self._value and self._expect == empty_expect
+
+    def _on_token(self, end: int) -> None:
+        token = self._text[self._token_start : end]
+        self._token_start = None
+
+        try:
+            value = json.loads(token)
+        except json.JSONDecodeError:
+            self._fail()
+
+        if self._expect == _EXPECT_KEY:
+            self._key = value
+            self._expect = _EXPECT_COLON
+
+            return
+
+        self._expect = _EXPECT_COMMA
+
+        if isinstance(self._value, dict):
+            self._value[self._key] = value
+        else:
+            self._value.append(value)
+
+        if self._on_partial is not None:
+            self._on_partial(self._value.copy())
+
+        if isinstance(self._value, list):
+            index = len(self._value) - 1
+            if index < len(self._response_format) and not self._validate(
+                value, self._response_format[index]
+            ):
+                self._stop(False)
+        elif self._response_format and all(
+            key in self._value for key in self._response_format
+        ):
+            self._stop(True)
+
+
+def _remove_fences(text: str) -> str:
+    for fence in _FENCES:
+        text = text.replace(fence, "")
+
+    return text
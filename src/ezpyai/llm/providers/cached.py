@@ -0,0 +1,188 @@
+import os
+import json
+import asyncio
+import hashlib
+
+from contextlib import aclosing, closing
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
+
+from ezpyai._logger import logger
+from ezpyai._sqlite_cache import SQLiteCache
+from ezpyai.llm.prompt import Prompt
+from ezpyai.llm.providers._llm_provider import (
+    LLMProvider,
+    AsyncLLMProvider,
+    BaseLLMProvider,
+    get_provider_identity,
+)
+
+_RESPONSE_CACHE_FILE_NAME: str = "responses.sqlite3"
+_DEFAULT_MAX_SIZE_BYTES: int = 256 * 1024 * 1024
+
+
+class LLMProviderCached(BaseLLMProvider):
+    """
+    An exact-match response cache wrapping any LLM provider.
+
+    The responses are keyed by a SHA256 hash of the provider class, the
+    base URL of its client, its model, temperature and max tokens, and the
+    messages the prompt is sent as, so a prompt is only sent once per
+    endpoint and set of generation parameters. The structured responses are
+    built on the cached responses. The cache is a SQLite database in the
+    cache directory that can be shared by several threads and processes;
+    entries older than ttl_seconds are treated as missing and the least
+    recently used ones are evicted once the cache grows over max_size_bytes.
+    The async methods read and write the cache in a worker thread, so that
+    they do not block the event loop.
+
+    Only complete responses are cached, a stream closed before its end is
+    not. Since a cached response is returned instead of sampling a new one,
+    the cache is best suited to deterministic or repeated prompts, such as
+    summaries and evaluation sets.
+
+    Args:
+        provider (LLMProvider): The provider whose responses are cached.
+        cache_dir (str): The directory holding the cache database, created if missing.
+        max_size_bytes (int, optional): The maximum total size of the cached responses. Defaults to 256MiB.
+        ttl_seconds (float | None, optional): The time to live of a cached response, forever if None. Defaults to None.
+
+    Raises:
+        ValueError: If max_size_bytes or ttl_seconds is not positive.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        cache_dir: str,
+        max_size_bytes: int = _DEFAULT_MAX_SIZE_BYTES,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self._provider = provider
+        self._cache_dir = cache_dir
+        self._cache = SQLiteCache(
+            os.path.join(cache_dir, _RESPONSE_CACHE_FILE_NAME),
+            max_size_bytes=max_size_bytes,
+            ttl_seconds=ttl_seconds,
+        )
+
+    def __str__(self) -> str:
+        return f"{self.__class__.__name__}(provider={self._provider}, cache_dir={self._cache_dir})"
+
+    def _get_messages(self, prompt: Prompt) -> List[Dict[str, str]] | List[str]:
+        prompt_to_messages = getattr(self._provider, "_prompt_to_messages", None)
+        if prompt_to_messages is not None:
+            return prompt_to_messages(prompt)
+
+        return [
+            prompt.get_system_message(),
+            prompt.get_context_as_string(),
+            prompt.get_user_message(),
+        ]
+
+    def _get_key(self, prompt: Prompt) -> str:
+        key = json.dumps(
+            {
+                **get_provider_identity(self._provider),
+                "messages": self._get_messages(prompt),
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get_response(self, prompt: Prompt) -> str:
+        key = self._get_key(prompt)
+
+        response = self._cache.get(key)
+        if response is not None:
+            logger.debug(f"Response cache hit: {key}")
+
+            return response
+
+        response = self._provider.get_response(prompt)
+        self._cache.set(key, response)
+
+        return response
+
+    async def aget_response(self, prompt: Prompt) -> str:
+        key = self._get_key(prompt)
+
+        response = await asyncio.to_thread(self._cache.get, key)
+        if response is not None:
+            logger.debug(f"Response cache hit: {key}")
+
+            return response
+
+        if isinstance(self._provider, AsyncLLMProvider):
+            response = await self._provider.aget_response(prompt)
+        else:
+            response = await asyncio.to_thread(self._provider.get_response, prompt)
+
+        await asyncio.to_thread(self._cache.set, key, response)
+
+        return response
+
+    def _iter_response_chunks(self, prompt: Prompt) -> Iterator[Tuple[str, int | None]]:
+        if not isinstance(self._provider, BaseLLMProvider):
+            yield from super()._iter_response_chunks(prompt)
+
+            return
+
+        key = self._get_key(prompt)
+
+        response = self._cache.get(key)
+        if response is not None:
+            yield response, None
+
+            return
+
+        deltas: List[str] = []
+
+        with closing(self._provider._iter_response_chunks(prompt)) as chunks:
+            for delta, num_tokens in chunks:
+                deltas.append(delta)
+
+                yield delta, num_tokens
+
+        self._cache.set(key, "".join(deltas))
+
+    async def _aiter_response_chunks(
+        self, prompt: Prompt
+    ) -> AsyncIterator[Tuple[str, int | None]]:
+        if not isinstance(self._provider, BaseLLMProvider):
+            async for chunk in super()._aiter_response_chunks(prompt):
+                yield chunk
+
+            return
+
+        key = self._get_key(prompt)
+
+        response = await asyncio.to_thread(self._cache.get, key)
+        if response is not None:
+            yield response, None
+
+            return
+
+        deltas: List[str] = []
+
+        async with aclosing(self._provider._aiter_response_chunks(prompt)) as chunks:
+            async for delta, num_tokens in chunks:
+                deltas.append(delta)
+
+                yield delta, num_tokens
+
+        await asyncio.to_thread(self._cache.set, key, "".join(deltas))
+
+    def clear(self) -> None:
+        """Delete all cached responses."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get the hit and miss counters and the current size of the cache.
+
+        Returns:
+            Dict[str, int]: The hits, misses, number of entries and total size in bytes.
+        """
+        return self._cache.get_stats()
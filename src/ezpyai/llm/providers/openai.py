@@ -1,7 +1,7 @@
 import os
 
-from typing import List, Dict
-from openai import OpenAI as _OpenAI
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+from openai import OpenAI as _OpenAI, AsyncOpenAI as _AsyncOpenAI
 from ezpyai._logger import logger
 from ezpyai.llm.providers._llm_provider import BaseLLMProvider
 from ezpyai.llm.prompt import Prompt
@@ -19,7 +19,6 @@ from ezpyai.constants import (
     DICT_KEY_ROLE,
 )
 
-
 # Constants for OpenAI GPT models with context window sizes and specific versions
 MODEL_GPT_4O: str = (
     "gpt-4o-2024-05-13"  # context window = 128,000 tokens, trained up to Oct 2023
@@ -59,6 +58,11 @@ _DEFAULT_MAX_TOKENS: int = 150
 
 
 class LLMProviderOpenAI(BaseLLMProvider):
+    # whether the streamed responses end with a chunk reporting the usage,
+    # which the OpenAI compatible servers not supporting stream_options
+    # reject, the streams counting one token per text delta without it
+    _stream_usage: bool = True
+
     def __init__(
         self,
         model: str = _DEFAULT_MODEL,
@@ -83,6 +87,13 @@ class LLMProviderOpenAI(BaseLLMProvider):
             project=project,
         )
 
+        # the asyncio client lets all the aget_response calls share one event loop
+        self._async_client = _AsyncOpenAI(
+            api_key=api_key,
+            organization=organization,
+            project=project,
+        )
+
         self._model = model
         self._temperature = temperature
         self._max_tokens = max_tokens
@@ -111,24 +122,96 @@ class LLMProviderOpenAI(BaseLLMProvider):
 
         return messages
 
-    def get_response(self, prompt: Prompt) -> str:
+    def _get_completion_params(self, prompt: Prompt) -> Dict[str, Any]:
         messages = self._prompt_to_messages(prompt)
 
-        try:
-            logger.debug(f"Sending messages: {messages} to model {self._model}")
-
-            response = self._client.chat.completions.create(
-                model=self._model,
-                temperature=self._temperature,
-                max_tokens=self._max_tokens,
-                messages=messages,
-            )
-        except Exception as e:
-            raise LLMInferenceError() from e
+        logger.debug(f"Sending messages: {messages} to model {self._model}")
 
+        return {
+            "model": self._model,
+            "temperature": self._temperature,
+            "max_tokens": self._max_tokens,
+            "messages": messages,
+        }
+
+    def _get_response_content(self, response: Any) -> str:
         if not response.choices:
             raise LLMResponseEmptyError()
 
         response = response.choices[0].message.content
 
         return response if response is not None else ""
+
+    def get_response(self, prompt: Prompt) -> str:
+        params = self._get_completion_params(prompt)
+
+        try:
+            response = self._client.chat.completions.create(**params)
+        except Exception as e:
+            raise LLMInferenceError() from e
+
+        return self._get_response_content(response)
+
+    async def aget_response(self, prompt: Prompt) -> str:
+        params = self._get_completion_params(prompt)
+
+        try:
+            response = await self._async_client.chat.completions.create(**params)
+        except Exception as e:
+            raise LLMInferenceError() from e
+
+        return self._get_response_content(response)
+
+    def _get_stream_params(self, prompt: Prompt) -> Dict[str, Any]:
+        params = self._get_completion_params(prompt)
+        params["stream"] = True
+
+        if self._stream_usage:
+            # the last chunk reports the usage, to count the generated tokens
+            params["stream_options"] = {"include_usage": True}
+
+        return params
+
+    def _iter_response_chunks(self, prompt: Prompt) -> Iterator[Tuple[str, int | None]]:
+        params = self._get_stream_params(prompt)
+
+        try:
+            stream = self._client.chat.completions.create(**params)
+        except Exception as e:
+            raise LLMInferenceError() from e
+
+        # closing the stream early closes the connection, stopping the generation
+        with stream:
+            try:
+                for chunk in stream:
+                    yield _get_chunk_delta(chunk)
+            except Exception as e:
+                raise LLMInferenceError() from e
+
+    async def _aiter_response_chunks(
+        self, prompt: Prompt
+    ) -> AsyncIterator[Tuple[str, int | None]]:
+        params = self._get_stream_params(prompt)
+
+        try:
+            stream = await self._async_client.chat.completions.create(**params)
+        except Exception as e:
+            raise LLMInferenceError() from e
+
+        async with stream:
+            try:
+                async for chunk in stream:
+                    yield _get_chunk_delta(chunk)
+            except Exception as e:
+                raise LLMInferenceError() from e
+
+
+def _get_chunk_delta(chunk: Any) -> Tuple[str, int | None]:
+    num_tokens = None
+    if chunk.usage is not None:
+        num_tokens = chunk.usage.completion_tokens
+
+    if not chunk.choices or chunk.choices[0].delta.content is None:
+        return "", num_tokens
+
+    return chunk.choices[0].delta.content, num_tokens
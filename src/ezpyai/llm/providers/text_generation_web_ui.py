@@ -1,6 +1,6 @@
 import os
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from typing import List
 
 from ezpyai.constants import (
@@ -38,6 +38,10 @@ class LLMProviderTextGenerationWebUI(LLMProviderOpenAI):
         UnsupportedLoraError: If any of the loras is not supported.
     """
 
+    # the API does not support stream_options, so the generated tokens of a
+    # streamed response are counted as its text deltas
+    _stream_usage: bool = False
+
     def __init__(
         self,
         model: str,
@@ -58,6 +62,11 @@ class LLMProviderTextGenerationWebUI(LLMProviderOpenAI):
             api_key=api_key,
         )
 
+        self._async_client = AsyncOpenAI(
+            base_url=f"{base_url}/v1",
+            api_key=api_key,
+        )
+
         self._internal_client = HTTPClientTextGenerationWebUI(
             base_url=base_url,
             api_key=api_key,
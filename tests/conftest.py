@@ -0,0 +1,33 @@
+import hashlib
+
+from typing import Any, Callable, List
+
+import pytest
+
+_EMBEDDING_DIMENSION: int = 64
+
+
+def _embed(texts: List[str]) -> List[List[float]]:
+    # a bag of hashed words, so that texts sharing words are similar
+    embeddings: List[List[float]] = []
+
+    for text in texts:
+        embedding = [0.0] * _EMBEDDING_DIMENSION
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).hexdigest()
+            embedding[int(digest, 16) % _EMBEDDING_DIMENSION] += 1.0
+
+        embeddings.append(embedding)
+
+    return embeddings
+
+
+class _EmbeddingFunction:
+    # chroma requires embedding functions taking the texts as input
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        return _embed(input)
+
+
+@pytest.fixture
+def embedding_function() -> Callable[[List[str]], Any]:
+    return _EmbeddingFunction()
@@ -0,0 +1,116 @@
+import time
+import asyncio
+
+from typing import List
+
+import pytest
+
+from ezpyai.llm.prompt import Prompt
+from ezpyai.llm.providers._llm_provider import BaseLLMProvider
+from ezpyai.llm.providers.cached import LLMProviderCached
+
+
+class _Client:
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+
+
+class _Provider(BaseLLMProvider):
+    def __init__(self, base_url: str = "http://localhost/v1") -> None:
+        self._client = _Client(base_url)
+        self._model = "model"
+        self._temperature = 0.0
+        self._max_tokens = 10
+        self.prompts: List[str] = []
+
+    def get_response(self, prompt: Prompt) -> str:
+        self.prompts.append(prompt.get_user_message())
+
+        return f"response {len(self.prompts)}"
+
+    def _iter_response_chunks(self, prompt: Prompt):
+        for delta in self.get_response(prompt).split(" "):
+            yield f"{delta} ", None
+
+
+@pytest.fixture
+def provider():
+    return _Provider()
+
+
+def test_hit_and_miss(tmp_path, provider):
+    cached_provider = LLMProviderCached(provider, str(tmp_path))
+
+    assert cached_provider.get_response(Prompt(user_message="a")) == "response 1"
+    assert cached_provider.get_response(Prompt(user_message="a")) == "response 1"
+    assert cached_provider.get_response(Prompt(user_message="b")) == "response 2"
+
+    assert provider.prompts == ["a", "b"]
+
+    stats = cached_provider.get_stats()
+    assert (stats["hits"], stats["misses"], stats["num_entries"]) == (1, 2, 2)
+
+
+def test_cache_shared_across_instances(tmp_path, provider):
+    LLMProviderCached(provider, str(tmp_path)).get_response(Prompt(user_message="a"))
+
+    other_provider = _Provider()
+    response = LLMProviderCached(other_provider, str(tmp_path)).get_response(
+        Prompt(user_message="a")
+    )
+
+    assert response == "response 1"
+    assert other_provider.prompts == []
+
+
+def test_key_includes_endpoint(tmp_path, provider):
+    LLMProviderCached(provider, str(tmp_path)).get_response(Prompt(user_message="a"))
+
+    other_provider = _Provider("http://other/v1")
+    LLMProviderCached(other_provider, str(tmp_path)).get_response(
+        Prompt(user_message="a")
+    )
+
+    assert other_provider.prompts == ["a"]
+
+
+def test_ttl(tmp_path, provider, monkeypatch):
+    cached_provider = LLMProviderCached(provider, str(tmp_path), ttl_seconds=60)
+    now = time.time()
+
+    monkeypatch.setattr(time, "time", lambda: now)
+    cached_provider.get_response(Prompt(user_message="a"))
+
+    monkeypatch.setattr(time, "time", lambda: now + 30)
+    assert cached_provider.get_response(Prompt(user_message="a")) == "response 1"
+
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cached_provider.get_response(Prompt(user_message="a")) == "response 2"
+
+
+def test_async_hit_and_miss(tmp_path, provider):
+    cached_provider = LLMProviderCached(provider, str(tmp_path))
+
+    async def get_responses():
+        return [
+            await cached_provider.aget_response(Prompt(user_message=message))
+            for message in ["a", "a", "b"]
+        ]
+
+    assert asyncio.run(get_responses()) == ["response 1", "response 1", "response 2"]
+    assert provider.prompts == ["a", "b"]
+
+
+def test_stream_cached_only_when_complete(tmp_path, provider):
+    cached_provider = LLMProviderCached(provider, str(tmp_path))
+
+    with cached_provider.stream_response(Prompt(user_message="a")) as stream:
+        next(stream)
+
+    assert "".join(cached_provider.stream_response(Prompt(user_message="a"))) == (
+        "response 2 "
+    )
+    assert "".join(cached_provider.stream_response(Prompt(user_message="a"))) == (
+        "response 2 "
+    )
+    assert provider.prompts == ["a", "a"]
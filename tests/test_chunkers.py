@@ -0,0 +1,124 @@
+import pytest
+
+from ezpyai.llm.knowledge.chunkers import (
+    ChunkerNewline,
+    ChunkerFixedTokens,
+    ChunkerParagraph,
+    ChunkerSemantic,
+)
+from ezpyai.llm.knowledge.chunkers._chunker import count_tokens
+
+
+def test_newline_chunker_splits_lines():
+    assert ChunkerNewline().chunk("one\n\n  two  \nthree") == ["one", "two", "three"]
+
+
+def test_fixed_tokens_chunker_overlaps_windows():
+    chunks = ChunkerFixedTokens(max_tokens=4, overlap_tokens=1).chunk(
+        "a b c d e f g h i j"
+    )
+
+    assert chunks == ["a b c d", "d e f g", "g h i j"]
+
+
+def test_fixed_tokens_chunker_keeps_whitespace():
+    assert ChunkerFixedTokens(max_tokens=3, overlap_tokens=0).chunk("a\nb  c d") == [
+        "a\nb  c",
+        "d",
+    ]
+
+
+@pytest.mark.parametrize("overlap_tokens", [-1, 4])
+def test_fixed_tokens_chunker_rejects_invalid_overlap(overlap_tokens):
+    with pytest.raises(ValueError):
+        ChunkerFixedTokens(max_tokens=4, overlap_tokens=overlap_tokens)
+
+
+def test_paragraph_chunker_packs_paragraphs():
+    text = "one two\n\nthree four\n\nfive six seven"
+
+    assert ChunkerParagraph(max_tokens=4).chunk(text) == [
+        "one two\n\nthree four",
+        "five six seven",
+    ]
+
+
+def test_paragraph_chunker_splits_long_paragraphs_at_sentences():
+    text = "First sentence here. Second sentence here. Third one."
+
+    assert ChunkerParagraph(max_tokens=6).chunk(text) == [
+        "First sentence here. Second sentence here.",
+        "Third one.",
+    ]
+
+
+def test_paragraph_chunker_splits_long_sentences_into_windows():
+    chunks = ChunkerParagraph(max_tokens=3).chunk("a b c d e f g")
+
+    assert chunks == ["a b c", "d e f", "g"]
+
+
+def test_paragraph_chunker_respects_the_budget():
+    text = "\n\n".join(
+        " ".join(f"word{i}{j}" for j in range(i % 7 + 1)) + "." for i in range(40)
+    )
+
+    chunks = ChunkerParagraph(max_tokens=10).chunk(text)
+
+    assert all(count_tokens(chunk) <= 10 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_chunkers_reject_invalid_max_tokens():
+    with pytest.raises(ValueError):
+        ChunkerParagraph(max_tokens=0)
+
+
+def _embed_topics(texts):
+    # sentences about cats and dogs point in orthogonal directions
+    return [[1.0, 0.0] if "cat" in text else [0.0, 1.0] for text in texts]
+
+
+def test_semantic_chunker_breaks_where_the_topic_shifts():
+    text = "The cat sleeps. A cat purrs. The dog barks. A dog runs."
+
+    chunks = ChunkerSemantic(_embed_topics, breakpoint_percentile=50).chunk(text)
+
+    assert chunks == ["The cat sleeps. A cat purrs.", "The dog barks. A dog runs."]
+
+
+def test_semantic_chunker_respects_the_budget():
+    text = "The cat sleeps here. A cat purrs there. The cat eats now."
+
+    chunks = ChunkerSemantic(_embed_topics, max_tokens=8).chunk(text)
+
+    assert chunks == ["The cat sleeps here. A cat purrs there.", "The cat eats now."]
+
+
+def test_semantic_chunker_rejects_invalid_percentile():
+    with pytest.raises(ValueError):
+        ChunkerSemantic(_embed_topics, breakpoint_percentile=101)
+
+
+class _ModelEmbeddingFunction:
+    def __init__(self, model_name: str) -> None:
+        self._model_name = model_name
+
+    def __call__(self, input):
+        return _embed_topics(input)
+
+
+def test_semantic_chunker_str_tells_the_embedding_function():
+    def get_str(embedding_function):
+        return str(ChunkerSemantic(embedding_function))
+
+    assert get_str(_embed_topics) == get_str(_embed_topics)
+    assert get_str(_ModelEmbeddingFunction("a")) == get_str(
+        _ModelEmbeddingFunction("a")
+    )
+
+    assert "_embed_topics" in get_str(_embed_topics)
+    assert get_str(_ModelEmbeddingFunction("a")) != get_str(
+        _ModelEmbeddingFunction("b")
+    )
+    assert get_str(_ModelEmbeddingFunction("a")) != get_str(_embed_topics)
@@ -0,0 +1,107 @@
+import pytest
+
+from ezpyai.llm.knowledge import _collection_writer
+from ezpyai.llm.knowledge._collection_writer import StoreBatch, CollectionWriter
+from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+from ezpyai.llm.knowledge.numpy_db import NumpyDB
+
+
+class _Collection:
+    def __init__(self, num_failures: int = 0) -> None:
+        self.num_failures = num_failures
+        self.writes = []
+
+    def _write(self, method: str, ids, **kwargs) -> None:
+        if self.num_failures:
+            self.num_failures -= 1
+            raise ConnectionError("unavailable")
+
+        self.writes.append((method, list(ids)))
+
+    def add(self, ids, **kwargs) -> None:
+        self._write("add", ids, **kwargs)
+
+    def upsert(self, ids, **kwargs) -> None:
+        self._write("upsert", ids, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(_collection_writer.time, "sleep", sleeps.append)
+
+    return sleeps
+
+
+def _get_batch(*ids: str) -> StoreBatch:
+    batch = StoreBatch(
+        "file.txt", [KnowledgeItem(id=id, content=f"content {id}") for id in ids]
+    )
+    batch.embeddings = [[1.0, 0.0] for _ in ids]
+
+    return batch
+
+
+def test_write_flushes_full_batches():
+    collection = _Collection()
+    writer = CollectionWriter(collection, batch_size=2)
+
+    writer.write(_get_batch("a", "b", "c"))
+    assert collection.writes == [("upsert", ["a", "b"])]
+
+    writer.flush()
+    assert collection.writes == [("upsert", ["a", "b"]), ("upsert", ["c"])]
+    assert writer.num_stored == 3
+
+
+def test_write_skips_duplicate_ids_within_a_batch():
+    collection = _Collection()
+    writer = CollectionWriter(collection)
+
+    writer.write(_get_batch("a", "b"))
+    writer.write(_get_batch("b", "c"))
+    writer.flush()
+
+    assert collection.writes == [("upsert", ["a", "b", "c"])]
+
+
+def test_write_adds_without_upsert():
+    collection = _Collection()
+    writer = CollectionWriter(collection, upsert=False)
+
+    writer.write(_get_batch("a"))
+    writer.flush()
+
+    assert collection.writes == [("add", ["a"])]
+
+
+def test_flush_retries_with_backoff(no_backoff):
+    collection = _Collection(num_failures=2)
+    writer = CollectionWriter(collection, max_retries=2)
+
+    writer.write(_get_batch("a"))
+    writer.flush()
+
+    assert collection.writes == [("upsert", ["a"])]
+    assert no_backoff == [1.0, 2.0]
+
+
+def test_flush_raises_after_max_retries():
+    collection = _Collection(num_failures=3)
+    writer = CollectionWriter(collection, max_retries=2)
+
+    writer.write(_get_batch("a"))
+
+    with pytest.raises(ConnectionError):
+        writer.flush()
+
+    assert collection.writes == []
+    assert writer.num_stored == 0
+
+
+@pytest.mark.parametrize("kwargs", [{"batch_size": 0}, {"max_retries": -1}])
+def test_store_rejects_invalid_write_settings(tmp_path, embedding_function, kwargs):
+    knowledge_db = NumpyDB("test", str(tmp_path), embedding_function=embedding_function)
+
+    with pytest.raises(ValueError):
+        knowledge_db.store("test", str(tmp_path), **kwargs)
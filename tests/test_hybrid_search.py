@@ -0,0 +1,65 @@
+import pytest
+
+from ezpyai.llm.knowledge.numpy_db import NumpyDB
+
+_NUM_TEXT_FILES: int = 100
+_NUM_MARKDOWN_FILES: int = 5
+
+
+@pytest.fixture
+def knowledge_db(tmp_path, embedding_function):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+
+    # the text files rank first lexically for "zorp"
+    for i in range(_NUM_TEXT_FILES):
+        (data_path / f"text{i}.txt").write_text(f"zorp zorp zorp text{i} filler words")
+
+    for i in range(_NUM_MARKDOWN_FILES):
+        (data_path / f"note{i}.md").write_text(f"zorp note{i} with unrelated content")
+
+    knowledge_db = NumpyDB(
+        "test",
+        str(tmp_path / "db"),
+        embedding_function=embedding_function,
+        bm25=True,
+    )
+    knowledge_db.store("test", str(data_path))
+
+    return knowledge_db
+
+
+def test_filtered_hybrid_search_returns_num_results(knowledge_db):
+    knowledge_items = knowledge_db.search(
+        "test", "zorp", num_results=5, hybrid=True, filters={"file_ext": ".md"}
+    )
+
+    assert len(knowledge_items) == _NUM_MARKDOWN_FILES
+    assert all(
+        knowledge_item.metadata["file_ext"] == ".md"
+        for knowledge_item in knowledge_items
+    )
+
+
+def test_filtered_lexical_candidates_match_filters(knowledge_db):
+    knowledge_items_by_id = {}
+
+    ids = knowledge_db._get_lexical_ids(
+        "test", "zorp", 3, {"file_ext": ".md"}, knowledge_items_by_id
+    )
+
+    assert len(ids) == 3
+    assert all(knowledge_items_by_id[id].metadata["file_ext"] == ".md" for id in ids)
+
+
+def test_filtered_lexical_candidates_stop_when_exhausted(knowledge_db):
+    ids = knowledge_db._get_lexical_ids("test", "zorp", 50, {"file_ext": ".md"}, {})
+
+    assert len(ids) == _NUM_MARKDOWN_FILES
+
+
+def test_hybrid_search_requires_bm25(tmp_path, embedding_function):
+    knowledge_db = NumpyDB("test", str(tmp_path), embedding_function=embedding_function)
+
+    with pytest.raises(ValueError):
+        knowledge_db.search("test", "zorp", hybrid=True)
@@ -0,0 +1,131 @@
+import os
+
+import pytest
+
+from ezpyai.llm.knowledge.chunkers import ChunkerFixedTokens
+from ezpyai.llm.knowledge.numpy_db import NumpyDB
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+
+    (data_path / "a.txt").write_text("alpha one two three")
+    (data_path / "b.txt").write_text("beta four five six")
+
+    return data_path
+
+
+@pytest.fixture
+def knowledge_db(tmp_path, embedding_function):
+    return NumpyDB("test", str(tmp_path / "db"), embedding_function=embedding_function)
+
+
+def _get_contents(knowledge_db):
+    return sorted(
+        knowledge_item.content
+        for knowledge_item in knowledge_db.search("test", "any", num_results=100)
+    )
+
+
+def _get_num_processed_files(knowledge_db) -> int:
+    # every file of the tests holds a single paragraph
+    return knowledge_db.get_store_stats()[0].num_items
+
+
+def test_store_is_not_incremental_by_default(knowledge_db, data_path):
+    knowledge_db.store("test", str(data_path))
+    knowledge_db.store("test", str(data_path))
+
+    assert _get_num_processed_files(knowledge_db) == 2
+    assert not os.path.exists(knowledge_db._get_manifests_dir())
+
+
+def test_incremental_store_processes_new_files(knowledge_db, data_path):
+    knowledge_db.store("test", str(data_path), incremental=True)
+    assert _get_num_processed_files(knowledge_db) == 2
+
+    knowledge_db.store("test", str(data_path), incremental=True)
+    assert _get_num_processed_files(knowledge_db) == 0
+
+    (data_path / "c.txt").write_text("gamma seven eight")
+    knowledge_db.store("test", str(data_path), incremental=True)
+
+    assert _get_num_processed_files(knowledge_db) == 1
+    assert _get_contents(knowledge_db) == [
+        "alpha one two three",
+        "beta four five six",
+        "gamma seven eight",
+    ]
+
+
+def test_incremental_store_replaces_modified_files(knowledge_db, data_path):
+    knowledge_db.store("test", str(data_path), incremental=True)
+
+    (data_path / "a.txt").write_text("alpha was rewritten entirely")
+    knowledge_db.store("test", str(data_path), incremental=True)
+
+    assert _get_num_processed_files(knowledge_db) == 1
+    assert _get_contents(knowledge_db) == [
+        "alpha was rewritten entirely",
+        "beta four five six",
+    ]
+
+
+def test_incremental_store_deletes_removed_files(knowledge_db, data_path):
+    knowledge_db.store("test", str(data_path), incremental=True)
+
+    (data_path / "b.txt").unlink()
+    knowledge_db.store("test", str(data_path), incremental=True)
+
+    assert _get_contents(knowledge_db) == ["alpha one two three"]
+
+
+def test_incremental_store_rebuilds_on_new_settings(knowledge_db, data_path):
+    knowledge_db.store("test", str(data_path), incremental=True)
+
+    chunker = ChunkerFixedTokens(max_tokens=2, overlap_tokens=0)
+    knowledge_db.store("test", str(data_path), incremental=True, chunker=chunker)
+
+    # both files are processed again, in two paragraphs each
+    assert knowledge_db.get_store_stats()[0].num_items == 4
+    assert _get_contents(knowledge_db) == [
+        "alpha one",
+        "beta four",
+        "five six",
+        "two three",
+    ]
+
+    knowledge_db.store("test", str(data_path), incremental=True, chunker=chunker)
+
+    assert _get_num_processed_files(knowledge_db) == 0
+
+
+_PARAGRAPH: str = (
+    "the quick brown fox jumps over the lazy dog while the farmer watches "
+    "from the porch and the sun sets slowly behind the hills of the valley"
+)
+
+
+def test_incremental_store_refreshes_the_near_duplicates_of_modified_files(
+    knowledge_db, tmp_path
+):
+    data_path = tmp_path / "near_duplicates"
+    data_path.mkdir()
+    (data_path / "a.txt").write_text(_PARAGRAPH)
+    (data_path / "b.txt").write_text(_PARAGRAPH + " tonight")
+
+    kwargs = {"incremental": True, "near_duplicate_threshold": 0.8}
+
+    knowledge_db.store("test", str(data_path), **kwargs)
+    assert _get_contents(knowledge_db) == [_PARAGRAPH]
+
+    # b.txt was stored under the paragraph of a.txt, so it is processed again
+    (data_path / "a.txt").write_text("alpha was rewritten entirely")
+    knowledge_db.store("test", str(data_path), **kwargs)
+
+    assert _get_contents(knowledge_db) == [
+        "alpha was rewritten entirely",
+        _PARAGRAPH + " tonight",
+    ]
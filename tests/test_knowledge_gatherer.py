@@ -0,0 +1,280 @@
+import time
+import zipfile
+import threading
+
+import pytest
+
+from ezpyai.constants import DICT_KEY_SUMMARY, DICT_KEY_SUMMARIES
+from ezpyai.llm.prompt import Prompt
+from ezpyai.llm.providers._llm_provider import LLMProvider
+from ezpyai.llm.knowledge.knowledge_item import KnowledgeItem
+from ezpyai.llm.knowledge.summary_cache import SummaryCache
+from ezpyai.llm.knowledge._knowledge_gatherer import KnowledgeGatherer
+
+_NUM_FILES: int = 12
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    data_path = tmp_path / "data"
+    (data_path / "nested").mkdir(parents=True)
+
+    for i in range(_NUM_FILES):
+        directory = data_path / "nested" if i % 3 == 0 else data_path
+        (directory / f"file{i:02}.txt").write_text(f"the content of file {i}")
+
+    return data_path
+
+
+def _gather(data_path, num_workers: int):
+    knowledge_gatherer = KnowledgeGatherer()
+    knowledge_gatherer.gather(str(data_path), num_workers=num_workers)
+
+    return [
+        (knowledge_item.id, knowledge_item.content, knowledge_item.metadata)
+        for knowledge_item in knowledge_gatherer.get_items().values()
+    ]
+
+
+def test_parallel_gather_matches_serial(data_path):
+    serial_items = _gather(data_path, num_workers=1)
+
+    assert len(serial_items) == _NUM_FILES
+    assert _gather(data_path, num_workers=3) == serial_items
+
+
+def test_gather_rejects_invalid_num_workers(data_path):
+    with pytest.raises(ValueError):
+        KnowledgeGatherer().gather(str(data_path), num_workers=0)
+
+
+def test_iter_items_yields_without_keeping(data_path):
+    knowledge_gatherer = KnowledgeGatherer()
+
+    contents = [
+        knowledge_item.content
+        for knowledge_item in knowledge_gatherer.iter_items(str(data_path))
+    ]
+
+    assert contents == [content for _, content, _ in _gather(data_path, 1)]
+    assert knowledge_gatherer.get_items() == {}
+
+
+def test_iter_items_yields_duplicates_of_every_file(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_text("the same content")
+
+    knowledge_items = list(KnowledgeGatherer().iter_items(str(tmp_path)))
+
+    assert [
+        knowledge_item.metadata["file_name"] for knowledge_item in knowledge_items
+    ] == ["a", "b"]
+    assert knowledge_items[0].id == knowledge_items[1].id
+
+
+def test_iter_items_reads_zip_files(tmp_path):
+    with zipfile.ZipFile(tmp_path / "archive.zip", "w") as zip_file:
+        zip_file.writestr("one.txt", "the first archived file")
+        zip_file.writestr("two.txt", "the second archived file")
+
+    contents = [
+        knowledge_item.content
+        for knowledge_item in KnowledgeGatherer().iter_items(str(tmp_path))
+    ]
+
+    assert contents == ["the first archived file", "the second archived file"]
+
+
+class _Summarizer(LLMProvider):
+    def __init__(self, delay_seconds: float = 0.0, pack_summaries=None) -> None:
+        self._delay_seconds = delay_seconds
+        self._pack_summaries = pack_summaries
+        self._lock = threading.Lock()
+        self.num_requests = 0
+        self.num_in_flight = 0
+        self.max_in_flight = 0
+
+    def get_response(self, prompt: Prompt) -> str:
+        return ""
+
+    def get_structured_response(self, prompt: Prompt, response_format):
+        with self._lock:
+            self.num_requests += 1
+            self.num_in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.num_in_flight)
+
+        time.sleep(self._delay_seconds)
+
+        with self._lock:
+            self.num_in_flight -= 1
+
+        user_message = prompt.get_user_message()
+
+        if DICT_KEY_SUMMARIES in response_format:
+            if self._pack_summaries is not None:
+                return {DICT_KEY_SUMMARIES: self._pack_summaries}
+
+            texts = user_message.split("\n")[1:]
+            return {
+                DICT_KEY_SUMMARIES: [
+                    f"summary of {text.split('. ', 1)[1]}" for text in texts
+                ]
+            }
+
+        return {DICT_KEY_SUMMARY: f"summary of {user_message.split(': ', 1)[1]}"}
+
+
+def test_gather_summarizes_files_concurrently(data_path):
+    summarizer = _Summarizer(delay_seconds=0.05)
+    knowledge_gatherer = KnowledgeGatherer(
+        summarizer=summarizer, summarizer_concurrency=4
+    )
+
+    knowledge_gatherer.gather(str(data_path))
+    knowledge_gatherer.close()
+
+    knowledge_items = list(knowledge_gatherer.get_items().values())
+
+    assert [knowledge_item.content for knowledge_item in knowledge_items] == [
+        content for _, content, _ in _gather(data_path, 1)
+    ]
+    assert all(
+        knowledge_item.summary == f"summary of {knowledge_item.content}"
+        for knowledge_item in knowledge_items
+    )
+    assert summarizer.num_requests == _NUM_FILES
+    assert 1 < summarizer.max_in_flight <= 4
+
+
+def test_summarize_packs_short_paragraphs():
+    summarizer = _Summarizer()
+    knowledge_gatherer = KnowledgeGatherer(
+        summarizer=summarizer, summarizer_pack_size=3, summarizer_pack_max_chars=20
+    )
+    knowledge_items = [
+        KnowledgeItem(id=str(i), content=f"short {i}") for i in range(5)
+    ] + [KnowledgeItem(id="long", content="a paragraph too long to be packed")]
+
+    knowledge_gatherer.summarize(knowledge_items)
+
+    assert summarizer.num_requests == 3
+    assert [knowledge_item.summary for knowledge_item in knowledge_items] == [
+        f"summary of {knowledge_item.content}" for knowledge_item in knowledge_items
+    ]
+
+
+def test_summarize_falls_back_to_single_requests():
+    summarizer = _Summarizer(pack_summaries=["only one summary"])
+    knowledge_gatherer = KnowledgeGatherer(
+        summarizer=summarizer, summarizer_pack_size=3
+    )
+    knowledge_items = [KnowledgeItem(id=str(i), content=f"short {i}") for i in range(3)]
+
+    knowledge_gatherer.summarize(knowledge_items)
+
+    assert summarizer.num_requests == 4
+    assert [knowledge_item.summary for knowledge_item in knowledge_items] == [
+        "summary of short 0",
+        "summary of short 1",
+        "summary of short 2",
+    ]
+
+
+def test_summarize_keeps_existing_summaries():
+    summarizer = _Summarizer()
+    knowledge_item = KnowledgeItem(id="a", content="content", summary="kept")
+
+    KnowledgeGatherer(summarizer=summarizer).summarize([knowledge_item])
+
+    assert knowledge_item.summary == "kept"
+    assert summarizer.num_requests == 0
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"summarizer_concurrency": 0}, {"summarizer_pack_size": 0}]
+)
+def test_rejects_invalid_summarizer_settings(kwargs):
+    with pytest.raises(ValueError):
+        KnowledgeGatherer(**kwargs)
+
+
+def test_summarize_reuses_cached_summaries(tmp_path):
+    summary_cache = SummaryCache(str(tmp_path))
+    knowledge_items = [KnowledgeItem(id=str(i), content=f"text {i}") for i in range(3)]
+
+    summarizer = _Summarizer()
+    KnowledgeGatherer(summarizer=summarizer, summary_cache=summary_cache).summarize(
+        knowledge_items[:2]
+    )
+    assert summarizer.num_requests == 2
+
+    for knowledge_item in knowledge_items:
+        knowledge_item.summary = ""
+
+    summarizer = _Summarizer()
+    KnowledgeGatherer(summarizer=summarizer, summary_cache=summary_cache).summarize(
+        knowledge_items
+    )
+
+    assert summarizer.num_requests == 1
+    assert [knowledge_item.summary for knowledge_item in knowledge_items] == [
+        "summary of text 0",
+        "summary of text 1",
+        "summary of text 2",
+    ]
+
+
+_PARAGRAPH: str = (
+    "the quick brown fox jumps over the lazy dog while the farmer watches "
+    "from the porch and the sun sets slowly behind the hills of the valley"
+)
+
+
+@pytest.fixture
+def near_duplicates_data_path(tmp_path):
+    data_path = tmp_path / "near_duplicates"
+    data_path.mkdir()
+    (data_path / "a.txt").write_text(_PARAGRAPH)
+    (data_path / "b.txt").write_text(_PARAGRAPH + " tonight")
+    (data_path / "c.txt").write_text("an entirely different text about cats")
+
+    return data_path
+
+
+def test_iter_file_items_drops_near_duplicates(near_duplicates_data_path):
+    knowledge_gatherer = KnowledgeGatherer(near_duplicate_threshold=0.8)
+
+    groups = list(
+        knowledge_gatherer.iter_file_items(
+            [str(path) for path in sorted(near_duplicates_data_path.iterdir())]
+        )
+    )
+
+    first_id = groups[0][1][0].id
+    assert [
+        (len(knowledge_items), duplicate_ids)
+        for _, knowledge_items, duplicate_ids in groups
+    ] == [(1, []), (0, [first_id]), (1, [])]
+
+
+def test_near_duplicates_are_detected_per_call(near_duplicates_data_path, tmp_path):
+    knowledge_gatherer = KnowledgeGatherer(near_duplicate_threshold=0.8)
+    knowledge_gatherer.gather(str(near_duplicates_data_path))
+
+    other_data_path = tmp_path / "other"
+    other_data_path.mkdir()
+    (other_data_path / "d.txt").write_text(_PARAGRAPH + " again")
+
+    contents = [
+        knowledge_item.content
+        for knowledge_item in knowledge_gatherer.iter_items(str(other_data_path))
+    ]
+
+    # the paragraphs gathered by the previous call are forgotten
+    assert contents == [_PARAGRAPH + " again"]
+    assert len(knowledge_gatherer._near_duplicates) == 1
+
+
+def test_rejects_invalid_near_duplicate_threshold():
+    with pytest.raises(ValueError):
+        KnowledgeGatherer(near_duplicate_threshold=0)
@@ -0,0 +1,410 @@
+import time
+import asyncio
+import threading
+
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from ezpyai.constants import (
+    DICT_KEY_NUM_TOKENS,
+    DICT_KEY_DURATION_SECONDS,
+    DICT_KEY_TIME_TO_FIRST_TOKEN_SECONDS,
+    DICT_KEY_TOKENS_PER_SECOND,
+)
+from ezpyai.exceptions import LLMInferenceError
+from ezpyai.llm.prompt import Prompt
+from ezpyai.llm.providers._llm_provider import BaseLLMProvider
+from ezpyai.llm.providers import openai, _response_stream
+from ezpyai.llm.providers._response_stream import ResponseStream
+
+
+class _Provider(BaseLLMProvider):
+    def __init__(self, responses: List[str] | None = None) -> None:
+        self._responses = responses
+        self.thread_ids: List[int] = []
+
+    def get_response(self, prompt: Prompt) -> str:
+        self.thread_ids.append(threading.get_ident())
+
+        if self._responses is not None:
+            return self._responses.pop(0)
+
+        return f"response to {prompt.get_user_message()}"
+
+
+def _get_completion(content: str):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+
+
+def _get_chunk(content: str | None, completion_tokens: int | None = None):
+    return SimpleNamespace(
+        choices=(
+            []
+            if content is None
+            else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+        ),
+        usage=(
+            None
+            if completion_tokens is None
+            else SimpleNamespace(completion_tokens=completion_tokens)
+        ),
+    )
+
+
+# the last chunk only reports the usage, as with stream_options
+_STREAM_CHUNKS = [
+    _get_chunk("Hel"),
+    _get_chunk("lo"),
+    _get_chunk(" world"),
+    _get_chunk(None, completion_tokens=5),
+]
+
+
+class _Stream:
+    def __init__(self) -> None:
+        self.num_consumed = 0
+        self.closed = False
+
+    def _consume(self, chunk):
+        self.num_consumed += 1
+
+        return chunk
+
+    def __iter__(self):
+        for chunk in _STREAM_CHUNKS:
+            yield self._consume(chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.closed = True
+
+    async def __aiter__(self):
+        for chunk in _STREAM_CHUNKS:
+            yield self._consume(chunk)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.closed = True
+
+
+class _Completions:
+    def __init__(self) -> None:
+        self.params = []
+        self.streams: List[_Stream] = []
+
+    def _create(self, params):
+        self.params.append(params)
+
+        if params["messages"][-1]["content"] == "fail":
+            raise ConnectionError("unavailable")
+
+        if params.get("stream"):
+            self.streams.append(_Stream())
+
+            return self.streams[-1]
+
+        return None
+
+    def create(self, **params):
+        return self._create(params)
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, **params):
+        stream = self._create(params)
+        if stream is not None:
+            return stream
+
+        return _get_completion(f"async response to {params['messages'][-1]['content']}")
+
+
+class _Client:
+    def __init__(self, **kwargs) -> None:
+        self.chat = SimpleNamespace(completions=_Completions())
+
+
+class _AsyncClient:
+    def __init__(self, **kwargs) -> None:
+        self.chat = SimpleNamespace(completions=_AsyncCompletions())
+
+
+@pytest.fixture
+def openai_provider(monkeypatch):
+    monkeypatch.setattr(openai, "_OpenAI", _Client)
+    monkeypatch.setattr(openai, "_AsyncOpenAI", _AsyncClient)
+
+    return openai.LLMProviderOpenAI(api_key="test")
+
+
+def test_aget_response_runs_in_a_worker_thread():
+    provider = _Provider()
+
+    response = asyncio.run(provider.aget_response(Prompt(user_message="a")))
+
+    assert response == "response to a"
+    assert provider.thread_ids != [threading.get_ident()]
+
+
+def test_aget_structured_response():
+    provider = _Provider(responses=['```json\n{"name": "a", "age": 1}\n```'])
+
+    structured_response = asyncio.run(
+        provider.aget_structured_response(
+            Prompt(user_message="a"), {"name": "str", "age": "int"}
+        )
+    )
+
+    assert structured_response == {"name": "a", "age": 1}
+
+
+def test_openai_aget_response_uses_the_async_client(openai_provider):
+    async def get_responses():
+        return await asyncio.gather(
+            openai_provider.aget_response(Prompt(user_message="a")),
+            openai_provider.aget_response(Prompt(user_message="b")),
+        )
+
+    assert asyncio.run(get_responses()) == [
+        "async response to a",
+        "async response to b",
+    ]
+    assert [
+        params["model"]
+        for params in openai_provider._async_client.chat.completions.params
+    ] == [openai_provider._model] * 2
+
+
+def test_openai_aget_response_wraps_errors(openai_provider):
+    with pytest.raises(LLMInferenceError):
+        asyncio.run(openai_provider.aget_response(Prompt(user_message="fail")))
+
+
+class _ConcurrentProvider(BaseLLMProvider):
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._num_in_flight = 0
+        self.max_in_flight = 0
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._num_in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._num_in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._num_in_flight -= 1
+
+    def _get_response(self, prompt: Prompt) -> str:
+        if prompt.get_user_message() == "fail":
+            raise ConnectionError("unavailable")
+
+        return f'{{"answer": "{prompt.get_user_message()}"}}'
+
+    def get_response(self, prompt: Prompt) -> str:
+        self._enter()
+
+        try:
+            time.sleep(0.01)
+
+            return self._get_response(prompt)
+        finally:
+            self._exit()
+
+    async def aget_response(self, prompt: Prompt) -> str:
+        self._enter()
+
+        try:
+            await asyncio.sleep(0.01)
+
+            return self._get_response(prompt)
+        finally:
+            self._exit()
+
+
+_BULK_MESSAGES: List[str] = ["a", "fail", "b", "c", "d", "e"]
+
+
+def _get_bulk_prompts() -> List[Prompt]:
+    return [Prompt(user_message=message) for message in _BULK_MESSAGES]
+
+
+def _check_bulk_responses(responses, expected_responses) -> None:
+    assert isinstance(responses[1], ConnectionError)
+    assert responses[:1] + responses[2:] == expected_responses
+
+
+def test_get_responses_keeps_the_order_and_the_errors():
+    provider = _ConcurrentProvider()
+
+    responses = provider.get_responses(_get_bulk_prompts(), max_concurrency=2)
+
+    _check_bulk_responses(
+        responses,
+        [f'{{"answer": "{message}"}}' for message in "abcde"],
+    )
+    assert provider.max_in_flight == 2
+
+
+def test_get_structured_responses():
+    responses = _ConcurrentProvider().get_structured_responses(
+        _get_bulk_prompts(), {"answer": "str"}
+    )
+
+    _check_bulk_responses(responses, [{"answer": message} for message in "abcde"])
+
+
+def test_aget_responses_keeps_the_order_and_the_errors():
+    provider = _ConcurrentProvider()
+
+    responses = asyncio.run(
+        provider.aget_responses(_get_bulk_prompts(), max_concurrency=3)
+    )
+
+    _check_bulk_responses(
+        responses,
+        [f'{{"answer": "{message}"}}' for message in "abcde"],
+    )
+    assert provider.max_in_flight == 3
+
+
+def test_aget_structured_responses():
+    responses = asyncio.run(
+        _ConcurrentProvider().aget_structured_responses(
+            _get_bulk_prompts(), {"answer": "str"}
+        )
+    )
+
+    _check_bulk_responses(responses, [{"answer": message} for message in "abcde"])
+
+
+def test_bulk_responses_without_prompts():
+    provider = _ConcurrentProvider()
+
+    assert provider.get_responses([]) == []
+    assert asyncio.run(provider.aget_responses([])) == []
+
+
+def test_bulk_responses_reject_invalid_max_concurrency():
+    provider = _ConcurrentProvider()
+
+    with pytest.raises(ValueError):
+        provider.get_responses(_get_bulk_prompts(), max_concurrency=0)
+
+    with pytest.raises(ValueError):
+        asyncio.run(provider.aget_responses(_get_bulk_prompts(), max_concurrency=0))
+
+
+def test_stream_response_yields_the_deltas(openai_provider):
+    deltas = []
+
+    with openai_provider.stream_response(
+        Prompt(user_message="a"), on_delta=deltas.append
+    ) as stream:
+        assert list(stream) == ["Hel", "lo", " world"]
+
+    assert deltas == ["Hel", "lo", " world"]
+    assert stream.get_text() == "Hello world"
+
+    stats = stream.get_stats()
+    assert stats[DICT_KEY_NUM_TOKENS] == 5
+    assert stats[DICT_KEY_TIME_TO_FIRST_TOKEN_SECONDS] >= 0
+    assert stats[DICT_KEY_DURATION_SECONDS] >= 0
+
+    params = openai_provider._client.chat.completions.params[0]
+    assert params["stream"] is True
+    assert params["stream_options"] == {"include_usage": True}
+
+
+def test_stream_response_is_requested_on_the_first_iteration(openai_provider):
+    stream = openai_provider.stream_response(Prompt(user_message="a"))
+
+    assert openai_provider._client.chat.completions.params == []
+
+    next(stream)
+    assert len(openai_provider._client.chat.completions.params) == 1
+
+
+def test_closing_the_stream_stops_the_response(openai_provider):
+    with openai_provider.stream_response(Prompt(user_message="a")) as stream:
+        assert next(stream) == "Hel"
+
+    (client_stream,) = openai_provider._client.chat.completions.streams
+    assert client_stream.closed
+    assert client_stream.num_consumed == 1
+
+
+def test_stream_response_wraps_errors(openai_provider):
+    with pytest.raises(LLMInferenceError):
+        list(openai_provider.stream_response(Prompt(user_message="fail")))
+
+
+def test_astream_response_yields_the_deltas(openai_provider):
+    deltas = []
+
+    async def stream_response():
+        async with openai_provider.astream_response(
+            Prompt(user_message="a"), on_delta=deltas.append
+        ) as stream:
+            return [delta async for delta in stream], stream
+
+    async_deltas, stream = asyncio.run(stream_response())
+
+    assert async_deltas == deltas == ["Hel", "lo", " world"]
+    assert stream.get_stats()[DICT_KEY_NUM_TOKENS] == 5
+    assert openai_provider._async_client.chat.completions.streams[0].closed
+
+
+def test_stream_response_without_a_streaming_api():
+    stream = _Provider().stream_response(Prompt(user_message="a"))
+
+    assert list(stream) == ["response to a"]
+    assert stream.get_stats()[DICT_KEY_NUM_TOKENS] == 1
+    assert stream.get_stats()[DICT_KEY_TOKENS_PER_SECOND] is None
+
+
+def test_stream_stats(monkeypatch):
+    # the start, the first token and the end of the response
+    times = iter([10.0, 11.0, 13.0])
+    monkeypatch.setattr(_response_stream.time, "monotonic", lambda: next(times))
+
+    stream = ResponseStream(iter([("a", None), ("b", None), ("", 5)]))
+
+    assert list(stream) == ["a", "b"]
+    assert stream.get_stats() == {
+        DICT_KEY_NUM_TOKENS: 5,
+        DICT_KEY_TIME_TO_FIRST_TOKEN_SECONDS: 1.0,
+        DICT_KEY_DURATION_SECONDS: 3.0,
+        DICT_KEY_TOKENS_PER_SECOND: 2.0,
+    }
+
+
+class _JSONStreamProvider(BaseLLMProvider):
+    def __init__(self) -> None:
+        self.num_chunks = 0
+
+    def get_response(self, prompt: Prompt) -> str:
+        return ""
+
+    def _iter_response_chunks(self, prompt: Prompt):
+        for delta in ['{"answer": ', '"yes"', "}", " and some", " more text"]:
+            self.num_chunks += 1
+            yield delta, None
+
+
+def test_stream_structured_response_stops_when_complete():
+    provider = _JSONStreamProvider()
+
+    structured_response = provider.stream_structured_response(
+        Prompt(user_message="a"), {"answer": "str"}
+    )
+
+    assert structured_response == {"answer": "yes"}
+    assert provider.num_chunks < 5
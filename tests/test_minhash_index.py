@@ -0,0 +1,35 @@
+import pytest
+
+from ezpyai.llm.knowledge._minhash_index import MinHashIndex
+
+_TEXT: str = (
+    "the quick brown fox jumps over the lazy dog while the farmer watches "
+    "from the porch and the sun sets slowly behind the hills of the valley"
+)
+
+
+def test_add_finds_near_duplicates():
+    minhash_index = MinHashIndex(0.8)
+
+    assert minhash_index.add("a", _TEXT) is None
+    assert minhash_index.add("b", _TEXT + " tonight") == "a"
+    assert minhash_index.add("c", "an entirely different text about cats") is None
+
+    assert len(minhash_index) == 2
+    assert minhash_index.num_duplicates == 1
+
+
+def test_add_does_not_match_the_same_id():
+    minhash_index = MinHashIndex(0.8)
+
+    assert minhash_index.add("a", _TEXT) is None
+    assert minhash_index.add("a", _TEXT) is None
+
+    assert len(minhash_index) == 1
+    assert minhash_index.num_duplicates == 0
+
+
+@pytest.mark.parametrize("threshold", [0, 1.5])
+def test_rejects_invalid_threshold(threshold):
+    with pytest.raises(ValueError):
+        MinHashIndex(threshold)
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pytest
+
+from ezpyai.constants import QUANTIZATION_BINARY, QUANTIZATION_INT8
+from ezpyai.llm.knowledge.numpy_db import _NumpyCollection
+
+_NUM_ROWS: int = 300
+_DIMENSION: int = 32
+
+
+def _add_rows(collection: _NumpyCollection) -> np.ndarray:
+    embeddings = np.random.default_rng(0).normal(size=(_NUM_ROWS, _DIMENSION))
+
+    collection.add(
+        ids=[f"id{i}" for i in range(_NUM_ROWS)],
+        embeddings=embeddings,
+        documents=[f"document {i}" for i in range(_NUM_ROWS)],
+        metadatas=[
+            {"group": i % 3, "even": i % 2 == 0, **({"tag": "x"} if i % 5 else {})}
+            for i in range(_NUM_ROWS)
+        ],
+    )
+
+    return embeddings
+
+
+def _get_ids(results):
+    return [[id for id, _, _, _ in items] for items in results]
+
+
+@pytest.mark.parametrize("quantization", [None, QUANTIZATION_INT8, QUANTIZATION_BINARY])
+def test_save_load_round_trip(tmp_path, quantization):
+    collection = _NumpyCollection.load("test", str(tmp_path), quantization)
+    embeddings = _add_rows(collection)
+    results = collection.query(embeddings[:5], 3)
+
+    collection.save()
+    loaded = _NumpyCollection.load("test", str(tmp_path), quantization)
+
+    assert loaded.count() == _NUM_ROWS
+    assert _get_ids(loaded.query(embeddings[:5], 3)) == _get_ids(results)
+    assert [id for id, _, _, _ in (items[0] for items in results)] == [
+        f"id{i}" for i in range(5)
+    ]
+    assert loaded.get(["id10", "missing", "id3"]) == [
+        ("id10", "document 10", {"group": 1, "even": True}),
+        ("id3", "document 3", {"group": 0, "even": False, "tag": "x"}),
+    ]
+
+
+def test_load_into_memory_on_write(tmp_path):
+    collection = _NumpyCollection.load("test", str(tmp_path))
+    embeddings = _add_rows(collection)
+    collection.save()
+
+    loaded = _NumpyCollection.load("test", str(tmp_path))
+    loaded.delete(["id0"])
+    loaded.upsert(["id1"], embeddings[1:2], ["updated"], [{"group": 9}])
+    loaded.save()
+
+    reloaded = _NumpyCollection.load("test", str(tmp_path))
+
+    assert reloaded.count() == _NUM_ROWS - 1
+    assert reloaded.get(["id0", "id1"]) == [("id1", "updated", {"group": 9})]
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+def test_query_filters(tmp_path, mapped):
+    collection = _NumpyCollection.load("test", str(tmp_path), QUANTIZATION_INT8)
+    embeddings = _add_rows(collection)
+
+    if mapped:
+        collection.save()
+        collection = _NumpyCollection.load("test", str(tmp_path), QUANTIZATION_INT8)
+
+    filters = {"$and": [{"group": 1}, {"even": True}]}
+    results = collection.query(embeddings[:3], 10, filters)
+
+    assert all(len(items) == 10 for items in results)
+    assert all(
+        metadata["group"] == 1 and metadata["even"] is True
+        for items in results
+        for _, _, metadata, _ in items
+    )
+
+    assert collection.query(embeddings[:1], 5, {"missing": 1}) == [[]]
+    assert all(
+        metadata.get("tag") == "x"
+        for _, _, metadata, _ in collection.query(embeddings[:1], 100, {"tag": "x"})[0]
+    )
+
+
+def test_save_removes_stale_codes(tmp_path):
+    collection = _NumpyCollection.load("test", str(tmp_path), QUANTIZATION_INT8)
+    embeddings = _add_rows(collection)
+    collection.save()
+
+    assert os.path.isfile(tmp_path / "codes_int8.npy")
+
+    collection = _NumpyCollection.load("test", str(tmp_path))
+    collection.delete([f"id{i}" for i in range(100)])
+    collection.save()
+
+    assert not os.path.isfile(tmp_path / "codes_int8.npy")
+    assert not os.path.isfile(tmp_path / "scales.npy")
+
+    collection = _NumpyCollection.load("test", str(tmp_path), QUANTIZATION_INT8)
+
+    assert _get_ids(collection.query(embeddings[100:103], 1)) == [
+        ["id100"],
+        ["id101"],
+        ["id102"],
+    ]
+
+
+def test_load_ignores_codes_of_other_size(tmp_path):
+    collection = _NumpyCollection.load("test", str(tmp_path), QUANTIZATION_BINARY)
+    embeddings = _add_rows(collection)
+    collection.save()
+
+    np.save(tmp_path / "codes_binary.npy", np.zeros((3, 4), dtype=np.uint8))
+    collection = _NumpyCollection.load("test", str(tmp_path), QUANTIZATION_BINARY)
+
+    assert _get_ids(collection.query(embeddings[7:8], 1)) == [["id7"]]
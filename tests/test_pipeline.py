@@ -0,0 +1,138 @@
+import time
+import threading
+
+import pytest
+
+from ezpyai.llm.knowledge._pipeline import Pipeline
+from ezpyai.llm.knowledge.numpy_db import NumpyDB
+
+_NUM_BATCHES: int = 50
+
+
+def test_run_passes_every_batch_through_the_stages():
+    results = []
+
+    stats = (
+        Pipeline()
+        .add_stage("double", lambda batch: [item * 2 for item in batch])
+        .add_stage("collect", results.append)
+        .run(([i, i + 1] for i in range(_NUM_BATCHES)), source_name="read")
+    )
+
+    assert results == [[i * 2, (i + 1) * 2] for i in range(_NUM_BATCHES)]
+    assert [stage_stats.name for stage_stats in stats] == ["read", "double", "collect"]
+    assert all(stage_stats.num_batches == _NUM_BATCHES for stage_stats in stats)
+    assert all(stage_stats.num_items == _NUM_BATCHES * 2 for stage_stats in stats)
+
+
+def test_run_with_several_workers_processes_every_batch():
+    results = []
+    lock = threading.Lock()
+
+    def collect(batch):
+        with lock:
+            results.append(batch)
+
+    Pipeline().add_stage("identity", lambda batch: batch, num_workers=4).add_stage(
+        "collect", collect
+    ).run([i] for i in range(_NUM_BATCHES))
+
+    assert sorted(results) == [[i] for i in range(_NUM_BATCHES)]
+
+
+def test_run_bounds_the_batches_in_flight():
+    queue_size = 2
+    num_produced = 0
+    max_in_flight = 0
+
+    def source():
+        nonlocal num_produced
+
+        for i in range(_NUM_BATCHES):
+            num_produced += 1
+            yield [i]
+
+    def consume(batch):
+        nonlocal max_in_flight
+
+        max_in_flight = max(max_in_flight, num_produced - batch[0])
+        time.sleep(0.001)
+
+    Pipeline(queue_size=queue_size).add_stage(
+        "identity", lambda batch: batch
+    ).add_stage("consume", consume).run(source())
+
+    # a batch in each queue slot and one held by the source and every stage
+    assert max_in_flight <= 2 * queue_size + 3
+
+
+def test_run_raises_the_first_error_and_stops():
+    num_consumed = 0
+
+    def consume(batch):
+        nonlocal num_consumed
+
+        num_consumed += 1
+        if batch[0] == 3:
+            raise RuntimeError("write failed")
+
+    with pytest.raises(RuntimeError, match="write failed"):
+        Pipeline().add_stage("consume", consume).run([i] for i in range(1000))
+
+    assert num_consumed < 1000
+
+
+def test_run_raises_source_errors():
+    def source():
+        yield [1]
+        raise OSError("read failed")
+
+    with pytest.raises(OSError, match="read failed"):
+        Pipeline().add_stage("consume", lambda batch: None).run(source())
+
+
+def test_run_requires_stages():
+    with pytest.raises(ValueError):
+        Pipeline().run([])
+
+
+def test_store_reports_the_stage_stats(tmp_path, embedding_function):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    for i in range(3):
+        (data_path / f"file{i}.txt").write_text(f"the content of file {i}")
+
+    knowledge_db = NumpyDB(
+        "test", str(tmp_path / "db"), embedding_function=embedding_function
+    )
+    knowledge_db.store("test", str(data_path))
+
+    stats = knowledge_db.get_store_stats()
+
+    assert [stage_stats.name for stage_stats in stats] == ["extract", "embed", "write"]
+    assert [stage_stats.num_items for stage_stats in stats] == [3, 3, 3]
+
+
+@pytest.mark.parametrize(
+    "batch_size, expected_call_sizes", [(1000, [5]), (2, [2, 2, 1])]
+)
+def test_store_embeds_the_items_of_several_files_at_once(
+    tmp_path, embedding_function, batch_size, expected_call_sizes
+):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    for i in range(5):
+        (data_path / f"file{i}.txt").write_text(f"the content of file {i}")
+
+    call_sizes = []
+
+    def embed(input):
+        call_sizes.append(len(input))
+
+        return embedding_function(input)
+
+    knowledge_db = NumpyDB("test", str(tmp_path / "db"), embedding_function=embed)
+    knowledge_db.store("test", str(data_path), batch_size=batch_size)
+
+    assert call_sizes == expected_call_sizes
+    assert len(knowledge_db.search("test", "content", num_results=10)) == 5
@@ -0,0 +1,362 @@
+import time
+
+import pytest
+
+from ezpyai.llm.knowledge.chroma_db import ChromaDB
+from ezpyai.llm.knowledge.numpy_db import NumpyDB
+
+_CONTENTS = [
+    "the cat sleeps on the mat",
+    "the dog barks at the mailman",
+    "a bird sings in the tree",
+    "the fish swims in the bowl",
+]
+
+
+class _CountingEmbeddingFunction:
+    def __init__(self, embedding_function) -> None:
+        self._embedding_function = embedding_function
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+
+        return self._embedding_function(input)
+
+
+@pytest.fixture
+def data_path(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+
+    for i, content in enumerate(_CONTENTS):
+        (data_path / f"file{i}.txt").write_text(content)
+
+    return data_path
+
+
+@pytest.fixture
+def counting_embedding_function(embedding_function):
+    return _CountingEmbeddingFunction(embedding_function)
+
+
+@pytest.fixture(params=[NumpyDB, ChromaDB])
+def knowledge_db_class(request):
+    return request.param
+
+
+@pytest.fixture
+def knowledge_db(tmp_path, data_path, knowledge_db_class, counting_embedding_function):
+    knowledge_db = knowledge_db_class(
+        "test", str(tmp_path / "db"), embedding_function=counting_embedding_function
+    )
+    knowledge_db.store("test", str(data_path))
+    counting_embedding_function.calls.clear()
+
+    return knowledge_db
+
+
+def _get_contents(knowledge_items):
+    return [knowledge_item.content for knowledge_item in knowledge_items]
+
+
+def test_search_many_matches_single_searches(knowledge_db):
+    queries = ["cat mat", "dog mailman", "bird tree"]
+
+    results = knowledge_db.search_many("test", queries, num_results=2)
+
+    assert [_get_contents(knowledge_items) for knowledge_items in results] == [
+        _get_contents(knowledge_db.search("test", query, num_results=2))
+        for query in queries
+    ]
+    assert [knowledge_items[0].content for knowledge_items in results] == _CONTENTS[:3]
+
+
+def test_search_many_embeds_the_queries_at_once(
+    tmp_path, data_path, knowledge_db_class, counting_embedding_function
+):
+    knowledge_db = knowledge_db_class(
+        "test",
+        str(tmp_path / "db"),
+        embedding_function=counting_embedding_function,
+        query_cache_size=0,
+    )
+    knowledge_db.store("test", str(data_path))
+    counting_embedding_function.calls.clear()
+
+    knowledge_db.search_many("test", ["cat", "dog", "cat"])
+
+    assert counting_embedding_function.calls == [["cat", "dog", "cat"]]
+
+
+def test_search_many_without_queries(knowledge_db):
+    assert knowledge_db.search_many("test", []) == []
+
+
+def test_query_embeddings_are_cached(knowledge_db, counting_embedding_function):
+    knowledge_db.search("test", "cat")
+    knowledge_db.search_many("test", ["cat", "dog"])
+
+    assert counting_embedding_function.calls == [["cat"], ["dog"]]
+    assert knowledge_db.get_cache_stats() == {
+        "query_embeddings": {"hits": 1, "misses": 2, "num_entries": 2}
+    }
+
+
+def _get_cached_db(tmp_path, knowledge_db_class, embedding_function, **kwargs):
+    return knowledge_db_class(
+        "test",
+        str(tmp_path / "db"),
+        embedding_function=embedding_function,
+        result_cache_size=10,
+        **kwargs,
+    )
+
+
+def test_search_results_are_cached(
+    tmp_path, data_path, knowledge_db_class, embedding_function, monkeypatch
+):
+    knowledge_db = _get_cached_db(tmp_path, knowledge_db_class, embedding_function)
+    knowledge_db.store("test", str(data_path))
+
+    knowledge_items = knowledge_db.search("test", "cat", num_results=2)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the cached results were not used")
+
+    monkeypatch.setattr(knowledge_db, "_query", fail)
+
+    assert _get_contents(knowledge_db.search("test", "cat", num_results=2)) == (
+        _get_contents(knowledge_items)
+    )
+
+    # the cached results are copies, which the callers can modify
+    knowledge_items[0].content = "modified"
+    assert knowledge_db.search("test", "cat", num_results=2)[0].content != "modified"
+
+
+def test_store_invalidates_cached_results(
+    tmp_path, data_path, knowledge_db_class, embedding_function
+):
+    knowledge_db = _get_cached_db(tmp_path, knowledge_db_class, embedding_function)
+    knowledge_db.store("test", str(data_path))
+
+    assert knowledge_db.search("test", "zebra")[0].content != "zebra stripes"
+
+    (data_path / "zebra.txt").write_text("zebra stripes")
+    knowledge_db.store("test", str(data_path))
+
+    assert knowledge_db.search("test", "zebra")[0].content == "zebra stripes"
+
+
+def test_failed_store_invalidates_cached_results(
+    tmp_path, data_path, knowledge_db_class, embedding_function, monkeypatch
+):
+    knowledge_db = _get_cached_db(tmp_path, knowledge_db_class, embedding_function)
+    knowledge_db.store("test", str(data_path))
+
+    assert knowledge_db.search("test", "zebra")[0].content != "zebra stripes"
+
+    def fail(*args, **kwargs):
+        raise OSError("persist failed")
+
+    # the store fails after writing its items
+    monkeypatch.setattr(knowledge_db, "_on_stored", fail)
+    (data_path / "zebra.txt").write_text("zebra stripes")
+
+    with pytest.raises(OSError):
+        knowledge_db.store("test", str(data_path))
+
+    assert knowledge_db.search("test", "zebra")[0].content == "zebra stripes"
+
+
+def test_result_cache_ttl(
+    tmp_path, data_path, knowledge_db_class, embedding_function, monkeypatch
+):
+    knowledge_db = _get_cached_db(
+        tmp_path, knowledge_db_class, embedding_function, result_cache_ttl_seconds=60
+    )
+    knowledge_db.store("test", str(data_path))
+    now = time.monotonic()
+
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    knowledge_db.search("test", "cat")
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    knowledge_db.search("test", "cat")
+
+    assert knowledge_db.get_cache_stats()["results"]["misses"] == 2
+
+
+@pytest.mark.parametrize(
+    "filters, expected_contents",
+    [
+        ({"$and": [{"file_name": "file1"}]}, _CONTENTS[1:2]),
+        ({"$or": [{"file_name": "file2"}]}, _CONTENTS[2:3]),
+        (
+            {
+                "$or": [
+                    {"$and": [{"file_name": {"$in": ["file0", "file1"]}}]},
+                    {"file_name": "file3", "file_ext": ".txt"},
+                ]
+            },
+            [_CONTENTS[0], _CONTENTS[1], _CONTENTS[3]],
+        ),
+    ],
+)
+def test_search_filters_match_on_every_backend(
+    knowledge_db, filters, expected_contents
+):
+    knowledge_items = knowledge_db.search(
+        "test", "the", num_results=10, filters=filters
+    )
+
+    assert sorted(_get_contents(knowledge_items)) == sorted(expected_contents)
+
+
+@pytest.fixture
+def other_knowledge_db(tmp_path, knowledge_db):
+    other_data_path = tmp_path / "other_data"
+    other_data_path.mkdir()
+    (other_data_path / "cat.txt").write_text("a cat chases the mouse")
+    (other_data_path / "cow.txt").write_text("the cow grazes in the field")
+
+    knowledge_db.store("other", str(other_data_path))
+
+    return knowledge_db
+
+
+def test_search_collections_merges_by_distance(other_knowledge_db):
+    knowledge_items = other_knowledge_db.search_collections(
+        ["test", "other"], "cat mouse", num_results=3
+    )
+
+    expected_knowledge_items = sorted(
+        other_knowledge_db.search("test", "cat mouse", num_results=3)
+        + other_knowledge_db.search("other", "cat mouse", num_results=3),
+        key=lambda knowledge_item: knowledge_item.distance,
+    )[:3]
+
+    assert _get_contents(knowledge_items) == _get_contents(expected_knowledge_items)
+    assert knowledge_items[0].content == "a cat chases the mouse"
+    assert knowledge_items[1].content == "the cat sleeps on the mat"
+
+
+def test_search_collections_embeds_the_query_once(
+    other_knowledge_db, counting_embedding_function
+):
+    counting_embedding_function.calls.clear()
+
+    other_knowledge_db.search_collections(["test", "other"], "cow")
+
+    assert counting_embedding_function.calls == [["cow"]]
+
+
+def test_search_collections_applies_filters_and_max_distance(other_knowledge_db):
+    knowledge_items = other_knowledge_db.search_collections(
+        ["test", "other"], "cat", num_results=10, filters={"file_name": "cat"}
+    )
+    assert _get_contents(knowledge_items) == ["a cat chases the mouse"]
+
+    max_distance = knowledge_items[0].distance
+    knowledge_items = other_knowledge_db.search_collections(
+        ["test", "other"], "cat", num_results=10, max_distance=max_distance
+    )
+    assert all(
+        knowledge_item.distance <= max_distance for knowledge_item in knowledge_items
+    )
+    assert "a cat chases the mouse" in _get_contents(knowledge_items)
+
+
+def test_search_collections_without_collections(knowledge_db):
+    assert knowledge_db.search_collections([], "cat") == []
+
+
+def test_search_max_distance(knowledge_db):
+    knowledge_items = knowledge_db.search("test", "cat mat", num_results=4)
+    max_distance = knowledge_items[1].distance
+
+    assert _get_contents(
+        knowledge_db.search("test", "cat mat", num_results=4, max_distance=max_distance)
+    ) == _get_contents(
+        [
+            knowledge_item
+            for knowledge_item in knowledge_items
+            if knowledge_item.distance <= max_distance
+        ]
+    )
+    assert knowledge_db.search("test", "cat mat", max_distance=-1) == []
+
+
+@pytest.fixture
+def mmr_knowledge_db(tmp_path, knowledge_db_class, embedding_function):
+    data_path = tmp_path / "mmr_data"
+    data_path.mkdir()
+    (data_path / "file0.txt").write_text("cat sleeps mat")
+    (data_path / "file1.txt").write_text("cat sleeps mat softly")
+    (data_path / "file2.txt").write_text("cat plays yarn")
+
+    knowledge_db = knowledge_db_class(
+        "test", str(tmp_path / "mmr_db"), embedding_function=embedding_function
+    )
+    knowledge_db.store("test", str(data_path))
+
+    return knowledge_db
+
+
+def test_search_mmr_diversifies_the_results(mmr_knowledge_db):
+    query = "cat sleeps mat"
+
+    assert _get_contents(mmr_knowledge_db.search("test", query, num_results=2)) == [
+        "cat sleeps mat",
+        "cat sleeps mat softly",
+    ]
+    assert _get_contents(
+        mmr_knowledge_db.search("test", query, num_results=2, mmr_lambda=0.3)
+    ) == ["cat sleeps mat", "cat plays yarn"]
+
+
+def test_search_mmr_skips_items_without_embeddings(mmr_knowledge_db, monkeypatch):
+    get_embeddings = mmr_knowledge_db._get_embeddings
+
+    # the closest item is deleted between the search and the re-ranking
+    def get_embeddings_without_first(collection, ids):
+        return get_embeddings(collection, ids[1:])
+
+    monkeypatch.setattr(
+        mmr_knowledge_db, "_get_embeddings", get_embeddings_without_first
+    )
+
+    assert _get_contents(
+        mmr_knowledge_db.search("test", "cat sleeps mat", num_results=2, mmr_lambda=0.3)
+    ) == ["cat sleeps mat softly", "cat plays yarn"]
+
+
+@pytest.mark.parametrize(
+    "filters, expected_contents",
+    [
+        ({"color": {"$ne": "red"}}, ["blue"]),
+        ({"color": {"$nin": ["red"]}}, ["blue"]),
+        ({"color": {"$in": ["red", "blue"]}}, ["blue", "red"]),
+    ],
+)
+def test_filters_never_match_missing_keys(
+    tmp_path, knowledge_db_class, embedding_function, filters, expected_contents
+):
+    knowledge_db = knowledge_db_class(
+        "test", str(tmp_path / "db"), embedding_function=embedding_function
+    )
+    contents = ["red", "blue", "colorless"]
+
+    knowledge_db._get_store_collection("test").add(
+        ids=contents,
+        embeddings=embedding_function(contents),
+        documents=contents,
+        metadatas=[{"color": "red"}, {"color": "blue"}, {"shape": "round"}],
+    )
+
+    knowledge_items = knowledge_db.search(
+        "test", "color", num_results=10, filters=filters
+    )
+
+    assert sorted(_get_contents(knowledge_items)) == expected_contents
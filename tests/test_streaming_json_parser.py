@@ -0,0 +1,109 @@
+from typing import Any, List
+
+import pytest
+
+from ezpyai.exceptions import JSONParseError
+from ezpyai.llm.providers._streaming_json_parser import StreamingJSONParser
+
+
+def _validate(data: Any, response_format: Any) -> bool:
+    if not response_format:
+        return True
+
+    if isinstance(response_format, dict):
+        return isinstance(data, dict) and all(key in data for key in response_format)
+
+    return isinstance(data, list) and all(
+        _validate(item, spec) for item, spec in zip(data, response_format)
+    )
+
+
+def _feed_chars(parser: StreamingJSONParser, text: str) -> int:
+    # the number of characters fed until the parser is done
+    for i, char in enumerate(text):
+        if parser.feed(char):
+            return i + 1
+
+    return len(text)
+
+
+def test_object_done_once_all_keys_complete():
+    partials: List[Any] = []
+    parser = StreamingJSONParser({"a": "", "b": 0}, _validate, partials.append)
+    text = '```json\n{"a": "x, }", "b": [1, {"c": 2}], "extra": true}\n```'
+
+    num_fed = _feed_chars(parser, text)
+
+    assert parser.is_done()
+    assert parser.get_value() == {"a": "x, }", "b": [1, {"c": 2}]}
+    assert partials == [{"a": "x, }"}, {"a": "x, }", "b": [1, {"c": 2}]}]
+    assert num_fed == text.index("}]") + 2
+
+
+def test_array_done_once_closed():
+    parser = StreamingJSONParser([], _validate)
+
+    _feed_chars(parser, '[1, 2.5, null, false, "s"] trailing')
+
+    assert parser.is_done()
+    assert parser.get_value() == [1, 2.5, None, False, "s"]
+
+
+def test_array_item_failing_validation_stops():
+    parser = StreamingJSONParser([{"a": ""}], _validate)
+
+    _feed_chars(parser, '[{"b": 1}, {"a": 2}]')
+
+    assert parser.is_done()
+    assert parser.get_value() is None
+
+
+def test_root_of_wrong_type_stops():
+    parser = StreamingJSONParser({"a": ""}, _validate)
+
+    assert parser.feed("[1]")
+    assert parser.get_value() is None
+
+
+def test_text_before_root_raises():
+    parser = StreamingJSONParser({"a": ""}, _validate)
+
+    with pytest.raises(JSONParseError):
+        parser.feed('Sure! {"a": 1}')
+
+
+def test_invalid_value_raises():
+    parser = StreamingJSONParser({"a": ""}, _validate)
+
+    with pytest.raises(JSONParseError):
+        parser.feed('{"a": tru }')
+
+
+def test_scalar_with_empty_format_is_not_streamable():
+    parser = StreamingJSONParser({}, _validate)
+
+    assert not parser.feed("42")
+    assert not parser.is_streamable()
+
+
+def test_incomplete_response_is_not_done():
+    parser = StreamingJSONParser({"a": "", "b": ""}, _validate)
+
+    assert not parser.feed('{"a": "x", "b": "unterminated')
+    assert parser.get_value() == {"a": "x"}
+
+
+@pytest.mark.parametrize("text", ['{"a":}', '{"a"}', "[1,]", '{"a": 1,}'])
+def test_incomplete_entry_before_close_raises(text):
+    parser = StreamingJSONParser({}, _validate)
+
+    with pytest.raises(JSONParseError):
+        _feed_chars(parser, text)
+
+
+@pytest.mark.parametrize("text, value", [("{}", {}), ("[ ]", [])])
+def test_empty_root_closes(text, value):
+    parser = StreamingJSONParser({}, _validate)
+
+    assert parser.feed(text)
+    assert parser.get_value() == value
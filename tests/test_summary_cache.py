@@ -0,0 +1,64 @@
+from ezpyai.llm.prompt import Prompt
+from ezpyai.llm.providers._llm_provider import BaseLLMProvider
+from ezpyai.llm.knowledge.summary_cache import SummaryCache
+
+
+class _Summarizer(BaseLLMProvider):
+    def __init__(self, model: str = "model") -> None:
+        self._model = model
+        self._temperature = 0.0
+        self._max_tokens = 10
+
+    def get_response(self, prompt: Prompt) -> str:
+        return ""
+
+
+def test_get_and_set(tmp_path):
+    summary_cache = SummaryCache(str(tmp_path))
+    summarizer = _Summarizer()
+
+    assert summary_cache.get(summarizer, "id") is None
+
+    summary_cache.set(summarizer, "id", "the summary")
+
+    assert summary_cache.get(summarizer, "id") == "the summary"
+    assert summary_cache.get(summarizer, "other id") is None
+
+    stats = summary_cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["num_entries"]) == (1, 2, 1)
+
+
+def test_persists_across_instances(tmp_path):
+    SummaryCache(str(tmp_path)).set(_Summarizer(), "id", "the summary")
+
+    assert SummaryCache(str(tmp_path)).get(_Summarizer(), "id") == "the summary"
+
+
+def test_key_includes_summarizer_identity(tmp_path):
+    summary_cache = SummaryCache(str(tmp_path))
+    summary_cache.set(_Summarizer(), "id", "the summary")
+
+    assert summary_cache.get(_Summarizer(model="other model"), "id") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    summary_cache = SummaryCache(str(tmp_path), max_size_bytes=20)
+    summarizer = _Summarizer()
+
+    summary_cache.set(summarizer, "a", "x" * 8)
+    summary_cache.set(summarizer, "b", "x" * 8)
+    summary_cache.get(summarizer, "a")
+    summary_cache.set(summarizer, "c", "x" * 8)
+
+    assert summary_cache.get(summarizer, "a") is not None
+    assert summary_cache.get(summarizer, "b") is None
+    assert summary_cache.get(summarizer, "c") is not None
+
+
+def test_clear(tmp_path):
+    summary_cache = SummaryCache(str(tmp_path))
+    summary_cache.set(_Summarizer(), "id", "the summary")
+
+    summary_cache.clear()
+
+    assert summary_cache.get(_Summarizer(), "id") is None